@@ -0,0 +1,87 @@
+"""
+Artefactos intermedios entre pasos del proceso
+
+Las tablas que un paso entrega a otro (cupos disponibles, reporte de
+aprendices) se guardan como Parquet: columnas tipadas que se leen sin volver
+a interpretar un libro Excel. Cuando el paso que publica y el que consume
+corren en el mismo proceso, la tabla se entrega directamente desde memoria.
+
+El Excel queda solo para los entregables finales.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+# Tablas publicadas en este proceso, por ruta absoluta del artefacto
+_EN_MEMORIA = {}
+
+
+def _clave(ruta):
+    return str(Path(ruta).resolve())
+
+
+def publicar(df, ruta):
+    """
+    Publica una tabla como artefacto Parquet (y en memoria para este proceso)
+
+    Args:
+        df (DataFrame): Tabla a publicar (se indexa de 0 a n-1 al guardarla)
+        ruta (str | Path): Archivo .parquet de destino
+
+    Returns:
+        Path: Ruta del artefacto
+    """
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(ruta, engine='pyarrow', index=False)
+    _EN_MEMORIA[_clave(ruta)] = df
+    return ruta
+
+
+def obtener(ruta, conservar=False):
+    """
+    Obtiene una tabla publicada con publicar()
+
+    Si la tabla se publicó en este mismo proceso se retorna desde memoria;
+    si no, se lee el Parquet. La tabla retornada no debe modificarse en el
+    lugar (puede ser la misma que usa el paso que la publicó).
+
+    Args:
+        ruta (str | Path): Archivo .parquet del artefacto
+        conservar (bool): Si True, la tabla leída del Parquet queda en
+            memoria para las siguientes llamadas de este proceso
+
+    Returns:
+        DataFrame: La tabla publicada
+
+    Raises:
+        FileNotFoundError: Si el artefacto no existe
+    """
+    clave = _clave(ruta)
+    if clave in _EN_MEMORIA:
+        return _EN_MEMORIA[clave]
+
+    if not Path(ruta).exists():
+        raise FileNotFoundError(f"No existe el artefacto: {ruta}")
+    df = pd.read_parquet(ruta, engine='pyarrow')
+    if conservar:
+        _EN_MEMORIA[clave] = df
+    return df
+
+
+def olvidar(ruta=None, conservar=()):
+    """
+    Descarta de memoria un artefacto (o todos si ruta es None); el Parquet se conserva
+
+    Args:
+        ruta (str | Path): Artefacto a descartar; None = todos
+        conservar (iterable): Artefactos que se mantienen en memoria al
+            descartar todos (ej. insumos compartidos entre reportes)
+    """
+    if ruta is None:
+        mantener = {_clave(r) for r in conservar}
+        for clave in [c for c in _EN_MEMORIA if c not in mantener]:
+            del _EN_MEMORIA[clave]
+    else:
+        _EN_MEMORIA.pop(_clave(ruta), None)
@@ -0,0 +1,230 @@
+"""
+Benchmark de escritura del reporte consolidado
+
+Compara, con datos sintéticos del tamaño indicado, los dos caminos del
+Paso 8 para armar el consolidado a partir de lo que entrega el Paso 7:
+
+- Flujo anterior (generar_reporte_consolidado.py original): pandas +
+  openpyxl escriben las hojas 1-2; se abren con openpyxl el reporte de
+  aprendices (.xlsx con formato) y el consolidado, se copian celda por
+  celda valores y estilos, anchos de columna y altos de fila, se da formato
+  a los encabezados y se guarda de nuevo.
+- Flujo actual: se obtiene el artefacto Parquet del Paso 7 y las tres hojas
+  se escriben en una sola sesión de escritor_excel.escribir_hojas.
+
+Los dos archivos de entrada del Paso 7 (libro con formato y Parquet) se
+preparan antes de medir. Se mide tiempo total y memoria pico (tracemalloc)
+de cada flujo.
+
+Uso:
+    python benchmark_consolidado.py                 # 2.000 filas de aprendices, 3 repeticiones
+    python benchmark_consolidado.py 20000 5         # filas de aprendices, repeticiones
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from copy import copy
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.styles import Font, PatternFill
+
+import artefactos
+from escritor_excel import (escribir_hojas, crear_libro, escribir_dataframe,
+                            FORMATO_ENCABEZADO, FORMATO_DEPARTAMENTO)
+from generar_reporte_consolidado import leer_reporte_aprendices
+from renderizar_consolidado import especificar_hojas
+
+
+# ============================================
+# DATOS SINTÉTICOS
+# ============================================
+
+def generar_datos(filas_aprendices, semilla=0):
+    """
+    Genera las tres tablas del consolidado con la forma de los datos reales
+
+    Args:
+        filas_aprendices (int): Filas de la hoja de aprendices (municipios +
+            departamentos). Economía naranja usa la cuarta parte
+
+    Returns:
+        tuple: (df_economia_naranja, df_oferta, df_aprendices, es_departamento)
+    """
+    rng = np.random.default_rng(semilla)
+
+    n = max(filas_aprendices // 4, 1)
+    df_economia_naranja = pd.DataFrame({
+        'CODIGO_NIVEL_FORMACION': rng.integers(1, 9, n),
+        'nombre_departamento': rng.choice(['ANTIOQUIA', 'BOGOTÁ, D.C.', 'VALLE DEL CAUCA'], n),
+        'nombre_programa': [f'PROGRAMA {i}' for i in range(n)],
+        'COMPLEMENTARIA': rng.integers(0, 500, n),
+        'TITULADA': rng.integers(0, 500, n),
+        'TOTAL': rng.integers(0, 1000, n)
+    })
+
+    df_oferta = pd.DataFrame({
+        'codigo_regional': np.arange(1, 34),
+        'nombre_regional': [f'REGIONAL {i}' for i in range(1, 34)],
+        'Cupos Disponibles Titulada': rng.integers(0, 5000, 33),
+        'Cupos Disponibles Complementaria': rng.integers(0, 50000, 33)
+    })
+
+    # Un departamento cada 30 filas, seguido de sus municipios
+    posicion = np.arange(filas_aprendices)
+    es_departamento = posicion % 30 == 0
+    depto = posicion // 30 + 1
+    mpio = np.where(es_departamento, 0, posicion % 30)
+    df_aprendices = pd.DataFrame({
+        'Departamento': [f'DEPARTAMENTO {d}' for d in depto],
+        'Municipio': np.where(es_departamento, '', [f'MUNICIPIO {m}' for m in mpio]),
+        'Código DIVIPOLA - DANE': [f'{d * 1000 + m:05d}' for d, m in zip(depto, mpio)],
+        'Aprendices Titulada': rng.integers(0, 2000, filas_aprendices),
+        'Aprendices Complementaria': rng.integers(0, 9000, filas_aprendices),
+        'Aprendices Contrato': np.where(rng.random(filas_aprendices) < 0.3, np.nan, rng.integers(0, 300, filas_aprendices))
+    })
+
+    return df_economia_naranja, df_oferta, df_aprendices, es_departamento
+
+
+def preparar_entradas_paso_7(directorio, nombre_hoja, df_aprendices, es_departamento):
+    """
+    Escribe lo que entrega el Paso 7: el reporte con formato y su artefacto Parquet
+
+    Returns:
+        tuple: (ruta del .xlsx, ruta del .parquet)
+    """
+    ruta_xlsx = os.path.join(directorio, 'aprendices.xlsx')
+    ruta_parquet = os.path.join(directorio, 'aprendices.parquet')
+
+    libro = crear_libro(ruta_xlsx)
+    try:
+        hoja = libro.add_worksheet(nombre_hoja)
+        formato_departamento = libro.add_format(FORMATO_DEPARTAMENTO)
+        escribir_dataframe(hoja, df_aprendices, libro.add_format(FORMATO_ENCABEZADO),
+                           np.where(es_departamento, formato_departamento, None))
+    finally:
+        libro.close()
+
+    artefactos.publicar(df_aprendices.assign(es_departamento=es_departamento), ruta_parquet)
+    # El Paso 8 corre en otro momento: lee el Parquet, no la copia en memoria
+    artefactos.olvidar(ruta_parquet)
+    return ruta_xlsx, ruta_parquet
+
+
+# ============================================
+# FLUJOS A COMPARAR
+# ============================================
+
+def flujo_openpyxl(ruta, nombres, df_economia_naranja, df_oferta, archivo_aprendices):
+    """Flujo anterior (original de generar_reporte_consolidado.py): copia de la hoja 3 con openpyxl"""
+    nombre_hoja1, nombre_hoja2, nombre_hoja3 = nombres
+
+    with pd.ExcelWriter(ruta, engine='openpyxl') as writer:
+        df_economia_naranja.to_excel(writer, sheet_name=nombre_hoja1, index=False)
+        df_oferta.to_excel(writer, sheet_name=nombre_hoja2, index=False)
+
+    wb_source = load_workbook(archivo_aprendices)
+    wb_dest = load_workbook(ruta)
+    ws_source = wb_source.worksheets[0]
+    ws_dest = wb_dest.create_sheet(nombre_hoja3)
+
+    for row in ws_source.iter_rows():
+        for cell in row:
+            new_cell = ws_dest[cell.coordinate]
+            new_cell.value = cell.value
+            if cell.has_style:
+                new_cell.font = copy(cell.font)
+                new_cell.border = copy(cell.border)
+                new_cell.fill = copy(cell.fill)
+                new_cell.number_format = copy(cell.number_format)
+                new_cell.protection = copy(cell.protection)
+                new_cell.alignment = copy(cell.alignment)
+
+    for col_letter, col_dim in ws_source.column_dimensions.items():
+        ws_dest.column_dimensions[col_letter].width = col_dim.width
+    for row_num, row_dim in ws_source.row_dimensions.items():
+        ws_dest.row_dimensions[row_num].height = row_dim.height
+
+    header_font_white = Font(bold=True, color="FFFFFF")
+    fill_azul_oscuro = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
+    fill_verde = PatternFill(start_color="548235", end_color="548235", fill_type="solid")
+    for nombre, fill in ((nombre_hoja1, fill_azul_oscuro), (nombre_hoja2, fill_verde), (nombre_hoja3, fill_verde)):
+        hoja = wb_dest[nombre]
+        for col in range(1, hoja.max_column + 1):
+            cell = hoja.cell(row=1, column=col)
+            cell.font = header_font_white
+            cell.fill = fill
+
+    wb_dest.save(ruta)
+    wb_source.close()
+    wb_dest.close()
+
+
+def flujo_una_sesion(ruta, nombres, df_economia_naranja, df_oferta, artefacto_aprendices):
+    """Flujo actual: artefacto Parquet del Paso 7 y las tres hojas en una sola sesión de xlsxwriter"""
+    df_aprendices, es_departamento = leer_reporte_aprendices(artefacto_aprendices)
+    artefactos.olvidar(artefacto_aprendices)
+    escribir_hojas(ruta, especificar_hojas(nombres, df_economia_naranja, df_oferta, df_aprendices, es_departamento))
+
+
+def medir(flujo, ruta, repeticiones, *args):
+    """
+    Ejecuta un flujo varias veces
+
+    Returns:
+        tuple: (mejor tiempo en segundos, memoria pico en MB, tamaño del archivo en KB)
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        flujo(ruta, *args)
+        tiempos.append(time.perf_counter() - inicio)
+
+    # La memoria se mide en una ejecución aparte para no distorsionar los tiempos
+    tracemalloc.start()
+    flujo(ruta, *args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(tiempos), pico / 1024 / 1024, os.path.getsize(ruta) / 1024
+
+
+# ============================================
+# EJECUCIÓN
+# ============================================
+
+if __name__ == '__main__':
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    df_economia_naranja, df_oferta, df_aprendices, es_departamento = generar_datos(filas)
+    nombres = ('Economía Naranja SEPTIEMBR 2025', 'Oferta Disponible SEPTIEMB 2025', 'SENA Mensual Nacional Sep 2025')
+
+    print("=== BENCHMARK REPORTE CONSOLIDADO ===\n")
+    print(f"Filas: {len(df_economia_naranja):,} / {len(df_oferta):,} / {len(df_aprendices):,} (hojas 1 / 2 / 3)")
+    print(f"Repeticiones: {repeticiones}\n")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo_aprendices, artefacto_aprendices = preparar_entradas_paso_7(
+            directorio, nombres[2], df_aprendices, es_departamento)
+        flujos = (
+            ('openpyxl (anterior)', flujo_openpyxl, archivo_aprendices),
+            ('una sesión', flujo_una_sesion, artefacto_aprendices)
+        )
+        resultados = {}
+        for nombre, flujo, entrada_aprendices in flujos:
+            ruta = os.path.join(directorio, f'consolidado_{len(resultados)}.xlsx')
+            resultados[nombre] = medir(flujo, ruta, repeticiones, nombres, df_economia_naranja, df_oferta,
+                                       entrada_aprendices)
+
+    print(f"{'Flujo':<22}{'Tiempo (s)':>12}{'Pico (MB)':>12}{'Archivo (KB)':>14}")
+    for nombre, (tiempo, pico, tamanio) in resultados.items():
+        print(f"{nombre:<22}{tiempo:>12.3f}{pico:>12.1f}{tamanio:>14.0f}")
+
+    (t_anterior, m_anterior, _), (t_nuevo, m_nuevo, _) = resultados.values()
+    print(f"\n✓ Aceleración: {t_anterior / t_nuevo:.1f}x   Memoria pico: {m_nuevo / m_anterior:.0%} del flujo anterior")
@@ -0,0 +1,197 @@
+"""
+Catálogo persistente de municipios DIVIPOLA
+
+Guarda en SQLite, por clave DIVIPOLA entera (depto * 1000 + mpio), los
+nombres de departamento y municipio que usan los reportes de todos los meses.
+Los nombres ya registrados no se reemplazan: cada mes ve exactamente los
+mismos nombres. Los municipios nuevos se agregan en una nueva versión del
+catálogo (tabla versiones_catalogo).
+
+Uso:
+    python catalogo_divipola.py              # Resumen del catálogo
+    python catalogo_divipola.py 05001        # Consultar un municipio
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from configuracion import BD_CATALOGO_DIVIPOLA, TIEMPO_ESPERA_BD_COMPARTIDA
+
+# Catálogos ya cargados en este proceso: {ruta: ((tamaño, mtime_ns), DataFrame)}
+_CARGADOS = {}
+
+
+def crear_catalogo(conn):
+    """Crea las tablas del catálogo si no existen"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS versiones_catalogo (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha TIMESTAMP,
+            fuente TEXT,
+            municipios_agregados INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS municipios (
+            clave_divipola INTEGER PRIMARY KEY,
+            codigo_departamento INTEGER NOT NULL,
+            codigo_municipio INTEGER NOT NULL,
+            nombre_departamento TEXT,
+            nombre_municipio TEXT,
+            version INTEGER REFERENCES versiones_catalogo(version)
+        )
+    """)
+
+
+def cargar_catalogo(db_file):
+    """
+    Carga el catálogo completo
+
+    Args:
+        db_file (str | Path): Base de datos del catálogo
+
+    Se reutiliza la carga anterior de este proceso mientras el archivo no
+    cambie de tamaño ni de fecha de modificación (procesos de larga duración
+    como servicio_reportes.py no vuelven a leerlo en cada reporte). El
+    DataFrame retornado no debe modificarse.
+
+    Returns:
+        DataFrame: Indexado por clave_divipola con nombre_departamento y
+            nombre_municipio (vacío si el catálogo aún no existe)
+    """
+    clave = os.path.abspath(db_file)
+    try:
+        estado = os.stat(clave)
+        version = (estado.st_size, estado.st_mtime_ns)
+    except OSError:
+        version = None
+    if version is not None and clave in _CARGADOS and _CARGADOS[clave][0] == version:
+        return _CARGADOS[clave][1]
+
+    conn = sqlite3.connect(db_file, timeout=TIEMPO_ESPERA_BD_COMPARTIDA)
+    try:
+        crear_catalogo(conn)
+        catalogo = pd.read_sql_query("""
+            SELECT clave_divipola, nombre_departamento, nombre_municipio
+            FROM municipios
+        """, conn, index_col='clave_divipola')
+    finally:
+        conn.close()
+
+    # La versión se toma después de leer: crear_catalogo() puede haber creado el archivo
+    estado = os.stat(clave)
+    _CARGADOS[clave] = ((estado.st_size, estado.st_mtime_ns), catalogo)
+    return catalogo
+
+
+def registrar_municipios(db_file, municipios, fuente):
+    """
+    Agrega al catálogo los municipios que aún no tiene
+
+    Args:
+        db_file (str | Path): Base de datos del catálogo
+        municipios (iterable): Tuplas (clave_divipola, nombre_departamento,
+            nombre_municipio). Las claves ya registradas se ignoran
+        fuente (str): Origen de los nombres (se guarda en la versión)
+
+    Returns:
+        int | None: Versión creada, o None si no había municipios nuevos
+    """
+    conn = sqlite3.connect(db_file, timeout=TIEMPO_ESPERA_BD_COMPARTIDA)
+    try:
+        crear_catalogo(conn)
+        # Bloqueo de escritura desde la lectura: dos meses en paralelo no
+        # pueden registrar el mismo municipio nuevo
+        conn.execute("BEGIN IMMEDIATE")
+        existentes = {fila[0] for fila in conn.execute("SELECT clave_divipola FROM municipios")}
+
+        nuevos = {}
+        for clave, nombre_depto, nombre_mpio in municipios:
+            if pd.isna(clave) or pd.isna(nombre_mpio) or nombre_mpio == '':
+                continue
+            clave = int(clave)
+            if clave not in existentes and clave not in nuevos:
+                nuevos[clave] = (None if pd.isna(nombre_depto) else nombre_depto, nombre_mpio)
+
+        if not nuevos:
+            return None
+
+        cursor = conn.execute("""
+            INSERT INTO versiones_catalogo (fecha, fuente, municipios_agregados)
+            VALUES (?, ?, ?)
+        """, (datetime.now().isoformat(timespec='seconds'), fuente, len(nuevos)))
+        version = cursor.lastrowid
+
+        conn.executemany("""
+            INSERT INTO municipios
+            (clave_divipola, codigo_departamento, codigo_municipio,
+             nombre_departamento, nombre_municipio, version)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (clave, clave // 1000, clave % 1000, nombre_depto, nombre_mpio, version)
+            for clave, (nombre_depto, nombre_mpio) in nuevos.items()
+        ])
+        conn.commit()
+        return version
+    finally:
+        conn.close()
+
+
+def aplicar_nombres(df, db_file, columna_clave='clave_divipola',
+                    columna_depto='nombre_depto', columna_mpio='nombre_mpio'):
+    """
+    Reemplaza los nombres del DataFrame por los del catálogo (solo lectura)
+
+    Los municipios que no están en el catálogo conservan los nombres que trae
+    el DataFrame. Solo la importación del PE-04 registra municipios nuevos:
+    con una sola fuente, el nombre que queda fijo no depende de qué paso o
+    qué mes termina primero.
+
+    Args:
+        df (DataFrame): Datos con la clave DIVIPOLA y columnas de nombres
+            (se modifica en el lugar)
+        db_file (str | Path): Base de datos del catálogo
+        columna_clave, columna_depto, columna_mpio (str): Columnas del df
+
+    Returns:
+        tuple: (df, número de municipios que no están en el catálogo)
+    """
+    catalogo = cargar_catalogo(db_file)
+    clave = df[columna_clave]
+    en_catalogo = clave.isin(catalogo.index)
+    df[columna_depto] = clave.map(catalogo['nombre_departamento']).fillna(df[columna_depto])
+    df[columna_mpio] = clave.map(catalogo['nombre_municipio']).fillna(df[columna_mpio])
+    return df, int(clave[~en_catalogo].nunique())
+
+
+# ============================================
+# EJEMPLO DE USO
+# ============================================
+
+if __name__ == '__main__':
+    import sys
+
+    catalogo = cargar_catalogo(BD_CATALOGO_DIVIPOLA)
+
+    if len(sys.argv) > 1:
+        clave = int(sys.argv[1])
+        if clave in catalogo.index:
+            fila = catalogo.loc[clave]
+            print(f"{clave:05d}  {fila['nombre_departamento']} / {fila['nombre_municipio']}")
+        else:
+            print(f"{clave:05d} no está en el catálogo")
+        sys.exit(0)
+
+    conn = sqlite3.connect(BD_CATALOGO_DIVIPOLA)
+    try:
+        versiones = pd.read_sql_query("SELECT * FROM versiones_catalogo ORDER BY version", conn)
+    finally:
+        conn.close()
+
+    print(f"Municipios en el catálogo: {len(catalogo)}")
+    print(f"Departamentos: {(catalogo.index // 1000).nunique()}")
+    print("\nVersiones:")
+    print(versiones.to_string(index=False) if len(versiones) else "  (sin versiones)")
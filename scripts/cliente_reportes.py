@@ -0,0 +1,163 @@
+"""
+Cliente del servicio residente de reportes
+
+Envía un reporte al servicio (generar_reporte_completo.py --servicio) y
+muestra su salida mientras avanza. Solo usa la biblioteca estándar: arranca
+en una fracción de segundo porque no importa pandas ni los scripts de los
+pasos.
+
+Si el servicio no está en ejecución, genera el reporte directamente con
+generar_reporte_completo.py (mismas opciones).
+
+Uso:
+    python cliente_reportes.py <MES> [--force <PASO>] [--profile <PASO>] [--subprocesos] [--puerto N]
+    python cliente_reportes.py --estado
+    python cliente_reportes.py --detener
+
+Ejemplo:
+    python cliente_reportes.py SEPTIEMBRE
+    python cliente_reportes.py SEPTIEMBRE --force 6
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from configuracion import PUERTO_SERVICIO
+
+# Segundos entre consultas del avance de un trabajo
+INTERVALO_CONSULTA = 0.5
+
+
+class ServicioNoDisponible(Exception):
+    """El servicio no responde en el puerto indicado"""
+
+
+def _peticion(puerto, metodo, ruta, datos=None, tiempo_espera=10):
+    """
+    Petición JSON al servicio
+
+    Returns:
+        dict: Respuesta del servicio
+
+    Raises:
+        ServicioNoDisponible: Si no hay servicio escuchando en el puerto
+        ValueError: Si el servicio rechaza la petición (mes o paso inválido)
+    """
+    cuerpo = json.dumps(datos).encode('utf-8') if datos is not None else None
+    peticion = Request(f"http://127.0.0.1:{puerto}{ruta}", data=cuerpo, method=metodo,
+                       headers={'Content-Type': 'application/json'})
+    try:
+        with urlopen(peticion, timeout=tiempo_espera) as respuesta:
+            return json.loads(respuesta.read().decode('utf-8'))
+    except HTTPError as e:
+        raise ValueError(json.loads(e.read().decode('utf-8')).get('error', str(e))) from e
+    except OSError as e:
+        raise ServicioNoDisponible(str(e)) from e
+
+
+def generar_reporte(mes, puerto=PUERTO_SERVICIO, forzar=(), perfilar=(), subprocesos=False):
+    """
+    Genera el reporte de un mes en el servicio y muestra su salida
+
+    Args:
+        mes (str): Mes a procesar
+        puerto (int): Puerto del servicio
+        forzar (list[str]): Pasos a repetir (--force)
+        perfilar (list[str]): Pasos a perfilar (--profile)
+        subprocesos (bool): Ejecutar cada paso en su propio intérprete
+
+    Returns:
+        bool: True si el reporte se generó
+
+    Raises:
+        ServicioNoDisponible: Si el servicio no está en ejecución
+    """
+    trabajo = _peticion(puerto, 'POST', '/trabajos', {
+        'mes': mes, 'forzar': list(forzar), 'perfilar': list(perfilar), 'subprocesos': subprocesos
+    })
+    print(f"→ Trabajo {trabajo['id']} enviado al servicio (puerto {puerto})\n")
+
+    leido = 0
+    while True:
+        try:
+            trabajo = _peticion(puerto, 'GET', f"/trabajos/{trabajo['id']}?desde={leido}")
+        except ServicioNoDisponible:
+            # El trabajo ya estaba en el servicio: no se repite con una ejecución directa
+            print(f"\n✗ Se perdió la conexión con el servicio (trabajo {trabajo['id']})")
+            return False
+        if trabajo['salida']:
+            print(trabajo['salida'], end='', flush=True)
+            leido += len(trabajo['salida'])
+        if trabajo['estado'] in ('terminado', 'error'):
+            break
+        time.sleep(INTERVALO_CONSULTA)
+
+    if trabajo['exitoso']:
+        print(f"\n✓ Reporte generado: {trabajo['reporte']}")
+    else:
+        print(f"\n✗ ERROR EN {trabajo['paso_fallido'] or 'la validación'} (log: {trabajo['log']})")
+    print(f"⏱ Tiempo total en el servicio: {trabajo['duracion']:.1f} segundos")
+    return bool(trabajo['exitoso'])
+
+
+def _ejecucion_directa(args):
+    """Genera el reporte con generar_reporte_completo.py (sin servicio)"""
+    comando = [sys.executable, str(Path(__file__).parent / 'generar_reporte_completo.py'), args.mes]
+    for paso in args.force:
+        comando += ['--force', paso]
+    for paso in args.profile:
+        comando += ['--profile', paso]
+    if args.subprocesos:
+        comando.append('--subprocesos')
+    return subprocess.run(comando).returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un reporte en el servicio residente de reportes")
+    parser.add_argument('mes', nargs='?', help="Mes a procesar (ej: SEPTIEMBRE)")
+    parser.add_argument('--force', action='append', default=[], metavar='PASO',
+                        help="Repetir el paso (1-8 o 'todos') y los que dependen de él")
+    parser.add_argument('--profile', action='append', default=[], metavar='PASO',
+                        help="Ejecutar el paso (1-8 o 'all') bajo cProfile")
+    parser.add_argument('--subprocesos', action='store_true',
+                        help="Ejecutar cada script en su propio intérprete")
+    parser.add_argument('--puerto', type=int, default=PUERTO_SERVICIO, metavar='N',
+                        help=f"Puerto local del servicio (por defecto {PUERTO_SERVICIO})")
+    parser.add_argument('--estado', action='store_true', help="Mostrar el estado del servicio")
+    parser.add_argument('--detener', action='store_true', help="Detener el servicio")
+    args = parser.parse_args()
+
+    try:
+        if args.estado:
+            print(json.dumps(_peticion(args.puerto, 'GET', '/estado'), indent=2, ensure_ascii=False))
+            sys.exit(0)
+        if args.detener:
+            _peticion(args.puerto, 'POST', '/detener')
+            print("✓ Servicio detenido (termina antes los trabajos en cola, si los hay)")
+            sys.exit(0)
+        if not args.mes:
+            parser.error("falta especificar el mes")
+
+        exitoso = generar_reporte(args.mes.upper(), args.puerto, args.force, args.profile, args.subprocesos)
+        sys.exit(0 if exitoso else 1)
+
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    except ServicioNoDisponible:
+        if not args.mes:
+            print(f"[ADVERTENCIA] No hay servicio de reportes en el puerto {args.puerto}")
+            sys.exit(1)
+        print(f"[ADVERTENCIA] No hay servicio de reportes en el puerto {args.puerto}; "
+              f"se genera el reporte directamente")
+        sys.exit(_ejecucion_directa(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -51,6 +51,126 @@ MESES = {
 
 ANIO_TRABAJO = 2025
 
+# ============================================
+# CRUCE METAS VS. AVANCE DE CUPOS
+# ============================================
+
+# Fila de encabezado (base 0) de cada hoja usada del archivo
+# PRIMER AVANCE CUPOS DE FORMACION. El código regional está en la columna 0
+HOJAS_AVANCE_CUPOS = {
+    'TEC ARTIC REG': 5,
+    'NIVEL REGIONAL ': 6,
+    'VIRTUAL GENER REG': 6,
+    'BILINGÜISMO REG': 6
+}
+
+# Mapeo declarativo avance -> categoría de metas: (hoja, columna, subcategoría)
+# La subcategoría corresponde a categorias_formacion en metas_sena_2025.db.
+# Para agregar una categoría basta con agregar su fuente aquí
+MAPEO_AVANCE_CUPOS = [
+    ('TEC ARTIC REG', 5, 'Técnico Laboral Articulación con la Media'),     # F
+    ('NIVEL REGIONAL ', 48, 'TOTAL FORMACION TITULADA'),                   # AW
+    ('NIVEL REGIONAL ', 66, 'TOTAL FORMACION COMPLEMENTARIA'),             # BO
+    ('NIVEL REGIONAL ', 72, 'TOTAL FORMACION PROFESIONAL INTEGRAL'),       # BU
+    ('VIRTUAL GENER REG', 5, 'Total Formación Profesional Integral - Virtual'),  # F
+    ('BILINGÜISMO REG', 5, 'Total Programa de Bilingüismo')                # F
+]
+
+# Columnas del reporte de cupos disponibles: (nombre de columna, subcategoría)
+COLUMNAS_CUPOS_DISPONIBLES = [
+    ('Cupos Doble Titulación', 'Técnico Laboral Articulación con la Media'),
+    ('Cupos en formación titulada', 'TOTAL FORMACION TITULADA'),
+    ('Cupos en formación complementaria', 'TOTAL FORMACION COMPLEMENTARIA'),
+    ('Total Cupos en formación profesional integral', 'TOTAL FORMACION PROFESIONAL INTEGRAL'),
+    ('Cupos de virtualidad', 'Total Formación Profesional Integral - Virtual'),
+    ('Cupos en Bilingüismo', 'Total Programa de Bilingüismo')
+]
+
+# Histórico mensual de meta / avance / disponible por regional y categoría.
+# Es compartido por todos los meses (no se borra con limpiar_mes.py)
+BD_HISTORICO_CUPOS = DIR_PROCESO / 'historico_cupos_disponibles.db'
+
+# Catálogo de municipios DIVIPOLA compartido por todos los meses
+BD_CATALOGO_DIVIPOLA = DIR_PROCESO / 'catalogo_divipola.db'
+
+# Historial de ejecuciones: métricas por paso de cada ejecución (todos los meses)
+BD_HISTORIAL_EJECUCIONES = DIR_PROCESO / 'historial_ejecuciones.db'
+
+# Un paso se marca como regresión si tarda más de UMBRAL_REGRESION veces la
+# mediana de sus últimas VENTANA_MEDIANA_HISTORIAL ejecuciones
+UMBRAL_REGRESION = 1.25
+VENTANA_MEDIANA_HISTORIAL = 5
+
+# ============================================
+# REPORTE MENSUAL DE APRENDICES
+# ============================================
+
+# Hojas usadas del archivo PRIMER AVANCE EN APRENDICES
+HOJAS_AVANCE_APRENDICES = [
+    'INTEGRACION DEPTO MPIO ',
+    '2025 DPTO_MPIO  GENERO ',
+    'DEPTO MPIO VIRTUAL',
+    'DEPTO MPIO BILINGUISMO',
+    'POBL. VULN DEPTO MPIO '
+]
+
+# Palabras que identifican la fila de encabezado de esas hojas
+PALABRAS_HEADER_APRENDICES = ['DEPARTAMENTO', 'DEPTO', 'MUNICIPIO', 'MPIO']
+
+# Filas de encabezado ya detectadas, por huella del diseño de cada hoja
+CACHE_ENCABEZADOS_APRENDICES = DIR_PROCESO / 'cache_encabezados_aprendices.json'
+
+# Decodificación de las hojas: 'procesos' (una hoja por proceso), 'hilos' o
+# 'secuencial'. Se puede cambiar con la variable de entorno MODO_LECTURA
+MODO_LECTURA_APRENDICES = 'procesos'
+
+# ============================================
+# ARCHIVOS DE ENTRADA DEL MES (PASO 2)
+# ============================================
+
+# Cómo se dejan los archivos fuente en datos_intermedios:
+# - 'copia': copia completa del archivo
+# - 'hardlink': enlace duro (no ocupa espacio; requiere el mismo volumen)
+# - 'reflink': copia copy-on-write (Btrfs, XFS; no disponible en NTFS)
+# - 'manifiesto': no se copian; los pasos leen los originales
+# Si la estrategia no es posible se hace una copia real. En todos los casos
+# se registra ruta, tamaño y hash SHA-256 de cada archivo en
+# datos_intermedios/manifiesto_entradas.json. Se puede cambiar con la
+# variable de entorno ESTRATEGIA_COPIA
+ESTRATEGIA_COPIA_ENTRADAS = 'hardlink'
+
+# ============================================
+# ORQUESTACIÓN DEL PROCESO
+# ============================================
+
+# Pasos que pueden ejecutarse al mismo tiempo en generar_reporte_completo.py.
+# Las ramas PE-04 (pasos 3-4), metas/cupos (5-6) y aprendices (7, después
+# del 3) avanzan en paralelo. 1 = ejecución secuencial
+PASOS_EN_PARALELO = 3
+
+# Cómo se ejecutan los pasos 3 y 5-8:
+# - 'proceso': se llama a la función ejecutar(config) de cada script dentro del
+#   mismo intérprete (pandas, openpyxl y pyxlsb se importan una sola vez)
+# - 'subproceso': cada script corre en un intérprete aparte (aislamiento total)
+MODO_EJECUCION_PASOS = 'proceso'
+
+# Modo por lotes (--meses / --rango): meses procesados a la vez, cada uno en
+# su propio proceso
+MESES_EN_PARALELO = 2
+
+# Insumos compartidos por los meses de un lote (BD de metas normalizada,
+# catálogo de economía naranja en Parquet). Se guardan por hash de contenido y
+# versión del código: se reutilizan mientras el archivo fuente no cambie
+DIR_COMPARTIDO = DIR_PROCESO / 'COMPARTIDO' / str(ANIO_TRABAJO)
+
+# Servicio residente (generar_reporte_completo.py --servicio): puerto HTTP en
+# localhost donde atiende a cliente_reportes.py
+PUERTO_SERVICIO = 8765
+
+# Segundos que un paso espera a que otro mes en ejecución libere las BD
+# compartidas (histórico de cupos, catálogo DIVIPOLA) antes de fallar
+TIEMPO_ESPERA_BD_COMPARTIDA = 60
+
 # ============================================
 # FUNCIONES DE CONFIGURACIÓN POR MES
 # ============================================
@@ -78,10 +198,20 @@ def obtener_config_mes(mes_nombre):
     dir_mes = DIR_PROCESO / DIR_MESES / mes_nombre
     dir_datos_intermedios = dir_mes / 'datos_intermedios'
     dir_datos_finales = dir_mes / 'datos_finales'
+    dir_perfiles = dir_mes / 'perfiles'
 
     # Directorio fuente de archivos originales
     dir_fuente = DIR_BASE / str(ANIO_TRABAJO) / f'{mes_numero:02d}-{mes_nombre.capitalize()}'
 
+    archivos_entrada = {
+        'pe04_formacion': dir_fuente / f'PE-04_FORMACION NACIONAL {mes_nombre.upper()} {ANIO_TRABAJO}.xlsb',
+        'avance_cupos': dir_fuente / f'PRIMER AVANCE CUPOS DE FORMACION {mes_nombre.upper()} {ANIO_TRABAJO}.xlsb',
+        'avance_aprendices': dir_fuente / f'PRIMER AVANCE EN APRENDICES {mes_nombre.upper()} {ANIO_TRABAJO}.xlsb',
+        'metas_sena': dir_fuente / 'Metas SENA 2025 V5 26092025_CLEAN.xlsx'  # Único archivo anual
+    }
+
+    estrategia_copia = os.environ.get('ESTRATEGIA_COPIA', ESTRATEGIA_COPIA_ENTRADAS).lower()
+
     config = {
         # Información del mes
         'mes_nombre': mes_nombre,
@@ -93,28 +223,36 @@ def obtener_config_mes(mes_nombre):
         'dir_mes': dir_mes,
         'dir_datos_intermedios': dir_datos_intermedios,
         'dir_datos_finales': dir_datos_finales,
+        'dir_perfiles': dir_perfiles,
         'dir_fuente': dir_fuente,
 
         # ARCHIVOS DE ENTRADA (fuentes originales)
-        'archivos_entrada': {
-            'pe04_formacion': dir_fuente / f'PE-04_FORMACION NACIONAL {mes_nombre.upper()} {ANIO_TRABAJO}.xlsb',
-            'avance_cupos': dir_fuente / f'PRIMER AVANCE CUPOS DE FORMACION {mes_nombre.upper()} {ANIO_TRABAJO}.xlsb',
-            'avance_aprendices': dir_fuente / f'PRIMER AVANCE EN APRENDICES {mes_nombre.upper()} {ANIO_TRABAJO}.xlsb',
-            'metas_sena': dir_fuente / 'Metas SENA 2025 V5 26092025_CLEAN.xlsx'  # Único archivo anual
+        'archivos_entrada': archivos_entrada,
+
+        # ARCHIVOS DE ENTRADA QUE LEEN LOS PASOS 3-7: las copias del paso 2 en
+        # datos_intermedios, o los originales con la estrategia 'manifiesto'
+        'estrategia_copia': estrategia_copia,
+        'archivos_trabajo': {
+            clave: ruta if estrategia_copia == 'manifiesto' else dir_datos_intermedios / ruta.name
+            for clave, ruta in archivos_entrada.items()
         },
 
         # ARCHIVOS INTERMEDIOS
         'archivos_intermedios': {
+            'manifiesto_entradas': dir_datos_intermedios / 'manifiesto_entradas.json',
             'bd_formacion': dir_datos_intermedios / f'sena_formacion_{mes_nombre.lower()}.db',
             'bd_metas': dir_datos_intermedios / 'metas_sena_2025.db',
-            'cupos_disponibles_xlsx': dir_datos_intermedios / 'cupos_disponibles_por_regional_2025.xlsx',
+            'cupos_disponibles_parquet': dir_datos_intermedios / 'cupos_disponibles_por_regional_2025.parquet',
             'cupos_disponibles_csv': dir_datos_intermedios / 'cupos_disponibles_por_regional_2025.csv',
-            'reporte_aprendices': dir_datos_intermedios / f'SENA Mensual Nacional {mes_corto} {ANIO_TRABAJO}.xlsx'
+            'reporte_aprendices': dir_datos_intermedios / f'SENA Mensual Nacional {mes_corto} {ANIO_TRABAJO}.xlsx',
+            'reporte_aprendices_parquet': dir_datos_intermedios / f'SENA Mensual Nacional {mes_corto} {ANIO_TRABAJO}.parquet'
         },
 
         # ARCHIVOS FINALES
         'archivos_finales': {
-            'reporte_consolidado': dir_datos_finales / f'Reporte Consolidado Economía Naranja {mes_corto} {ANIO_TRABAJO}.xlsx'
+            'reporte_consolidado': dir_datos_finales / f'Reporte Consolidado Economía Naranja {mes_corto} {ANIO_TRABAJO}.xlsx',
+            # Parquet + CSV + manifest.json cuando FORMATO_SALIDA=datos
+            'datos_consolidado': dir_datos_finales / f'Reporte Consolidado Economía Naranja {mes_corto} {ANIO_TRABAJO}'
         },
 
         # SCRIPTS A EJECUTAR (rutas absolutas)
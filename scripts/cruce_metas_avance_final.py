@@ -1,246 +1,141 @@
+import os
 import pandas as pd
-import sqlite3
-
-# Archivos de entrada
-db_file = r'C:\ws\sena\data\metas\metas_sena_2025.db'
-excel_avance = r'C:\ws\sena\data\2025\09-Septiembre\PRIMER AVANCE CUPOS DE FORMACION SEPTIEMBRE 2025.xlsb'
-
-print("=== CRUCE METAS VS AVANCE SEPTIEMBRE 2025 ===\n")
-
-# Función para generar código DIVIPOLA
-def generar_divipola(codigo_regional):
-    """Genera código DIVIPOLA: código con cero a la izquierda + 000"""
-    codigo_str = str(int(codigo_regional)).zfill(2)
-    return f"{codigo_str}000"
-
-# 1. OBTENER METAS DESDE BASE DE DATOS
-print("1. Leyendo metas desde base de datos...")
-conn = sqlite3.connect(db_file)
-
-query_metas = """
-SELECT
-    r.codigo_regional,
-    r.nombre_regional,
-    MAX(CASE
-        WHEN c.subcategoria = 'Técnico Laboral Articulación con la Media'
-        THEN m.valor
-        ELSE 0
-    END) as meta_tecnico_articulacion,
-    MAX(CASE
-        WHEN c.subcategoria = 'TOTAL FORMACION TITULADA'
-        THEN m.valor
-        ELSE 0
-    END) as meta_formacion_titulada,
-    MAX(CASE
-        WHEN c.subcategoria = 'TOTAL FORMACION COMPLEMENTARIA'
-        THEN m.valor
-        ELSE 0
-    END) as meta_formacion_complementaria,
-    MAX(CASE
-        WHEN c.subcategoria = 'TOTAL FORMACION PROFESIONAL INTEGRAL'
-        THEN m.valor
-        ELSE 0
-    END) as meta_fpi_total,
-    MAX(CASE
-        WHEN c.subcategoria = 'Total Formación Profesional Integral - Virtual'
-        THEN m.valor
-        ELSE 0
-    END) as meta_fpi_virtual,
-    MAX(CASE
-        WHEN c.subcategoria = 'Total Programa de Bilingüismo'
-        THEN m.valor
-        ELSE 0
-    END) as meta_bilinguismo
-FROM
-    regionales r
-LEFT JOIN
-    metas_cupos m ON r.id_regional = m.id_regional
-LEFT JOIN
-    categorias_formacion c ON m.id_categoria = c.id_categoria
-WHERE
-    m.anio = 2025
-    AND c.subcategoria IN (
-        'Técnico Laboral Articulación con la Media',
-        'TOTAL FORMACION TITULADA',
-        'TOTAL FORMACION COMPLEMENTARIA',
-        'TOTAL FORMACION PROFESIONAL INTEGRAL',
-        'Total Formación Profesional Integral - Virtual',
-        'Total Programa de Bilingüismo'
+from configuracion import (ANIO_TRABAJO, MESES, HOJAS_AVANCE_CUPOS, MAPEO_AVANCE_CUPOS,
+                           COLUMNAS_CUPOS_DISPONIBLES, BD_HISTORICO_CUPOS)
+from motor_cupos import leer_avance_cupos, cruzar_metas_avance
+from historico_cupos import registrar_mes
+from divipola import clave_divipola, formatear_divipola
+from artefactos import publicar
+
+# Archivos de entrada (el orquestador pasa las rutas del mes por variables de entorno)
+db_file = os.environ.get('BD_METAS', r'C:\ws\sena\data\metas\metas_sena_2025.db')
+excel_avance = os.environ.get('ARCHIVO_AVANCE', r'C:\ws\sena\data\2025\09-Septiembre\PRIMER AVANCE CUPOS DE FORMACION SEPTIEMBRE 2025.xlsb')
+
+# Mes del corte (para el histórico de cupos)
+mes_trabajo = os.environ.get('MES_TRABAJO', 'SEPTIEMBRE').upper()
+bd_historico = os.environ.get('BD_HISTORICO_CUPOS', str(BD_HISTORICO_CUPOS))
+
+# Archivos de salida
+output_parquet = os.environ.get('ARCHIVO_SALIDA', r'C:\ws\sena\data\metas\cupos_disponibles_por_regional_2025.parquet')
+output_csv = os.environ.get('ARCHIVO_SALIDA_CSV', os.path.splitext(output_parquet)[0] + '.csv')
+
+
+def calcular_cupos_disponibles(db_file, excel_avance, mes_trabajo, bd_historico, output_parquet, output_csv):
+    """
+    Cruza metas y avance, exporta los cupos disponibles y registra el histórico
+
+    Args:
+        db_file (str | Path): Base de datos de metas
+        excel_avance (str | Path): PRIMER AVANCE CUPOS DE FORMACION (.xlsb)
+        mes_trabajo (str): Mes del corte (clave de MESES)
+        bd_historico (str | Path): Base de datos del histórico de cupos
+        output_parquet, output_csv (str | Path): Archivos de salida
+
+    Returns:
+        DataFrame: Cupos disponibles por regional
+    """
+    print(f"=== CRUCE METAS VS AVANCE {mes_trabajo} {ANIO_TRABAJO} ===\n")
+
+    # 1. LEER DATOS DE AVANCE
+    print("1. Leyendo avances desde archivo XLSB...")
+
+    # El libro se abre una sola vez y de cada hoja se decodifican solo las
+    # columnas declaradas en MAPEO_AVANCE_CUPOS (configuracion.py)
+    print(f"   - Leyendo {', '.join(h.strip() for h in HOJAS_AVANCE_CUPOS)}...")
+    hojas_avance = leer_avance_cupos(excel_avance, HOJAS_AVANCE_CUPOS, MAPEO_AVANCE_CUPOS)
+    print("   [OK] Todos los avances leidos")
+
+    # 2. CRUZAR METAS Y AVANCES PARA TODAS LAS CATEGORÍAS
+    print("\n2. Cruzando metas y avances (todas las categorías)...")
+    cruce = cruzar_metas_avance(db_file, ANIO_TRABAJO, hojas_avance, MAPEO_AVANCE_CUPOS)
+
+    print(f"   {len(cruce['regionales'])} regionales cargadas")
+    print(f"   {cruce['meta'].shape[1]} categorías de metas, {len(MAPEO_AVANCE_CUPOS)} con fuente de avance")
+
+    # 3. PREPARAR DATAFRAME FINAL
+    print("\n3. Preparando resultado final...")
+
+    # Las columnas del reporte son una vista sobre la matriz de cupos disponibles
+    df_final = pd.DataFrame({
+        'Código Regional': cruce['regionales']['codigo_regional'],
+        'Nombre de la Regional': cruce['regionales']['nombre_regional'],
+        # El código regional es el del departamento: DIVIPOLA = código + 000
+        'Código DIVIPOLA DANE': formatear_divipola(clave_divipola(cruce['regionales']['codigo_regional']))
+    })
+    for nombre_columna, subcategoria in COLUMNAS_CUPOS_DISPONIBLES:
+        df_final[nombre_columna] = cruce['disponible'][subcategoria].to_numpy().astype(int)
+
+    # 4. EXPORTAR RESULTADOS
+    print("\n4. Exportando resultados...")
+
+    # Artefacto para el consolidado (Parquet: columnas tipadas, sin pasar por Excel)
+    publicar(df_final, output_parquet)
+
+    # Exportar a CSV
+    df_final.to_csv(output_csv, index=False, encoding='utf-8-sig')
+
+    print(f"\n[OK] Resultados exportados:")
+    print(f"   - Parquet: {output_parquet}")
+    print(f"   - CSV: {output_csv}")
+
+    # Registrar el corte en el histórico (meta, avance, disponible y % por categoría)
+    filas_historico = registrar_mes(bd_historico, ANIO_TRABAJO, MESES[mes_trabajo]['numero'], cruce)
+    print(f"   - Histórico: {filas_historico} registros de {mes_trabajo} {ANIO_TRABAJO} en {bd_historico}")
+
+    # 5. MOSTRAR RESULTADOS
+    print("\n" + "="*120)
+    print(f"CUPOS DISPONIBLES POR REGIONAL - {mes_trabajo} {ANIO_TRABAJO}")
+    print("="*120)
+    print(df_final.to_string(index=False))
+
+    # 6. TOTALES
+    print("\n" + "="*120)
+    print("TOTALES NACIONALES DE CUPOS DISPONIBLES")
+    print("-"*120)
+
+    totales = df_final.select_dtypes(include=['int64', 'float64']).sum()
+    print(f"Cupos Doble Titulación:                           {totales['Cupos Doble Titulación']:>15,}")
+    print(f"Cupos en formación titulada:                      {totales['Cupos en formación titulada']:>15,}")
+    print(f"Cupos en formación complementaria:                {totales['Cupos en formación complementaria']:>15,}")
+    print(f"Total Cupos en formación profesional integral:   {totales['Total Cupos en formación profesional integral']:>15,}")
+    print(f"Cupos de virtualidad:                             {totales['Cupos de virtualidad']:>15,}")
+    print(f"Cupos en Bilingüismo:                             {totales['Cupos en Bilingüismo']:>15,}")
+
+    # % de cumplimiento nacional (AVANCE / META) de las categorías con fuente de avance
+    print("\n" + "-"*120)
+    print("% CUMPLIMIENTO NACIONAL (AVANCE / META)")
+    print("-"*120)
+    meta_nacional = cruce['meta'].sum()
+    avance_nacional = cruce['avance'].sum(min_count=1)
+    for _, _, subcategoria in MAPEO_AVANCE_CUPOS:
+        if meta_nacional[subcategoria] > 0:
+            print(f"{subcategoria + ':':<50}{avance_nacional[subcategoria] / meta_nacional[subcategoria]:>15.1%}")
+
+    print("\nProceso completado exitosamente!")
+
+    return df_final
+
+
+def ejecutar(config):
+    """
+    Punto de entrada del paso 6 para el orquestador (ejecución en proceso)
+
+    Args:
+        config (dict): Configuración del mes (configuracion.obtener_config_mes)
+
+    Returns:
+        bool: True si el cruce terminó
+    """
+    calcular_cupos_disponibles(
+        config['archivos_intermedios']['bd_metas'],
+        config['archivos_trabajo']['avance_cupos'],
+        config['mes_nombre'].upper(),
+        os.environ.get('BD_HISTORICO_CUPOS', str(BD_HISTORICO_CUPOS)),
+        config['archivos_intermedios']['cupos_disponibles_parquet'],
+        config['archivos_intermedios']['cupos_disponibles_csv']
     )
-GROUP BY
-    r.codigo_regional,
-    r.nombre_regional
-ORDER BY
-    r.codigo_regional
-"""
-
-df_metas = pd.read_sql_query(query_metas, conn)
-conn.close()
-
-# Agregar código DIVIPOLA
-df_metas['codigo_divipola'] = df_metas['codigo_regional'].apply(generar_divipola)
-
-print(f"   {len(df_metas)} regionales cargadas")
-
-# 2. LEER DATOS DE AVANCE
-print("\n2. Leyendo avances desde archivo XLSB...")
-
-# 2.1 TEC ARTIC REG - Columna F (TOTAL)
-print("   - Leyendo TEC ARTIC REG...")
-df_tec_artic = pd.read_excel(excel_avance, sheet_name='TEC ARTIC REG', engine='pyxlsb', header=5)
-# La columna TOTAL está en la columna 5 (índice 5)
-df_tec_artic.columns = ['codigo_regional', 'nombre_regional', 'masculino', 'femenino', 'no_binario', 'total']
-df_tec_artic = df_tec_artic[['codigo_regional', 'total']].copy()
-df_tec_artic = df_tec_artic[df_tec_artic['codigo_regional'].notna()]
-# Convertir a numérico y filtrar filas no válidas
-df_tec_artic['codigo_regional'] = pd.to_numeric(df_tec_artic['codigo_regional'], errors='coerce')
-df_tec_artic = df_tec_artic[df_tec_artic['codigo_regional'].notna()].copy()
-df_tec_artic['codigo_regional'] = df_tec_artic['codigo_regional'].astype(int)
-df_tec_artic['total'] = pd.to_numeric(df_tec_artic['total'], errors='coerce').fillna(0).astype(int)
-df_tec_artic.rename(columns={'total': 'avance_tec_articulacion'}, inplace=True)
-
-# 2.2 NIVEL REGIONAL - Columnas AW (48), BO (66), BU (72)
-print("   - Leyendo NIVEL REGIONAL...")
-df_nivel = pd.read_excel(excel_avance, sheet_name='NIVEL REGIONAL ', engine='pyxlsb', header=6)
-
-# Extraer código regional (columna 0) y las columnas de interés
-# AW = columna 48, BO = columna 66, BU = columna 72
-df_nivel_extract = pd.DataFrame({
-    'codigo_regional': df_nivel.iloc[:, 0],
-    'avance_formacion_titulada': df_nivel.iloc[:, 48],  # Columna AW
-    'avance_formacion_complementaria': df_nivel.iloc[:, 66],  # Columna BO
-    'avance_fpi_total': df_nivel.iloc[:, 72]  # Columna BU
-})
-
-# Limpiar datos
-df_nivel_extract = df_nivel_extract[df_nivel_extract['codigo_regional'].notna()].copy()
-df_nivel_extract['codigo_regional'] = pd.to_numeric(df_nivel_extract['codigo_regional'], errors='coerce')
-df_nivel_extract = df_nivel_extract[df_nivel_extract['codigo_regional'].notna()]
-df_nivel_extract['codigo_regional'] = df_nivel_extract['codigo_regional'].astype(int)
-
-# Convertir valores a numéricos
-for col in ['avance_formacion_titulada', 'avance_formacion_complementaria', 'avance_fpi_total']:
-    df_nivel_extract[col] = pd.to_numeric(df_nivel_extract[col], errors='coerce').fillna(0)
-
-# 2.3 VIRTUAL GENER REG - Columna F (TOTAL)
-print("   - Leyendo VIRTUAL GENER REG...")
-df_virtual = pd.read_excel(excel_avance, sheet_name='VIRTUAL GENER REG', engine='pyxlsb', header=6)
-# Buscar las columnas correctas
-df_virtual_extract = pd.DataFrame({
-    'codigo_regional': df_virtual.iloc[:, 0],
-    'avance_fpi_virtual': df_virtual.iloc[:, 5]  # Columna F (índice 5)
-})
-df_virtual_extract = df_virtual_extract[df_virtual_extract['codigo_regional'].notna()].copy()
-df_virtual_extract['codigo_regional'] = pd.to_numeric(df_virtual_extract['codigo_regional'], errors='coerce')
-df_virtual_extract = df_virtual_extract[df_virtual_extract['codigo_regional'].notna()]
-df_virtual_extract['codigo_regional'] = df_virtual_extract['codigo_regional'].astype(int)
-df_virtual_extract['avance_fpi_virtual'] = pd.to_numeric(df_virtual_extract['avance_fpi_virtual'], errors='coerce').fillna(0)
-
-# 2.4 BILINGÜISMO REG - Columna F (TOTAL)
-print("   - Leyendo BILINGÜISMO REG...")
-df_bilinguismo = pd.read_excel(excel_avance, sheet_name='BILINGÜISMO REG', engine='pyxlsb', header=6)
-df_bilinguismo_extract = pd.DataFrame({
-    'codigo_regional': df_bilinguismo.iloc[:, 0],
-    'avance_bilinguismo': df_bilinguismo.iloc[:, 5]  # Columna F (índice 5)
-})
-df_bilinguismo_extract = df_bilinguismo_extract[df_bilinguismo_extract['codigo_regional'].notna()].copy()
-df_bilinguismo_extract['codigo_regional'] = pd.to_numeric(df_bilinguismo_extract['codigo_regional'], errors='coerce')
-df_bilinguismo_extract = df_bilinguismo_extract[df_bilinguismo_extract['codigo_regional'].notna()]
-df_bilinguismo_extract['codigo_regional'] = df_bilinguismo_extract['codigo_regional'].astype(int)
-df_bilinguismo_extract['avance_bilinguismo'] = pd.to_numeric(df_bilinguismo_extract['avance_bilinguismo'], errors='coerce').fillna(0)
-
-print("   [OK] Todos los avances leidos")
-
-# 3. COMBINAR DATOS
-print("\n3. Combinando metas y avances...")
-
-resultado = df_metas.copy()
-
-# Merge con cada fuente de avance
-resultado = resultado.merge(df_tec_artic, on='codigo_regional', how='left')
-resultado = resultado.merge(df_nivel_extract, on='codigo_regional', how='left')
-resultado = resultado.merge(df_virtual_extract, on='codigo_regional', how='left')
-resultado = resultado.merge(df_bilinguismo_extract, on='codigo_regional', how='left')
-
-# Llenar NaN con 0
-cols_avance = ['avance_tec_articulacion', 'avance_formacion_titulada',
-               'avance_formacion_complementaria', 'avance_fpi_total',
-               'avance_fpi_virtual', 'avance_bilinguismo']
-
-for col in cols_avance:
-    resultado[col] = resultado[col].fillna(0).astype(int)
-
-# 4. CALCULAR CUPOS DISPONIBLES (META - AVANCE)
-print("\n4. Calculando cupos disponibles...")
-
-resultado['Cupos Doble Titulación'] = resultado['meta_tecnico_articulacion'] - resultado['avance_tec_articulacion']
-resultado['Cupos en formación titulada'] = resultado['meta_formacion_titulada'] - resultado['avance_formacion_titulada']
-resultado['Cupos en formación complementaria'] = resultado['meta_formacion_complementaria'] - resultado['avance_formacion_complementaria']
-resultado['Total Cupos en formación profesional integral'] = resultado['meta_fpi_total'] - resultado['avance_fpi_total']
-resultado['Cupos de virtualidad'] = resultado['meta_fpi_virtual'] - resultado['avance_fpi_virtual']
-resultado['Cupos en Bilingüismo'] = resultado['meta_bilinguismo'] - resultado['avance_bilinguismo']
-
-# 5. PREPARAR DATAFRAME FINAL
-print("\n5. Preparando resultado final...")
-
-# Seleccionar y renombrar columnas según especificación
-df_final = resultado[[
-    'codigo_regional',
-    'nombre_regional',
-    'codigo_divipola',
-    'Cupos Doble Titulación',
-    'Cupos en formación titulada',
-    'Cupos en formación complementaria',
-    'Total Cupos en formación profesional integral',
-    'Cupos de virtualidad',
-    'Cupos en Bilingüismo'
-]].copy()
-
-# Renombrar columnas finales
-df_final.columns = [
-    'Código Regional',
-    'Nombre de la Regional',
-    'Código DIVIPOLA DANE',
-    'Cupos Doble Titulación',
-    'Cupos en formación titulada',
-    'Cupos en formación complementaria',
-    'Total Cupos en formación profesional integral',
-    'Cupos de virtualidad',
-    'Cupos en Bilingüismo'
-]
-
-# 6. EXPORTAR RESULTADOS
-print("\n6. Exportando resultados...")
-
-# Exportar a Excel
-output_excel = r'C:\ws\sena\data\metas\cupos_disponibles_por_regional_2025.xlsx'
-df_final.to_excel(output_excel, index=False, sheet_name='Cupos Disponibles')
-
-# Exportar a CSV
-output_csv = r'C:\ws\sena\data\metas\cupos_disponibles_por_regional_2025.csv'
-df_final.to_csv(output_csv, index=False, encoding='utf-8-sig')
-
-print(f"\n[OK] Resultados exportados:")
-print(f"   - Excel: {output_excel}")
-print(f"   - CSV: {output_csv}")
-
-# 7. MOSTRAR RESULTADOS
-print("\n" + "="*120)
-print("CUPOS DISPONIBLES POR REGIONAL - SEPTIEMBRE 2025")
-print("="*120)
-print(df_final.to_string(index=False))
-
-# 8. TOTALES
-print("\n" + "="*120)
-print("TOTALES NACIONALES DE CUPOS DISPONIBLES")
-print("-"*120)
-
-totales = df_final.select_dtypes(include=['int64', 'float64']).sum()
-print(f"Cupos Doble Titulación:                           {totales['Cupos Doble Titulación']:>15,}")
-print(f"Cupos en formación titulada:                      {totales['Cupos en formación titulada']:>15,}")
-print(f"Cupos en formación complementaria:                {totales['Cupos en formación complementaria']:>15,}")
-print(f"Total Cupos en formación profesional integral:   {totales['Total Cupos en formación profesional integral']:>15,}")
-print(f"Cupos de virtualidad:                             {totales['Cupos de virtualidad']:>15,}")
-print(f"Cupos en Bilingüismo:                             {totales['Cupos en Bilingüismo']:>15,}")
-
-print("\nProceso completado exitosamente!")
+    return True
+
+
+if __name__ == '__main__':
+    calcular_cupos_disponibles(db_file, excel_avance, mes_trabajo, bd_historico, output_parquet, output_csv)
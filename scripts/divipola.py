@@ -0,0 +1,74 @@
+"""
+Códigos DIVIPOLA (DANE)
+
+Genera los códigos DIVIPOLA de departamentos y municipios sobre columnas
+completas, sin recorrer fila por fila:
+
+- clave entera canónica: departamento * 1000 + municipio (05001 -> 5001).
+  Es la que se usa para cruzar tablas.
+- código de texto de 5 dígitos con ceros a la izquierda ('05001'), que es
+  el que se muestra en los reportes. Los departamentos terminan en '000'.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _a_entero(codigos):
+    """Convierte códigos a enteros (Int64), truncando decimales; lo inválido queda en NA"""
+    numeros = pd.to_numeric(pd.Series(codigos), errors='coerce')
+    return np.trunc(numeros).astype('Int64')
+
+
+def clave_divipola(codigo_depto, codigo_mpio=0):
+    """
+    Calcula la clave DIVIPOLA entera
+
+    Args:
+        codigo_depto (Series | array-like): Códigos de departamento
+        codigo_mpio (Series | array-like | int): Códigos de municipio (3 dígitos).
+            0 para departamentos
+
+    Returns:
+        Series: Clave Int64 (NA si algún código no es numérico)
+    """
+    depto = _a_entero(codigo_depto)
+    if np.isscalar(codigo_mpio):
+        return depto * 1000 + int(codigo_mpio)
+    mpio = _a_entero(codigo_mpio)
+    mpio.index = depto.index
+    return depto * 1000 + mpio
+
+
+def formatear_divipola(clave):
+    """
+    Convierte claves DIVIPOLA enteras al código de texto de 5 dígitos
+
+    Args:
+        clave (Series): Claves de clave_divipola()
+
+    Returns:
+        Series: Códigos como texto ('05001'); '' donde la clave es NA
+    """
+    return clave.astype('string').str.zfill(5).fillna('').astype(object)
+
+
+def agregar_divipola(df, columna_depto='codigo_depto', columna_mpio=None):
+    """
+    Agrega al DataFrame las columnas clave_divipola y codigo_divipola
+
+    Args:
+        df (DataFrame): Datos con los códigos (se modifica en el lugar)
+        columna_depto (str): Columna con el código de departamento
+        columna_mpio (str): Columna con el código de municipio; si es None
+            se generan códigos de departamento (terminados en 000)
+
+    Returns:
+        DataFrame: El mismo df
+    """
+    mpio = 0 if columna_mpio is None else df[columna_mpio]
+    clave = clave_divipola(df[columna_depto], mpio)
+    clave.index = df.index
+    df['clave_divipola'] = clave
+    df['codigo_divipola'] = formatear_divipola(clave)
+    return df
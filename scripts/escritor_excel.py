@@ -0,0 +1,115 @@
+"""
+Escritura de reportes Excel en una sola pasada
+
+Escribe DataFrames con xlsxwriter en modo de memoria constante: cada fila se
+serializa en cuanto se escribe, con su formato ya aplicado, sin guardar el
+libro y volver a abrirlo para dar estilo celda por celda.
+"""
+
+import pandas as pd
+import xlsxwriter
+
+from trazas import traza, trazar
+
+# Formato de encabezado que pandas aplica por defecto en to_excel
+FORMATO_ENCABEZADO = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+
+# Filas de subtotal por departamento en los reportes de aprendices
+FORMATO_DEPARTAMENTO = {'bold': True, 'bg_color': '#F4B084', 'pattern': 1}
+
+
+def crear_libro(ruta):
+    """
+    Crea un libro xlsxwriter en modo de memoria constante
+
+    Los textos se escriben siempre como texto (no se convierten a fórmulas,
+    enlaces ni números), igual que con pandas.
+
+    Args:
+        ruta (str | Path): Archivo .xlsx de salida
+
+    Returns:
+        xlsxwriter.Workbook: Libro abierto (cerrar con .close())
+    """
+    return xlsxwriter.Workbook(str(ruta), {
+        'constant_memory': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+        'strings_to_numbers': False
+    })
+
+
+def _es_vacio(valor):
+    """True si la celda debe quedar en blanco"""
+    return valor is None or valor is pd.NA or valor == '' or (isinstance(valor, float) and valor != valor)
+
+
+def escribir_dataframe(hoja, df, formato_encabezado=None, formatos_fila=None):
+    """
+    Escribe un DataFrame fila por fila (encabezado en la fila 0)
+
+    Args:
+        hoja (xlsxwriter.Worksheet): Hoja destino
+        df (DataFrame): Datos a escribir (sin índice)
+        formato_encabezado (xlsxwriter.Format): Formato de la fila de encabezado
+        formatos_fila (array-like): Formato de cada fila de datos (o None);
+            se aplica también a las celdas vacías de esa fila
+
+    Returns:
+        int: Número de filas de datos escritas
+    """
+    with traza('escribir_hoja', hoja=hoja.name, filas=len(df)):
+        for columna, nombre in enumerate(df.columns):
+            hoja.write_string(0, columna, str(nombre), formato_encabezado)
+
+        filas = 0
+        for filas, valores in enumerate(df.itertuples(index=False, name=None), start=1):
+            formato = None if formatos_fila is None else formatos_fila[filas - 1]
+            for columna, valor in enumerate(valores):
+                if _es_vacio(valor):
+                    if formato is not None:
+                        hoja.write_blank(filas, columna, None, formato)
+                else:
+                    hoja.write(filas, columna, valor, formato)
+
+    return filas
+
+
+@trazar
+def escribir_hojas(ruta, hojas):
+    """
+    Escribe varias hojas con sus formatos en una sola sesión del libro
+
+    Args:
+        ruta (str | Path): Archivo .xlsx de salida
+        hojas (list[dict]): Una entrada por hoja, en orden, con las claves:
+            - nombre (str): Nombre de la hoja
+            - datos (DataFrame): Datos a escribir
+            - formato_encabezado (dict): Formato del encabezado (opcional,
+              por defecto FORMATO_ENCABEZADO)
+            - resaltar (array-like de bool): Filas a resaltar (opcional)
+            - formato_resaltado (dict): Formato de las filas resaltadas
+
+    Returns:
+        dict: Filas de datos escritas por nombre de hoja
+    """
+    libro = crear_libro(ruta)
+    filas = {}
+    try:
+        for hoja in hojas:
+            formato_encabezado = libro.add_format(hoja.get('formato_encabezado', FORMATO_ENCABEZADO))
+
+            formatos_fila = None
+            if hoja.get('resaltar') is not None:
+                formato_resaltado = libro.add_format(hoja['formato_resaltado'])
+                formatos_fila = [formato_resaltado if resaltar else None for resaltar in hoja['resaltar']]
+
+            filas[hoja['nombre']] = escribir_dataframe(
+                libro.add_worksheet(hoja['nombre']),
+                hoja['datos'],
+                formato_encabezado,
+                formatos_fila
+            )
+    finally:
+        libro.close()
+    return filas
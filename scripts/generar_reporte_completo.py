@@ -4,21 +4,49 @@ Script Maestro - Generación Completa del Reporte de Economía Naranja
 Este script orquesta todo el proceso de generación del reporte consolidado,
 desde la importación de datos hasta la generación del reporte final.
 
+Los pasos cuyas entradas, código y parámetros no cambiaron desde la última
+ejecución exitosa (y cuyas salidas existen) se omiten; ver memoizacion.py.
+
 Uso:
-    python generar_reporte_completo.py <MES>
+    python generar_reporte_completo.py <MES> [--subprocesos] [--force <PASO>] [--profile <PASO>]
+    python generar_reporte_completo.py --meses <MES,MES,...> [opciones]
+    python generar_reporte_completo.py --rango <MES:MES> [opciones]
+    python generar_reporte_completo.py --servicio [--puerto N]   # servicio residente (cliente_reportes.py)
 
 Ejemplo:
     python generar_reporte_completo.py SEPTIEMBRE
+    python generar_reporte_completo.py SEPTIEMBRE --subprocesos   # cada paso en su propio intérprete
+    python generar_reporte_completo.py SEPTIEMBRE --force 6       # repite el paso 6 y los que dependen de él (8)
+    python generar_reporte_completo.py SEPTIEMBRE --force todos   # repite todos los pasos
+    python generar_reporte_completo.py SEPTIEMBRE --profile 7     # ejecuta el paso 7 bajo cProfile
+    python generar_reporte_completo.py --rango JULIO:SEPTIEMBRE   # lote: varios meses en paralelo
 """
 
 import sys
+import argparse
+import cProfile
+import contextlib
+import hashlib
+import io
+import json
 import os
+import re
 import shutil
 import subprocess
+import time
 import sqlite3
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, as_completed, FIRST_COMPLETED
 from pathlib import Path
 from datetime import datetime
-from configuracion import obtener_config_mes, crear_directorios_mes, MESES
+from configuracion import (obtener_config_mes, crear_directorios_mes, validar_archivos_entrada, MESES,
+                           PASOS_EN_PARALELO, MODO_EJECUCION_PASOS, MESES_EN_PARALELO, DIR_COMPARTIDO,
+                           BD_CATALOGO_DIVIPOLA, BD_HISTORIAL_EJECUCIONES, PUERTO_SERVICIO)
+from memoizacion import RegistroPasos, sha256_archivo, version_codigo
+import historial_ejecuciones
+from trazas import traza
+from perfiles import guardar_perfil, imprimir_funciones_costosas
 
 # ============================================
 # FUNCIONES AUXILIARES
@@ -31,7 +59,28 @@ def log_paso(numero, total, mensaje):
     print(f"{'='*70}")
 
 
-def ejecutar_comando(comando, descripcion, check=True, env=None):
+# Subprocesos en ejecución (para detenerlos si otra rama del proceso falla)
+_procesos_activos = set()
+_lock_procesos = threading.Lock()
+_cancelado = threading.Event()
+
+# Archivo .pstats del subproceso del paso que se está perfilando en este hilo (--profile)
+_perfil_por_hilo = threading.local()
+# cProfile admite un solo perfil activo a la vez (en Python 3.12+ es global
+# al proceso): los pasos perfilados se ejecutan de a uno
+_lock_perfil = threading.Lock()
+
+
+def terminar_procesos_activos():
+    """Termina los subprocesos de los pasos que siguen en ejecución y no deja iniciar más"""
+    with _lock_procesos:
+        _cancelado.set()
+        for proceso in _procesos_activos:
+            if proceso.poll() is None:
+                proceso.terminate()
+
+
+def ejecutar_comando(comando, descripcion, check=True, env=None, cwd=None):
     """
     Ejecuta un comando del sistema y maneja errores
 
@@ -40,23 +89,44 @@ def ejecutar_comando(comando, descripcion, check=True, env=None):
         descripcion (str): Descripción del comando
         check (bool): Si True, lanza excepción en caso de error
         env (dict): Variables de entorno adicionales
+        cwd (Path): Directorio de trabajo del comando (el del proceso
+            principal no se modifica)
 
     Returns:
         bool: True si exitoso, False si falló
     """
+    # Paso perfilado: el script corre bajo cProfile y deja su .pstats
+    ruta_perfil = getattr(_perfil_por_hilo, 'ruta', None)
+    if ruta_perfil is not None and comando[0] == 'python':
+        comando = ['python', '-m', 'cProfile', '-o', str(ruta_perfil), *comando[1:]]
+
     print(f"\n→ {descripcion}")
     print(f"  Comando: {' '.join(str(c) for c in comando)}")
 
     try:
-        result = subprocess.run(
+        proceso = subprocess.Popen(
             comando,
-            check=check,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
             encoding='utf-8',
             errors='replace',
-            env=env
+            env=env,
+            cwd=cwd
         )
+        with _lock_procesos:
+            _procesos_activos.add(proceso)
+            if _cancelado.is_set():
+                proceso.terminate()
+        try:
+            stdout, stderr = proceso.communicate()
+        finally:
+            with _lock_procesos:
+                _procesos_activos.discard(proceso)
+
+        result = subprocess.CompletedProcess(comando, proceso.returncode, stdout, stderr)
+        if check and result.returncode != 0:
+            raise subprocess.CalledProcessError(result.returncode, comando, output=stdout, stderr=stderr)
 
         if result.returncode == 0:
             print(f"✓ {descripcion} - EXITOSO")
@@ -99,25 +169,239 @@ def ejecutar_comando(comando, descripcion, check=True, env=None):
         return False
 
 
-def copiar_archivo(origen, destino, descripcion):
-    """Copia un archivo con validación"""
-    print(f"\n→ Copiando {descripcion}")
+class _SalidaPorHilo:
+    """
+    Reemplazo de sys.stdout que envía lo que imprime cada hilo a su propio
+    buffer mientras ese hilo está capturando; el resto va a la salida original
+
+    Permite ejecutar pasos en paralelo dentro del mismo proceso sin que sus
+    mensajes se mezclen en la consola.
+    """
+
+    def __init__(self, original):
+        self._original = original
+        self._local = threading.local()
+
+    def capturar(self):
+        self._local.buffer = io.StringIO()
+
+    def liberar(self):
+        buffer, self._local.buffer = self._local.buffer, None
+        return buffer.getvalue()
+
+    def write(self, texto):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer if buffer is not None else self._original).write(texto)
+
+    def flush(self):
+        self._original.flush()
+
+    def __getattr__(self, nombre):
+        return getattr(self._original, nombre)
+
+
+_lock_salida = threading.Lock()
+
+
+def _salida_por_hilo():
+    """Instala (una sola vez) la captura de salida por hilo en sys.stdout"""
+    with _lock_salida:
+        if not isinstance(sys.stdout, _SalidaPorHilo):
+            sys.stdout = _SalidaPorHilo(sys.stdout)
+        return sys.stdout
+
+
+def ejecutar_en_proceso(funcion, config, descripcion):
+    """
+    Ejecuta el punto de entrada ejecutar(config) de un script en este proceso
+
+    La salida del paso se captura y se muestra igual que en ejecutar_comando
+    (últimas 10 líneas si termina bien, completa si falla).
+
+    Args:
+        funcion (callable): Función ejecutar(config) del script
+        config (dict): Configuración del mes
+        descripcion (str): Descripción del paso
+
+    Returns:
+        bool: True si exitoso, False si falló
+    """
+    print(f"\n→ {descripcion}")
+    print(f"  En proceso: {funcion.__module__}.{funcion.__name__}(config)")
+
+    if _cancelado.is_set():
+        print(f"✗ {descripcion} - CANCELADO")
+        return False
+
+    salida = _salida_por_hilo()
+    salida.capturar()
+    error = None
+    try:
+        resultado = funcion(config)
+    except SystemExit as e:
+        resultado = e.code in (None, 0)
+        if not resultado:
+            error = f"SystemExit({e.code})"
+    except Exception:
+        resultado = False
+        error = traceback.format_exc()
+    finally:
+        stdout = salida.liberar()
+
+    if resultado is not False:
+        print(f"✓ {descripcion} - EXITOSO")
+        if stdout:
+            # Mostrar solo las últimas 10 líneas de output
+            lineas = stdout.strip().split('\n')
+            if len(lineas) > 10:
+                print("  [...]")
+                lineas = lineas[-10:]
+            for linea in lineas:
+                print(f"  {linea}")
+        return True
+
+    print(f"✗ {descripcion} - FALLÓ")
+    if stdout:
+        print(f"\n  STDOUT:")
+        for linea in stdout.strip().split('\n'):
+            print(f"    {linea}")
+    if error:
+        print(f"\n  ERROR:")
+        for linea in error.strip().split('\n'):
+            print(f"    {linea}")
+    return False
+
+
+def en_proceso(config):
+    """True si los pasos deben ejecutarse dentro de este proceso"""
+    return config.get('modo_ejecucion', MODO_EJECUCION_PASOS) == 'proceso'
+
+
+def _reflink(origen, destino):
+    """Copia copy-on-write (ioctl FICLONE de Linux); lanza OSError si el sistema de archivos no lo permite"""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("reflink no disponible en este sistema operativo")
+
+    FICLONE = 0x40049409
+    try:
+        with open(origen, 'rb') as f_origen, open(destino, 'wb') as f_destino:
+            fcntl.ioctl(f_destino.fileno(), FICLONE, f_origen.fileno())
+    except OSError:
+        destino.unlink(missing_ok=True)
+        raise
+    shutil.copystat(origen, destino)
+
+
+def copiar_archivo(origen, destino, descripcion, estrategia='copia'):
+    """
+    Deja un archivo de entrada en el directorio del mes, con validación
+
+    Args:
+        origen (Path): Archivo fuente
+        destino (Path): Ruta en datos_intermedios
+        descripcion (str): Descripción del archivo
+        estrategia (str): 'copia', 'hardlink' o 'reflink'. Si el enlace o el
+            reflink no son posibles (otro volumen, sistema de archivos sin
+            soporte) se hace una copia real
+
+    Returns:
+        str: Método usado ('copia', 'hardlink' o 'reflink'), o None si falló
+    """
+    print(f"\n→ Copiando {descripcion} ({estrategia})")
     print(f"  Origen: {origen}")
     print(f"  Destino: {destino}")
 
     if not origen.exists():
         print(f"✗ Archivo origen no existe")
-        return False
+        return None
 
     try:
         destino.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(origen, destino)
+        # Un destino previo puede ser un enlace al mismo origen: se reemplaza
+        if destino.exists() or destino.is_symlink():
+            destino.unlink()
+
+        metodo = 'copia'
+        if estrategia in ('hardlink', 'reflink'):
+            try:
+                if estrategia == 'hardlink':
+                    os.link(origen, destino)
+                else:
+                    _reflink(origen, destino)
+                metodo = estrategia
+            except OSError as e:
+                print(f"  [ADVERTENCIA] {estrategia} no disponible ({e}); se hace una copia")
+        if metodo == 'copia':
+            shutil.copy2(origen, destino)
+
         tamano_mb = destino.stat().st_size / (1024 * 1024)
-        print(f"✓ Archivo copiado ({tamano_mb:.1f} MB)")
-        return True
+        if metodo == 'copia':
+            print(f"✓ Archivo copiado ({tamano_mb:.1f} MB)")
+        else:
+            print(f"✓ Archivo enlazado con {metodo} ({tamano_mb:.1f} MB sin espacio adicional)")
+        return metodo
     except Exception as e:
         print(f"✗ Error al copiar archivo: {e}")
-        return False
+        return None
+
+
+def escribir_manifiesto_entradas(config, metodos):
+    """
+    Registra los archivos de entrada del mes con su hash (trazabilidad)
+
+    El hash SHA-256 de un archivo se reutiliza del manifiesto anterior si su
+    tamaño y fecha de modificación no cambiaron.
+
+    Args:
+        config (dict): Configuración del mes
+        metodos (dict): Método usado por cada archivo de entrada
+
+    Returns:
+        Path: Ruta del manifiesto
+    """
+    ruta = config['archivos_intermedios']['manifiesto_entradas']
+
+    anteriores = {}
+    if ruta.exists():
+        try:
+            with open(ruta, encoding='utf-8') as f:
+                anteriores = json.load(f).get('archivos', {})
+        except (OSError, ValueError):
+            anteriores = {}
+
+    archivos = {}
+    for clave, metodo in metodos.items():
+        origen = config['archivos_entrada'][clave]
+        estado = origen.stat()
+        anterior = anteriores.get(clave, {})
+        if (anterior.get('origen') == str(origen) and anterior.get('tamano') == estado.st_size
+                and anterior.get('mtime_ns') == estado.st_mtime_ns):
+            sha256 = anterior['sha256']
+        else:
+            sha256 = sha256_archivo(origen)
+
+        archivos[clave] = {
+            'origen': str(origen),
+            'ruta_trabajo': str(config['archivos_trabajo'][clave]),
+            'metodo': metodo,
+            'tamano': estado.st_size,
+            'modificado': datetime.fromtimestamp(estado.st_mtime).isoformat(timespec='seconds'),
+            'mtime_ns': estado.st_mtime_ns,
+            'sha256': sha256
+        }
+
+    manifiesto = {
+        'mes': config['mes_nombre'],
+        'anio': config['anio'],
+        'generado': datetime.now().isoformat(timespec='seconds'),
+        'estrategia': config['estrategia_copia'],
+        'archivos': archivos
+    }
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+    return ruta
 
 
 # ============================================
@@ -140,56 +424,60 @@ def paso_2_copiar_archivos_entrada(config):
     """PASO 2: Copiar archivos de entrada al directorio del mes"""
     log_paso(2, 8, "Copiar archivos de entrada")
 
-    # Copiar archivos de entrada a datos_intermedios para trazabilidad
+    # Dejar los archivos de entrada en datos_intermedios (copia, hardlink o
+    # reflink) o solo registrarlos; el manifiesto guarda el hash de cada uno
     archivos = config['archivos_entrada']
-    dir_destino = config['dir_datos_intermedios']
+    estrategia = config['estrategia_copia']
+    print(f"\n→ Estrategia de copia: {estrategia}")
 
     todo_ok = True
+    metodos = {}
+
+    for clave, descripcion in [('pe04_formacion', "PE-04 Formación"),
+                               ('avance_cupos', "Avance Cupos"),
+                               ('avance_aprendices', "Avance Aprendices"),
+                               ('metas_sena', "Metas SENA")]:
+        destino = config['archivos_trabajo'][clave]
+
+        if estrategia == 'manifiesto':
+            if not archivos[clave].exists():
+                print(f"\n✗ {descripcion} no existe: {archivos[clave]}")
+                todo_ok = False
+                continue
+            metodos[clave] = 'manifiesto'
+        elif clave == 'metas_sena' and destino.exists():
+            # Metas SENA es anual (no se copia de nuevo si ya existe)
+            print(f"\n→ Metas SENA ya existe en destino (omitiendo copia)")
+            metodos[clave] = 'existente'
+        else:
+            metodos[clave] = copiar_archivo(archivos[clave], destino, descripcion, estrategia)
+            todo_ok &= metodos[clave] is not None
 
-    # Copiar PE-04 Formación
-    todo_ok &= copiar_archivo(
-        archivos['pe04_formacion'],
-        dir_destino / archivos['pe04_formacion'].name,
-        "PE-04 Formación"
-    )
-
-    # Copiar Avance Cupos
-    todo_ok &= copiar_archivo(
-        archivos['avance_cupos'],
-        dir_destino / archivos['avance_cupos'].name,
-        "Avance Cupos"
-    )
-
-    # Copiar Avance Aprendices
-    todo_ok &= copiar_archivo(
-        archivos['avance_aprendices'],
-        dir_destino / archivos['avance_aprendices'].name,
-        "Avance Aprendices"
-    )
-
-    # Copiar Metas SENA (si no existe ya)
-    metas_destino = dir_destino / archivos['metas_sena'].name
-    if not metas_destino.exists():
-        todo_ok &= copiar_archivo(
-            archivos['metas_sena'],
-            metas_destino,
-            "Metas SENA"
-        )
-    else:
-        print(f"\n→ Metas SENA ya existe en destino (omitiendo copia)")
+    if not todo_ok:
+        return False
 
-    return todo_ok
+    ruta = escribir_manifiesto_entradas(config, metodos)
+    print(f"\n✓ Manifiesto de entradas (hash SHA-256): {ruta.name}")
+    return True
 
 
 def paso_3_generar_bd_formacion(config):
     """PASO 3: Generar base de datos de formación"""
     log_paso(3, 8, "Generar base de datos de formación")
 
+    if en_proceso(config):
+        import importar_pe_04_mes
+        return ejecutar_en_proceso(
+            importar_pe_04_mes.ejecutar, config,
+            f"Importar datos de PE-04 para {config['mes_nombre']}"
+        )
+
     # Ejecutar script de importación con directorio y mes como parámetros
     return ejecutar_comando(
         ['python', str(config['scripts']['importar_pe04']),
          str(config['dir_datos_intermedios']),
-         config['mes_nombre']],
+         config['mes_nombre'],
+         str(config['archivos_trabajo']['pe04_formacion'])],
         f"Importar datos de PE-04 para {config['mes_nombre']}",
         check=True
     )
@@ -248,154 +536,683 @@ def paso_5_generar_bd_metas(config):
     """PASO 5: Generar base de datos de metas"""
     log_paso(5, 8, "Generar base de datos de metas")
 
-    # Preparar variables de entorno
+    bd_compartida = config.get('compartidos', {}).get('bd_metas')
+    if bd_compartida:
+        # Modo por lotes: las metas ya se normalizaron una sola vez para todo el lote
+        return copiar_archivo(Path(bd_compartida), config['archivos_intermedios']['bd_metas'],
+                              "BD de metas normalizada (compartida por el lote)") is not None
+
+    if en_proceso(config):
+        import normalizar_metas_sena
+        return ejecutar_en_proceso(normalizar_metas_sena.ejecutar, config, "Normalizar metas SENA")
+
+    # Preparar variables de entorno (rutas del mes: el script no usa directorios fijos)
     env = os.environ.copy()
-    env['ARCHIVO_METAS'] = str(config['dir_datos_intermedios'] / config['archivos_entrada']['metas_sena'].name)
+    env['ARCHIVO_METAS'] = str(config['archivos_trabajo']['metas_sena'])
     env['BD_SALIDA'] = str(config['archivos_intermedios']['bd_metas'])
 
-    # Cambiar al directorio de metas para ejecutar el script
-    cwd_original = os.getcwd()
-    os.chdir(config['scripts']['normalizar_metas'].parent)
-
-    try:
-        resultado = ejecutar_comando(
-            ['python', 'normalizar_metas_sena.py'],
-            "Normalizar metas SENA",
-            check=True
-        )
-        return resultado
-    finally:
-        os.chdir(cwd_original)
+    return ejecutar_comando(
+        ['python', str(config['scripts']['normalizar_metas'])],
+        "Normalizar metas SENA",
+        check=True,
+        env=env
+    )
 
 
 def paso_6_calcular_cupos_disponibles(config):
     """PASO 6: Calcular cupos disponibles"""
     log_paso(6, 8, "Calcular cupos disponibles (META - AVANCE)")
 
-    # Preparar variables de entorno
+    if en_proceso(config):
+        import cruce_metas_avance_final
+        return ejecutar_en_proceso(cruce_metas_avance_final.ejecutar, config, "Calcular cupos disponibles")
+
+    # Preparar variables de entorno (el script escribe directamente en datos_intermedios)
     env = os.environ.copy()
     env['BD_METAS'] = str(config['archivos_intermedios']['bd_metas'])
-    env['ARCHIVO_AVANCE'] = str(config['dir_datos_intermedios'] / config['archivos_entrada']['avance_cupos'].name)
-    env['ARCHIVO_SALIDA'] = str(config['archivos_intermedios']['cupos_disponibles_xlsx'])
-
-    # Cambiar al directorio de metas
-    cwd_original = os.getcwd()
-    os.chdir(config['scripts']['cruce_metas_avance'].parent)
-
-    try:
-        resultado = ejecutar_comando(
-            ['python', 'cruce_metas_avance_final.py'],
-            "Calcular cupos disponibles",
-            check=True
-        )
+    env['ARCHIVO_AVANCE'] = str(config['archivos_trabajo']['avance_cupos'])
+    env['ARCHIVO_SALIDA'] = str(config['archivos_intermedios']['cupos_disponibles_parquet'])
+    env['ARCHIVO_SALIDA_CSV'] = str(config['archivos_intermedios']['cupos_disponibles_csv'])
+    env['MES_TRABAJO'] = config['mes_nombre']
 
-        # Copiar archivos generados a datos_intermedios
-        if resultado:
-            # El archivo se genera en el directorio de metas
-            archivo_xlsx_origen = config['scripts']['cruce_metas_avance'].parent / 'cupos_disponibles_por_regional_2025.xlsx'
-            archivo_csv_origen = config['scripts']['cruce_metas_avance'].parent / 'cupos_disponibles_por_regional_2025.csv'
-
-            if archivo_xlsx_origen.exists():
-                shutil.copy2(
-                    str(archivo_xlsx_origen),
-                    str(config['archivos_intermedios']['cupos_disponibles_xlsx'])
-                )
-                print(f"\n✓ Archivo XLSX copiado a datos_intermedios")
-
-            if archivo_csv_origen.exists():
-                shutil.copy2(
-                    str(archivo_csv_origen),
-                    str(config['archivos_intermedios']['cupos_disponibles_csv'])
-                )
-                print(f"✓ Archivo CSV copiado a datos_intermedios")
-
-        return resultado
-    finally:
-        os.chdir(cwd_original)
+    return ejecutar_comando(
+        ['python', str(config['scripts']['cruce_metas_avance'])],
+        "Calcular cupos disponibles",
+        check=True,
+        env=env
+    )
 
 
 def paso_7_generar_reporte_aprendices(config):
     """PASO 7: Generar reporte de aprendices"""
     log_paso(7, 8, "Generar reporte mensual de aprendices")
 
-    # Preparar variables de entorno
+    if en_proceso(config):
+        import generar_reporte_mensual_aprendices
+        return ejecutar_en_proceso(generar_reporte_mensual_aprendices.ejecutar, config, "Generar reporte de aprendices")
+
+    # Preparar variables de entorno (el script escribe directamente en datos_intermedios)
     env = os.environ.copy()
-    env['ARCHIVO_APRENDICES'] = str(config['dir_datos_intermedios'] / config['archivos_entrada']['avance_aprendices'].name)
+    env['ARCHIVO_APRENDICES'] = str(config['archivos_trabajo']['avance_aprendices'])
     env['ARCHIVO_SALIDA'] = str(config['archivos_intermedios']['reporte_aprendices'])
+    env['ARCHIVO_ARTEFACTO'] = str(config['archivos_intermedios']['reporte_aprendices_parquet'])
 
-    # Cambiar al directorio de aprendices
-    cwd_original = os.getcwd()
-    os.chdir(config['scripts']['generar_reporte_mensual_aprendices'].parent)
-
-    try:
-        resultado = ejecutar_comando(
-            ['python', 'generar_reporte_mensual_aprendices.py'],
-            "Generar reporte de aprendices",
-            check=True
-        )
-
-        # Copiar archivo generado a datos_intermedios
-        if resultado:
-            # El archivo se genera en el directorio de scripts de aprendices
-            archivo_generado = config['scripts']['generar_reporte_mensual_aprendices'].parent / f"SENA Mensual Nacional {config['mes_corto']} {config['anio']}.xlsx"
-            if archivo_generado.exists():
-                shutil.copy2(
-                    str(archivo_generado),
-                    str(config['archivos_intermedios']['reporte_aprendices'])
-                )
-                print(f"\n✓ Reporte de aprendices copiado a datos_intermedios")
-
-        return resultado
-    finally:
-        os.chdir(cwd_original)
+    return ejecutar_comando(
+        ['python', str(config['scripts']['generar_reporte_mensual_aprendices'])],
+        "Generar reporte de aprendices",
+        check=True,
+        env=env
+    )
 
 
 def paso_8_generar_reporte_consolidado(config):
     """PASO 8: Generar reporte consolidado final"""
     log_paso(8, 8, "Generar reporte consolidado final")
 
-    # Preparar variables de entorno
-    env = os.environ.copy()
-    env['BD_FORMACION'] = str(config['archivos_intermedios']['bd_formacion'])
-    env['CUPOS_DISPONIBLES'] = str(config['archivos_intermedios']['cupos_disponibles_xlsx'])
-    env['REPORTE_APRENDICES'] = str(config['archivos_intermedios']['reporte_aprendices'])
-    env['ARCHIVO_SALIDA'] = str(config['archivos_finales']['reporte_consolidado'])
-    env['MES_TRABAJO'] = config['mes_nombre']
-    env['MES_CORTO'] = config['mes_corto']
-    env['ANIO'] = str(config['anio'])
-
-    # Cambiar al directorio del reporte consolidado
-    cwd_original = os.getcwd()
-    os.chdir(config['scripts']['generar_reporte_consolidado'].parent)
+    if en_proceso(config):
+        import generar_reporte_consolidado
+        resultado = ejecutar_en_proceso(generar_reporte_consolidado.ejecutar, config, "Generar reporte consolidado")
+    else:
+        # Preparar variables de entorno (el script escribe directamente en datos_finales)
+        env = os.environ.copy()
+        env['BD_FORMACION'] = str(config['archivos_intermedios']['bd_formacion'])
+        env['CUPOS_DISPONIBLES'] = str(config['archivos_intermedios']['cupos_disponibles_parquet'])
+        env['REPORTE_APRENDICES'] = str(config['archivos_intermedios']['reporte_aprendices_parquet'])
+        env['ARCHIVO_SALIDA'] = str(config['archivos_finales']['reporte_consolidado'])
+        env['DIR_SALIDA_DATOS'] = str(config['archivos_finales']['datos_consolidado'])
+        env['MES_TRABAJO'] = config['mes_nombre']
+        env['MES_CORTO'] = config['mes_corto']
+        env['ANIO'] = str(config['anio'])
 
-    try:
         resultado = ejecutar_comando(
-            ['python', 'generar_reporte_consolidado.py'],
+            ['python', str(config['scripts']['generar_reporte_consolidado'])],
             "Generar reporte consolidado",
             check=True,
             env=env
         )
 
-        # Mover archivo generado a datos_finales
-        if resultado:
-            archivo_generado = Path(f"Reporte Consolidado Economía Naranja {config['mes_corto']} {config['anio']}.xlsx")
-            if archivo_generado.exists():
-                shutil.move(
-                    str(archivo_generado),
-                    str(config['archivos_finales']['reporte_consolidado'])
-                )
-                print(f"\n✓ Reporte final guardado en:")
-                print(f"  {config['archivos_finales']['reporte_consolidado']}")
-
-        return resultado
-    finally:
-        os.chdir(cwd_original)
+    if resultado:
+        if os.environ.get('FORMATO_SALIDA', 'xlsx').lower() == 'datos':
+            salida = config['archivos_finales']['datos_consolidado']
+        else:
+            salida = config['archivos_finales']['reporte_consolidado']
+        print(f"\n✓ Reporte final guardado en:")
+        print(f"  {salida}")
+
+    return resultado
+
+
+# ============================================
+# DEPENDENCIAS Y EJECUCIÓN DE PASOS
+# ============================================
+
+# Cada paso se ejecuta cuando terminan los pasos de los que depende. Las ramas
+# PE-04 (3-4) y metas/cupos (5-6) no comparten entradas y corren al mismo
+# tiempo. Aprendices (7) espera la importación del PE-04 (3): solo el PE-04
+# registra municipios nuevos en el catálogo DIVIPOLA, y el Paso 7 debe ver los
+# de este mes para que sus nombres no dependan de qué rama termina primero.
+# El consolidado (8) espera a las tres ramas
+PASOS = [
+    (paso_1_crear_directorios, []),
+    (paso_2_copiar_archivos_entrada, [paso_1_crear_directorios]),
+    (paso_3_generar_bd_formacion, [paso_2_copiar_archivos_entrada]),
+    (paso_4_crear_tabla_economia_naranja, [paso_3_generar_bd_formacion]),
+    (paso_5_generar_bd_metas, [paso_2_copiar_archivos_entrada]),
+    (paso_6_calcular_cupos_disponibles, [paso_5_generar_bd_metas]),
+    (paso_7_generar_reporte_aprendices, [paso_2_copiar_archivos_entrada, paso_3_generar_bd_formacion]),
+    (paso_8_generar_reporte_consolidado, [paso_4_crear_tabla_economia_naranja,
+                                          paso_6_calcular_cupos_disponibles,
+                                          paso_7_generar_reporte_aprendices])
+]
+
+
+def archivos_paso(paso, config):
+    """
+    Archivos que determinan si un paso está al día (memoización)
+
+    Args:
+        paso (callable): Función del paso
+        config (dict): Configuración del mes
+
+    Returns:
+        tuple: (entradas, salidas, scripts, parámetros), o None si el paso
+            se ejecuta siempre
+    """
+    entrada = config['archivos_entrada']
+    trabajo = config['archivos_trabajo']
+    intermedios = config['archivos_intermedios']
+    finales = config['archivos_finales']
+    scripts = config['scripts']
+    catalogo = Path(os.environ.get('BD_CATALOGO_DIVIPOLA', BD_CATALOGO_DIVIPOLA))
+    compartidos = config.get('compartidos', {})
+    catalogo_eco_naranja = compartidos.get('catalogo_economia_naranja')
+
+    formato_salida = os.environ.get('FORMATO_SALIDA', 'xlsx').lower()
+    if formato_salida == 'datos':
+        salidas_consolidado = [finales['datos_consolidado'] / 'manifest.json']
+    else:
+        salidas_consolidado = [finales['reporte_consolidado']]
+
+    archivos = {
+        paso_2_copiar_archivos_entrada: (
+            list(entrada.values()),
+            [trabajo[clave] for clave in entrada if trabajo[clave] != entrada[clave]] + [intermedios['manifiesto_entradas']],
+            [scripts['generar_reporte_completo']], {'estrategia': config['estrategia_copia']}
+        ),
+        paso_3_generar_bd_formacion: (
+            # Sin el catálogo DIVIPOLA: el paso lo escribe (municipios nuevos) y los
+            # nombres ya registrados no cambian
+            [trabajo['pe04_formacion']] + ([Path(catalogo_eco_naranja)] if catalogo_eco_naranja else []),
+            [intermedios['bd_formacion']],
+            [scripts['importar_pe04']], {'mes': config['mes_nombre'], 'anio': config['anio']}
+        ),
+        paso_4_crear_tabla_economia_naranja: (
+            [intermedios['bd_formacion']], [intermedios['bd_formacion']],
+            [scripts['crear_tabla_economia_naranja'], scripts['generar_reporte_completo']],
+            {'mes': config['mes_nombre']}
+        ),
+        paso_5_generar_bd_metas: (
+            [Path(compartidos['bd_metas'])] if compartidos.get('bd_metas') else [trabajo['metas_sena']],
+            [intermedios['bd_metas']],
+            [scripts['normalizar_metas'], scripts['generar_reporte_completo']], {}
+        ),
+        paso_6_calcular_cupos_disponibles: (
+            [intermedios['bd_metas'], trabajo['avance_cupos']],
+            [intermedios['cupos_disponibles_parquet'], intermedios['cupos_disponibles_csv']],
+            [scripts['cruce_metas_avance']], {'mes': config['mes_nombre']}
+        ),
+        paso_7_generar_reporte_aprendices: (
+            [trabajo['avance_aprendices'], catalogo],
+            [intermedios['reporte_aprendices'], intermedios['reporte_aprendices_parquet']],
+            [scripts['generar_reporte_mensual_aprendices']], {'mes': config['mes_nombre'], 'anio': config['anio']}
+        ),
+        paso_8_generar_reporte_consolidado: (
+            [intermedios['bd_formacion'], intermedios['cupos_disponibles_parquet'], intermedios['reporte_aprendices_parquet']],
+            salidas_consolidado,
+            [scripts['generar_reporte_consolidado']],
+            {'mes': config['mes_nombre'], 'anio': config['anio'], 'formato_salida': formato_salida}
+        )
+    }
+    return archivos.get(paso)
+
+
+def pasos_afectados(pasos, iniciales):
+    """
+    Pasos indicados más todos los que dependen de ellos (directa o indirectamente)
+
+    Args:
+        pasos (list): Tuplas (paso, [pasos de los que depende])
+        iniciales (iterable): Pasos a invalidar
+
+    Returns:
+        set: Pasos afectados
+    """
+    afectados = set(iniciales)
+    cambio = True
+    while cambio:
+        cambio = False
+        for paso, dependencias in pasos:
+            if paso not in afectados and afectados.intersection(dependencias):
+                afectados.add(paso)
+                cambio = True
+    return afectados
+
+
+def _ejecutar_con_perfil(paso, config, ruta_perfil):
+    """
+    Ejecuta un paso bajo cProfile y guarda {ruta_perfil}.pstats / .collapsed
+
+    En modo subprocesos el script del paso corre con `python -m cProfile` y su
+    perfil se combina con el del orquestador.
+    """
+    ruta_subproceso = ruta_perfil.with_name(f"{ruta_perfil.name}.subproceso.pstats")
+    ruta_perfil.parent.mkdir(parents=True, exist_ok=True)
+
+    with _lock_perfil:
+        perfil = cProfile.Profile()
+        _perfil_por_hilo.ruta = ruta_subproceso
+        perfil.enable()
+        try:
+            return paso(config)
+        finally:
+            perfil.disable()
+            _perfil_por_hilo.ruta = None
+            ruta_pstats = guardar_perfil(perfil, ruta_perfil, ruta_subproceso)
+            print(f"\n✓ Perfil de {paso.__name__}: {ruta_pstats}")
+
+
+def _ejecutar_paso(paso, config, registro=None, forzado=False, id_ejecucion=None, ruta_perfil=None):
+    """
+    Ejecuta un paso; las excepciones se reportan y cuentan como falla
+
+    Con registro, el paso se omite si está al día y su huella se actualiza
+    al terminar bien. Con id_ejecucion, sus métricas se guardan en el
+    historial de ejecuciones. Con ruta_perfil, el paso se ejecuta siempre y
+    bajo cProfile (en el historial queda como 'perfilado', fuera de las
+    medianas).
+    """
+    archivos = archivos_paso(paso, config)
+    memoizar = registro is not None and archivos is not None
+    estado = 'fallido'
+    with historial_ejecuciones.MedicionPaso() as medicion:
+        try:
+            al_dia = False
+            if memoizar:
+                if ruta_perfil is not None:
+                    motivo = "perfilado con --profile"
+                elif forzado:
+                    motivo = "forzado con --force"
+                else:
+                    al_dia, motivo = registro.al_dia(paso.__name__, *archivos)
+                if al_dia:
+                    print(f"\n↷ {paso.__name__}: al día, se omite")
+                else:
+                    print(f"\n→ {paso.__name__}: se ejecuta ({motivo})")
+                    # Sin huella mientras se ejecuta: si se interrumpe, se repite la próxima vez
+                    registro.invalidar(paso.__name__)
+                    # Huella de las entradas que el paso va a leer (no de las que queden al terminar)
+                    entradas, salidas, scripts, parametros = archivos
+                    huella_previa = registro.huella(entradas, scripts, parametros)
+
+            if al_dia:
+                exitoso = True
+            else:
+                with traza(paso.__name__, mes=config['mes_nombre']):
+                    if ruta_perfil is not None:
+                        exitoso = _ejecutar_con_perfil(paso, config, ruta_perfil)
+                    else:
+                        exitoso = paso(config)
+
+            if exitoso and memoizar and not al_dia:
+                registro.registrar(paso.__name__, huella_previa, propias=salidas)
+            if exitoso:
+                estado = 'omitido' if al_dia else ('perfilado' if ruta_perfil is not None else 'ejecutado')
+        except Exception as e:
+            print(f"\n✗ EXCEPCIÓN EN {paso.__name__}: {e}")
+            traceback.print_exc()
+            exitoso = False
+
+    if id_ejecucion is not None:
+        entradas, salidas = archivos[:2] if archivos is not None else ([], [])
+        try:
+            historial_ejecuciones.registrar_paso(BD_HISTORIAL_EJECUCIONES, id_ejecucion, paso.__name__,
+                                                 estado, medicion, entradas, salidas)
+        except sqlite3.Error as e:
+            print(f"[ADVERTENCIA] No se pudo registrar {paso.__name__} en el historial: {e}")
+    return exitoso
+
+
+def _iniciar_historial(config):
+    """Registra la ejecución en el historial; None si la BD no está disponible"""
+    try:
+        BD_HISTORIAL_EJECUCIONES.parent.mkdir(parents=True, exist_ok=True)
+        return historial_ejecuciones.iniciar_ejecucion(BD_HISTORIAL_EJECUCIONES, config)
+    except (sqlite3.Error, OSError) as e:
+        print(f"[ADVERTENCIA] Historial de ejecuciones no disponible: {e}")
+        return None
+
+
+def _finalizar_historial(id_ejecucion, exitoso, duracion):
+    """Cierra la ejecución en el historial e imprime las métricas por paso"""
+    try:
+        historial_ejecuciones.finalizar_ejecucion(BD_HISTORIAL_EJECUCIONES, id_ejecucion, exitoso, duracion)
+        print("\n" + "-"*70)
+        print(f" MÉTRICAS POR PASO (ejecución {id_ejecucion})")
+        print("-"*70)
+        historial_ejecuciones.imprimir_resumen_ejecucion(BD_HISTORIAL_EJECUCIONES, id_ejecucion)
+    except sqlite3.Error as e:
+        print(f"[ADVERTENCIA] No se pudo actualizar el historial de ejecuciones: {e}")
+
+
+def ejecutar_pasos(pasos, config, max_workers=PASOS_EN_PARALELO, forzar=(), memoizar=True, historial=True,
+                   perfilar=()):
+    """
+    Ejecuta los pasos en paralelo respetando sus dependencias
+
+    Cuando un paso falla no se inicia ningún paso más y se terminan los
+    subprocesos de los pasos que siguen en ejecución.
+
+    Las métricas de cada paso (tiempos, memoria, tamaños, filas) se guardan
+    en el historial de ejecuciones y se muestran al terminar, junto con los
+    pasos que tardaron bastante más que su mediana reciente.
+
+    Args:
+        pasos (list): Tuplas (paso, [pasos de los que depende])
+        config (dict): Configuración del mes
+        max_workers (int): Pasos simultáneos (1 = secuencial)
+        forzar (iterable): Pasos que se ejecutan aunque estén al día (junto
+            con los que dependen de ellos)
+        memoizar (bool): Si False, se ejecutan todos los pasos sin consultar
+            ni registrar huellas
+        historial (bool): Si False, no se registran métricas en el historial
+        perfilar (iterable): Pasos que se ejecutan bajo cProfile; sus perfiles
+            quedan en MESES/{MES}/perfiles y al terminar se muestran sus
+            funciones más costosas
+
+    Returns:
+        tuple: (True si todos los pasos terminaron bien, paso que falló o None)
+    """
+    pendientes = dict(pasos)
+    completados = set()
+    paso_fallido = None
+    _cancelado.clear()
+
+    registro = RegistroPasos(config['dir_datos_intermedios']) if memoizar else None
+    forzados = pasos_afectados(pasos, forzar)
+    id_ejecucion = _iniciar_historial(config) if historial else None
+    inicio = time.perf_counter()
+
+    marca = datetime.now().strftime('%Y%m%d_%H%M%S')
+    perfiles = {paso: config['dir_perfiles'] / f"{paso.__name__}_{marca}" for paso in perfilar}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        en_curso = {}
+        while True:
+            if paso_fallido is None:
+                # Pasos con todas sus dependencias completadas, en el orden declarado
+                for paso, dependencias in list(pendientes.items()):
+                    if all(dependencia in completados for dependencia in dependencias):
+                        futuro = executor.submit(_ejecutar_paso, paso, config, registro, paso in forzados,
+                                                 id_ejecucion, perfiles.get(paso))
+                        en_curso[futuro] = paso
+                        del pendientes[paso]
+
+            if not en_curso:
+                break
+
+            terminados, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                paso = en_curso.pop(futuro)
+                if futuro.result():
+                    completados.add(paso)
+                elif paso_fallido is None:
+                    paso_fallido = paso
+                    terminar_procesos_activos()
+
+    if id_ejecucion is not None:
+        _finalizar_historial(id_ejecucion, paso_fallido is None, time.perf_counter() - inicio)
+
+    for paso, ruta_perfil in perfiles.items():
+        ruta_pstats = ruta_perfil.with_name(f"{ruta_perfil.name}.pstats")
+        if ruta_pstats.exists():
+            print("\n" + "-"*70)
+            print(f" FUNCIONES MÁS COSTOSAS: {paso.__name__}")
+            print("-"*70)
+            imprimir_funciones_costosas(ruta_pstats)
+            print(f"\n  Perfil: {ruta_pstats}")
+            print(f"  Flamegraph: {ruta_perfil.with_name(f'{ruta_perfil.name}.collapsed')}")
+
+    return paso_fallido is None, paso_fallido
+
+
+# ============================================
+# MODO POR LOTES (VARIOS MESES)
+# ============================================
+
+def meses_de_rango(rango):
+    """
+    Meses de un rango 'INICIO:FIN' (o 'INICIO-FIN'), en orden del año
+
+    Raises:
+        ValueError: Si el rango no es válido
+    """
+    partes = re.split(r'[:\-]', rango.upper())
+    if len(partes) != 2 or any(parte not in MESES for parte in partes):
+        raise ValueError(f"Rango inválido: {rango} (ej: JULIO:SEPTIEMBRE)")
+
+    nombres = list(MESES)
+    inicio, fin = nombres.index(partes[0]), nombres.index(partes[1])
+    if inicio > fin:
+        raise ValueError(f"Rango invertido: {rango}")
+    return nombres[inicio:fin + 1]
+
+
+def _ruta_insumo_compartido(nombre, origen, scripts, extension):
+    """Ruta en DIR_COMPARTIDO identificada por el contenido del origen y la versión del código"""
+    clave = hashlib.sha256(f"{sha256_archivo(origen)}{version_codigo(scripts)}".encode('ascii')).hexdigest()
+    return DIR_COMPARTIDO / f"{nombre}_{clave[:16]}{extension}"
+
+
+def preparar_insumos_compartidos(configs):
+    """
+    Prepara una sola vez los insumos que comparten los meses de un lote
+
+    - BD de metas normalizada (una por cada archivo de metas distinto)
+    - Catálogo de economía naranja convertido a Parquet
+
+    Los insumos se guardan en DIR_COMPARTIDO por hash de contenido y versión
+    del código, así que también se reutilizan entre lotes.
+
+    Args:
+        configs (list[dict]): Configuración de cada mes del lote
+
+    Returns:
+        dict: {mes: {'bd_metas': str, 'catalogo_economia_naranja': str | None}}
+    """
+    import normalizar_metas_sena
+    from importar_pe_04_mes import buscar_catalogo_economia_naranja, preparar_catalogo_economia_naranja
+
+    DIR_COMPARTIDO.mkdir(parents=True, exist_ok=True)
+    compartidos = {}
+
+    for config in configs:
+        insumos = {}
+
+        metas = config['archivos_entrada']['metas_sena']
+        bd_metas = _ruta_insumo_compartido('metas_sena', metas, [config['scripts']['normalizar_metas']], '.db')
+        if not bd_metas.exists():
+            print(f"\n→ Normalizando {metas.name} para el lote")
+            temporal = bd_metas.with_name(f"{bd_metas.name}.{os.getpid()}.tmp")
+            temporal.unlink(missing_ok=True)
+            normalizar_metas_sena.normalizar_metas(metas, temporal)
+            os.replace(temporal, bd_metas)
+        insumos['bd_metas'] = str(bd_metas)
+
+        catalogo = buscar_catalogo_economia_naranja(config['dir_datos_intermedios'], config['anio'])
+        insumos['catalogo_economia_naranja'] = None
+        if catalogo is not None:
+            parquet = _ruta_insumo_compartido('catalogo_economia_naranja', catalogo,
+                                              [config['scripts']['importar_pe04']], '.parquet')
+            if not parquet.exists():
+                print(f"\n→ Convirtiendo {catalogo.name} a Parquet para el lote")
+                temporal = parquet.with_name(f"{parquet.stem}.{os.getpid()}.tmp.parquet")
+                preparar_catalogo_economia_naranja(catalogo, temporal)
+                os.replace(temporal, parquet)
+            insumos['catalogo_economia_naranja'] = str(parquet)
+
+        nombre_catalogo = Path(insumos['catalogo_economia_naranja']).name if catalogo else 'no encontrado'
+        print(f"✓ {config['mes_nombre']}: metas {Path(insumos['bd_metas']).name}, catálogo {nombre_catalogo}")
+        compartidos[config['mes_nombre']] = insumos
+
+    return compartidos
+
+
+def procesar_mes(mes_nombre, modo_ejecucion, forzar, compartidos, perfilar=()):
+    """
+    Ejecuta los 8 pasos de un mes dentro de un proceso del lote
+
+    La salida completa del mes queda en MESES/{MES}/log_generar_reporte.txt.
+
+    Args:
+        mes_nombre (str): Mes a procesar
+        modo_ejecucion (str): 'proceso' o 'subproceso'
+        forzar (list[str]): Nombres de los pasos a repetir aunque estén al día
+        compartidos (dict): Insumos compartidos del mes (preparar_insumos_compartidos)
+        perfilar (list[str]): Nombres de los pasos a ejecutar bajo cProfile
+
+    Returns:
+        dict: Resumen del mes (mes, exitoso, paso_fallido, duracion, log, reporte)
+    """
+    config = obtener_config_mes(mes_nombre)
+    config['modo_ejecucion'] = modo_ejecucion
+    config['compartidos'] = compartidos
+    config['dir_mes'].mkdir(parents=True, exist_ok=True)
+    ruta_log = config['dir_mes'] / 'log_generar_reporte.txt'
+
+    inicio = time.perf_counter()
+    with open(ruta_log, 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        print(f"GENERACIÓN DEL REPORTE {mes_nombre} (lote) - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        try:
+            exitoso, paso_fallido = ejecutar_pasos(PASOS, config,
+                                                   forzar=[_paso_por_nombre(nombre) for nombre in forzar],
+                                                   perfilar=[_paso_por_nombre(nombre) for nombre in perfilar])
+        except Exception:
+            traceback.print_exc()
+            exitoso, paso_fallido = False, None
+
+    return {
+        'mes': mes_nombre,
+        'exitoso': exitoso,
+        'paso_fallido': paso_fallido.__name__ if paso_fallido else None,
+        'duracion': time.perf_counter() - inicio,
+        'log': str(ruta_log),
+        'reporte': str(config['archivos_finales']['reporte_consolidado'])
+    }
+
+
+def ejecutar_lote(meses, modo_ejecucion, forzar=(), max_workers=MESES_EN_PARALELO, perfilar=()):
+    """
+    Genera el reporte de varios meses
+
+    Valida las entradas de todos los meses antes de empezar, prepara una sola
+    vez los insumos compartidos y procesa los meses en un pool de procesos.
+
+    Args:
+        meses (list[str]): Meses a procesar
+        modo_ejecucion (str): 'proceso' o 'subproceso'
+        forzar (iterable): Pasos a repetir en todos los meses
+        max_workers (int): Meses procesados a la vez
+        perfilar (iterable): Pasos a ejecutar bajo cProfile en todos los meses
+
+    Returns:
+        bool: True si todos los meses terminaron bien
+    """
+    inicio = time.perf_counter()
+
+    # Plan del lote: todas las entradas deben existir antes de empezar
+    print(f"\n→ Lote de {len(meses)} meses: {', '.join(meses)}")
+    configs = [obtener_config_mes(mes) for mes in meses]
+    faltantes = {}
+    for config in configs:
+        ok, archivos = validar_archivos_entrada(config)
+        if not ok:
+            faltantes[config['mes_nombre']] = archivos
+    if faltantes:
+        print("\n✗ Faltan archivos de entrada; no se inicia el lote:")
+        for mes, archivos in faltantes.items():
+            for archivo in archivos:
+                print(f"  - {mes}: {archivo}")
+        return False
+
+    print("\n→ Preparando insumos compartidos")
+    inicio_compartidos = time.perf_counter()
+    compartidos = preparar_insumos_compartidos(configs)
+    duracion_compartidos = time.perf_counter() - inicio_compartidos
+
+    nombres_forzar = [paso.__name__ for paso in forzar]
+    nombres_perfilar = [paso.__name__ for paso in perfilar]
+    max_workers = max(1, min(max_workers, len(meses)))
+    print(f"\n→ Procesando {len(meses)} meses ({max_workers} a la vez); salida de cada mes en su log")
+
+    resultados = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futuros = {
+            executor.submit(procesar_mes, mes, modo_ejecucion, nombres_forzar, compartidos[mes],
+                            nombres_perfilar): mes
+            for mes in meses
+        }
+        for futuro in as_completed(futuros):
+            mes = futuros[futuro]
+            try:
+                resultados[mes] = futuro.result()
+            except Exception as e:
+                resultados[mes] = {'mes': mes, 'exitoso': False, 'paso_fallido': f"proceso del lote: {e}",
+                                   'duracion': 0.0, 'log': None, 'reporte': None}
+            resultado = resultados[mes]
+            marca = "✓" if resultado['exitoso'] else "✗"
+            print(f"  {marca} {mes} ({resultado['duracion']:.1f} s)")
+
+    # Resumen combinado
+    duracion_total = time.perf_counter() - inicio
+    suma_meses = sum(resultado['duracion'] for resultado in resultados.values())
+
+    print("\n" + "="*70)
+    print(" RESUMEN DEL LOTE")
+    print("="*70)
+    print(f"\n{'Mes':<12}{'Estado':<10}{'Tiempo (s)':>12}  Detalle")
+    for mes in meses:
+        resultado = resultados[mes]
+        if resultado['exitoso']:
+            print(f"{mes:<12}{'OK':<10}{resultado['duracion']:>12.1f}  {resultado['reporte']}")
+        else:
+            print(f"{mes:<12}{'ERROR':<10}{resultado['duracion']:>12.1f}  {resultado['paso_fallido']} (log: {resultado['log']})")
+
+    print(f"\n⏱ Insumos compartidos: {duracion_compartidos:.1f} s")
+    print(f"⏱ Suma de los meses: {suma_meses:.1f} s")
+    print(f"⏱ Tiempo total del lote: {duracion_total:.1f} s ({duracion_total/60:.1f} minutos)")
+    if duracion_total > 0:
+        print(f"⏱ Paralelismo efectivo: {suma_meses / duracion_total:.1f}x")
+    print("\n" + "="*70)
+
+    return all(resultado['exitoso'] for resultado in resultados.values())
 
 
 # ============================================
 # FUNCIÓN PRINCIPAL
 # ============================================
 
+def _paso_por_nombre(nombre):
+    """Paso de PASOS a partir de su número (1-8) o nombre de función"""
+    for numero, (paso, _) in enumerate(PASOS, start=1):
+        if nombre in (str(numero), paso.__name__):
+            return paso
+    return None
+
+
+def _pasos_de_argumento(nombres, opcion):
+    """
+    Pasos indicados en una opción repetible (--force / --profile)
+
+    Acepta números (1-8), nombres de función y 'todos' (o 'all'). Termina el
+    programa si algún paso no es válido.
+    """
+    pasos = set()
+    for nombre in nombres:
+        if nombre.lower() in ('todos', 'all'):
+            pasos.update(paso for paso, _ in PASOS)
+        elif _paso_por_nombre(nombre) is not None:
+            pasos.add(_paso_por_nombre(nombre))
+        else:
+            print(f"\n✗ Paso inválido para {opcion}: {nombre}")
+            print(f"\nPasos válidos: 1-{len(PASOS)} o 'todos'")
+            sys.exit(1)
+    return pasos
+
+
+def _leer_argumentos():
+    parser = argparse.ArgumentParser(
+        description="Genera el Reporte Consolidado de Economía Naranja de un mes"
+    )
+    parser.add_argument('mes', nargs='?', help="Mes a procesar (ej: SEPTIEMBRE)")
+    lote = parser.add_mutually_exclusive_group()
+    lote.add_argument('--meses', help="Lote de meses separados por coma (ej: AGOSTO,SEPTIEMBRE)")
+    lote.add_argument('--rango', help="Lote de meses consecutivos (ej: JULIO:SEPTIEMBRE)")
+    parser.add_argument('--meses-en-paralelo', type=int, default=MESES_EN_PARALELO, metavar='N',
+                        help=f"Meses del lote procesados a la vez (por defecto {MESES_EN_PARALELO})")
+    parser.add_argument('--subprocesos', action='store_true',
+                        help="Ejecutar cada script en su propio intérprete")
+    parser.add_argument('--force', action='append', default=[], metavar='PASO',
+                        help="Repetir el paso (1-8 o 'todos') y los que dependen de él aunque estén al día")
+    parser.add_argument('--profile', action='append', default=[], metavar='PASO',
+                        help="Ejecutar el paso (1-8 o 'all') bajo cProfile; guarda .pstats y .collapsed en MESES/{MES}/perfiles")
+    parser.add_argument('--servicio', action='store_true',
+                        help="Iniciar el servicio residente de reportes (ver cliente_reportes.py)")
+    parser.add_argument('--puerto', type=int, default=PUERTO_SERVICIO, metavar='N',
+                        help=f"Puerto local del servicio (por defecto {PUERTO_SERVICIO})")
+    return parser.parse_args()
+
+
 def main():
     print("="*70)
     print(" GENERACIÓN COMPLETA DEL REPORTE DE ECONOMÍA NARANJA")
@@ -404,15 +1221,54 @@ def main():
     print("="*70)
 
     # Validar argumentos
-    if len(sys.argv) < 2:
+    args = _leer_argumentos()
+
+    # Servicio residente: atiende reportes hasta que se detenga
+    if args.servicio:
+        from servicio_reportes import iniciar_servicio
+        iniciar_servicio(args.puerto)
+        sys.exit(0)
+
+    lote = args.meses or args.rango
+    if args.mes and lote:
+        print("\n✗ Error: Indique un mes o un lote (--meses / --rango), no ambos")
+        sys.exit(1)
+
+    if not args.mes and not lote:
         print("\n✗ Error: Falta especificar el mes")
-        print("\nUso: python generar_reporte_completo.py <MES>")
+        print("\nUso: python generar_reporte_completo.py <MES> [--subprocesos] [--force <PASO>]")
+        print("     python generar_reporte_completo.py --meses <MES,MES,...> | --rango <MES:MES>")
         print(f"\nMeses válidos:")
         for mes in MESES.keys():
             print(f"  - {mes}")
         sys.exit(1)
 
-    mes_nombre = sys.argv[1].upper()
+    # Pasos a repetir aunque estén al día y pasos a perfilar
+    forzar = _pasos_de_argumento(args.force, '--force')
+    perfilar = _pasos_de_argumento(args.profile, '--profile')
+
+    modo_ejecucion = 'subproceso' if args.subprocesos else MODO_EJECUCION_PASOS
+
+    # Modo por lotes
+    if lote:
+        try:
+            if args.rango:
+                meses = meses_de_rango(args.rango)
+            else:
+                meses = [mes.strip().upper() for mes in args.meses.split(',') if mes.strip()]
+                invalidos = [mes for mes in meses if mes not in MESES]
+                if invalidos:
+                    raise ValueError(f"Mes inválido: {', '.join(invalidos)}")
+                meses = list(dict.fromkeys(meses))
+        except ValueError as e:
+            print(f"\n✗ {e}")
+            print(f"\nMeses válidos: {', '.join(MESES.keys())}")
+            sys.exit(1)
+
+        exitoso = ejecutar_lote(meses, modo_ejecucion, forzar, args.meses_en_paralelo, perfilar)
+        sys.exit(0 if exitoso else 1)
+
+    mes_nombre = args.mes.upper()
 
     # Validar mes
     if mes_nombre not in MESES:
@@ -428,30 +1284,17 @@ def main():
         print(f"\n✗ Error al cargar configuración: {e}")
         sys.exit(1)
 
-    # Ejecutar pasos
+    config['modo_ejecucion'] = modo_ejecucion
+    print(f"✓ Modo de ejecución de los pasos: {config['modo_ejecucion']}")
+
+    # Ejecutar pasos (ramas independientes en paralelo)
     inicio = datetime.now()
-    pasos = [
-        paso_1_crear_directorios,
-        paso_2_copiar_archivos_entrada,
-        paso_3_generar_bd_formacion,
-        paso_4_crear_tabla_economia_naranja,
-        paso_5_generar_bd_metas,
-        paso_6_calcular_cupos_disponibles,
-        paso_7_generar_reporte_aprendices,
-        paso_8_generar_reporte_consolidado
-    ]
-
-    for paso in pasos:
-        try:
-            if not paso(config):
-                print(f"\n✗ ERROR EN {paso.__name__}")
-                print("Proceso interrumpido.")
-                sys.exit(1)
-        except Exception as e:
-            print(f"\n✗ EXCEPCIÓN EN {paso.__name__}: {e}")
-            import traceback
-            traceback.print_exc()
-            sys.exit(1)
+    exitoso, paso_fallido = ejecutar_pasos(PASOS, config, forzar=forzar, perfilar=perfilar)
+
+    if not exitoso:
+        print(f"\n✗ ERROR EN {paso_fallido.__name__}")
+        print("Proceso interrumpido.")
+        sys.exit(1)
 
     # Resumen final
     fin = datetime.now()
@@ -0,0 +1,464 @@
+"""
+Historial de Ejecuciones del Proceso
+
+Registra en una base SQLite, por ejecución y por mes, las métricas de cada
+paso del orquestador: tiempo de pared, tiempo de CPU, memoria pico, tamaño de
+entradas y salidas y filas generadas. Con estos datos se ven las tendencias
+de cada paso y se detectan regresiones: un paso cuyo tiempo supera en
+UMBRAL_REGRESION veces la mediana de sus últimas ejecuciones.
+
+Tablas:
+- ejecuciones: una fila por ejecución de generar_reporte_completo.py (por mes)
+- pasos_ejecucion: una fila por paso de cada ejecución
+
+Uso:
+    python historial_ejecuciones.py [MES] [--paso <PASO>] [--ultimas N]
+
+Ejemplos:
+    python historial_ejecuciones.py                      # últimas ejecuciones de todos los meses
+    python historial_ejecuciones.py SEPTIEMBRE           # tendencia de cada paso del mes
+    python historial_ejecuciones.py SEPTIEMBRE --paso 6 --ultimas 20
+"""
+
+import os
+import socket
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from configuracion import (BD_HISTORIAL_EJECUCIONES, TIEMPO_ESPERA_BD_COMPARTIDA, UMBRAL_REGRESION,
+                           VENTANA_MEDIANA_HISTORIAL)
+
+# Diferencias menores a esta (segundos) no se marcan como regresión: en pasos
+# de fracciones de segundo el ruido supera cualquier umbral relativo
+DIFERENCIA_MINIMA_REGRESION = 1.0
+
+
+# ============================================
+# MEDICIÓN
+# ============================================
+
+def _rss_pico_mb():
+    """
+    Memoria pico (RSS) del proceso y de sus subprocesos terminados, en MB
+
+    Returns:
+        float | None: None si el sistema operativo no la informa
+    """
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    if resource is not None:
+        propio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        hijos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+        return max(propio, hijos) / divisor
+
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class CONTADORES_MEMORIA(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        contadores = CONTADORES_MEMORIA()
+        contadores.cb = ctypes.sizeof(contadores)
+        proceso = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(proceso, ctypes.byref(contadores), contadores.cb):
+            return contadores.PeakWorkingSetSize / 1024 / 1024
+
+    return None
+
+
+class MedicionPaso:
+    """
+    Mide tiempo de pared, CPU y memoria pico de un paso
+
+    - tiempo_cpu: CPU del hilo que ejecuta el paso más la de los subprocesos
+      que terminaron mientras corría (con pasos en paralelo, esta última
+      puede incluir la de otra rama)
+    - rss_pico_mb: memoria pico del proceso (y de sus subprocesos) al
+      terminar el paso; es acumulativa dentro de una ejecución
+
+    Uso:
+        with MedicionPaso() as medicion:
+            ...
+        medicion.tiempo_pared, medicion.tiempo_cpu, medicion.rss_pico_mb
+    """
+
+    def __enter__(self):
+        self.inicio = datetime.now()
+        self._pared = time.perf_counter()
+        self._cpu_hilo = time.thread_time()
+        tiempos = os.times()
+        self._cpu_hijos = tiempos.children_user + tiempos.children_system
+        return self
+
+    def __exit__(self, *exc):
+        self.tiempo_pared = time.perf_counter() - self._pared
+        tiempos = os.times()
+        cpu_hijos = tiempos.children_user + tiempos.children_system - self._cpu_hijos
+        self.tiempo_cpu = time.thread_time() - self._cpu_hilo + cpu_hijos
+        self.rss_pico_mb = _rss_pico_mb()
+        return False
+
+
+def contar_filas(ruta):
+    """
+    Filas de un archivo de datos (sin cargarlo completo)
+
+    - .db: suma de las filas de sus tablas
+    - .parquet: metadatos del archivo
+    - .csv: líneas menos el encabezado
+
+    Returns:
+        int | None: None para otros formatos (ej. .xlsx) o si no se puede leer
+    """
+    ruta = Path(ruta)
+    if not ruta.is_file():
+        return None
+
+    try:
+        if ruta.suffix == '.db':
+            conn = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+            try:
+                tablas = [fila[0] for fila in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+                )]
+                return sum(conn.execute(f'SELECT COUNT(*) FROM "{tabla}"').fetchone()[0] for tabla in tablas)
+            finally:
+                conn.close()
+
+        if ruta.suffix == '.parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(ruta).metadata.num_rows
+
+        if ruta.suffix == '.csv':
+            with open(ruta, 'rb') as f:
+                return max(sum(1 for _ in f) - 1, 0)
+    except (sqlite3.Error, OSError, ImportError):
+        return None
+
+    return None
+
+
+def tamano_archivos(rutas):
+    """Suma del tamaño en bytes de los archivos que existen"""
+    return sum(Path(ruta).stat().st_size for ruta in rutas if Path(ruta).is_file())
+
+
+# ============================================
+# REGISTRO
+# ============================================
+
+def crear_tablas(conn):
+    """Crea las tablas del historial y sus índices si no existen"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ejecuciones (
+            id_ejecucion TEXT PRIMARY KEY,
+            anio INTEGER NOT NULL,
+            mes INTEGER NOT NULL,
+            mes_nombre TEXT NOT NULL,
+            modo TEXT,
+            equipo TEXT,
+            inicio TIMESTAMP NOT NULL,
+            duracion REAL,
+            exitoso INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pasos_ejecucion (
+            id_ejecucion TEXT NOT NULL REFERENCES ejecuciones(id_ejecucion),
+            paso TEXT NOT NULL,
+            estado TEXT NOT NULL,
+            inicio TIMESTAMP,
+            tiempo_pared REAL,
+            tiempo_cpu REAL,
+            rss_pico_mb REAL,
+            bytes_entrada INTEGER,
+            bytes_salida INTEGER,
+            filas_salida INTEGER,
+            PRIMARY KEY (id_ejecucion, paso)
+        )
+    """)
+    # Series de tiempo de un paso (mediana de las últimas ejecuciones)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_pasos_ejecucion_paso
+        ON pasos_ejecucion(paso, estado, inicio)
+    """)
+
+
+def _conectar(db_file):
+    conn = sqlite3.connect(db_file, timeout=TIEMPO_ESPERA_BD_COMPARTIDA)
+    crear_tablas(conn)
+    return conn
+
+
+def iniciar_ejecucion(db_file, config):
+    """
+    Registra el inicio de una ejecución del proceso para un mes
+
+    Args:
+        db_file (str | Path): Base de datos del historial
+        config (dict): Configuración del mes
+
+    Returns:
+        str: Identificador de la ejecución
+    """
+    inicio = datetime.now()
+    id_ejecucion = f"{inicio.strftime('%Y%m%d-%H%M%S.%f')[:-3]}-{config['mes_nombre']}"
+
+    conn = _conectar(db_file)
+    try:
+        conn.execute("""
+            INSERT INTO ejecuciones (id_ejecucion, anio, mes, mes_nombre, modo, equipo, inicio)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (id_ejecucion, config['anio'], config['mes_numero'], config['mes_nombre'],
+              config.get('modo_ejecucion'), socket.gethostname(), inicio.isoformat(timespec='milliseconds')))
+        conn.commit()
+    finally:
+        conn.close()
+
+    return id_ejecucion
+
+
+def registrar_paso(db_file, id_ejecucion, paso, estado, medicion, entradas=(), salidas=()):
+    """
+    Registra las métricas de un paso
+
+    Args:
+        db_file (str | Path): Base de datos del historial
+        id_ejecucion (str): Ejecución (iniciar_ejecucion)
+        paso (str): Nombre de la función del paso
+        estado (str): 'ejecutado', 'omitido' (al día), 'perfilado' (bajo
+            cProfile, no cuenta para las medianas) o 'fallido'
+        medicion (MedicionPaso): Tiempos y memoria del paso
+        entradas (list[Path]): Archivos que lee el paso
+        salidas (list[Path]): Archivos que genera el paso (se cuentan sus filas)
+    """
+    filas = [contar_filas(salida) for salida in salidas] if estado == 'ejecutado' else []
+    filas = [n for n in filas if n is not None]
+
+    conn = _conectar(db_file)
+    try:
+        conn.execute("""
+            INSERT OR REPLACE INTO pasos_ejecucion
+            (id_ejecucion, paso, estado, inicio, tiempo_pared, tiempo_cpu, rss_pico_mb,
+             bytes_entrada, bytes_salida, filas_salida)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (id_ejecucion, paso, estado, medicion.inicio.isoformat(timespec='milliseconds'),
+              medicion.tiempo_pared, medicion.tiempo_cpu, medicion.rss_pico_mb,
+              tamano_archivos(entradas), tamano_archivos(salidas), sum(filas) if filas else None))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def finalizar_ejecucion(db_file, id_ejecucion, exitoso, duracion):
+    """Registra el resultado y la duración total de una ejecución"""
+    conn = _conectar(db_file)
+    try:
+        conn.execute("UPDATE ejecuciones SET exitoso = ?, duracion = ? WHERE id_ejecucion = ?",
+                     (int(exitoso), duracion, id_ejecucion))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# ============================================
+# CONSULTAS
+# ============================================
+
+def pasos_de_ejecucion(db_file, id_ejecucion):
+    """
+    Métricas de los pasos de una ejecución, en el orden en que empezaron
+
+    Returns:
+        list[sqlite3.Row]
+    """
+    conn = _conectar(db_file)
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute("""
+            SELECT * FROM pasos_ejecucion WHERE id_ejecucion = ? ORDER BY paso
+        """, (id_ejecucion,)).fetchall()
+    finally:
+        conn.close()
+
+
+def tiempos_paso(db_file, paso, mes_nombre=None, ultimas=VENTANA_MEDIANA_HISTORIAL, antes_de=None):
+    """
+    Tiempos de pared de las últimas ejecuciones reales (no omitidas) de un paso
+
+    Args:
+        db_file (str | Path): Base de datos del historial
+        paso (str): Nombre de la función del paso
+        mes_nombre (str): Restringe a un mes; None = todos los meses
+        ultimas (int): Número de ejecuciones
+        antes_de (str): Excluye esta ejecución y las posteriores
+
+    Returns:
+        list[tuple]: (id_ejecucion, mes_nombre, inicio, tiempo_pared), de la más antigua a la más reciente
+    """
+    condiciones = ["p.paso = ?", "p.estado = 'ejecutado'"]
+    parametros = [paso]
+    if mes_nombre is not None:
+        condiciones.append("e.mes_nombre = ?")
+        parametros.append(mes_nombre)
+    if antes_de is not None:
+        condiciones.append("p.id_ejecucion < ?")
+        parametros.append(antes_de)
+
+    conn = _conectar(db_file)
+    try:
+        filas = conn.execute(f"""
+            SELECT p.id_ejecucion, e.mes_nombre, p.inicio, p.tiempo_pared
+            FROM pasos_ejecucion p
+            JOIN ejecuciones e ON e.id_ejecucion = p.id_ejecucion
+            WHERE {' AND '.join(condiciones)}
+            ORDER BY p.inicio DESC, p.id_ejecucion DESC
+            LIMIT ?
+        """, (*parametros, int(ultimas))).fetchall()
+    finally:
+        conn.close()
+    return filas[::-1]
+
+
+def es_regresion(tiempo, anteriores, umbral=UMBRAL_REGRESION):
+    """
+    Indica si un tiempo es una regresión frente a los tiempos anteriores
+
+    Returns:
+        float | None: Veces la mediana de los anteriores si es regresión, si no None
+    """
+    if not anteriores:
+        return None
+    mediana = statistics.median(anteriores)
+    if mediana > 0 and tiempo > umbral * mediana and tiempo - mediana >= DIFERENCIA_MINIMA_REGRESION:
+        return tiempo / mediana
+    return None
+
+
+def detectar_regresiones(db_file, id_ejecucion, umbral=UMBRAL_REGRESION, ventana=VENTANA_MEDIANA_HISTORIAL):
+    """
+    Pasos de una ejecución cuyo tiempo supera umbral × la mediana de sus
+    últimas `ventana` ejecuciones anteriores (de cualquier mes)
+
+    Returns:
+        list[dict]: paso, tiempo, mediana, factor, muestras
+    """
+    regresiones = []
+    for fila in pasos_de_ejecucion(db_file, id_ejecucion):
+        if fila['estado'] != 'ejecutado':
+            continue
+        anteriores = [t for *_, t in tiempos_paso(db_file, fila['paso'], ultimas=ventana, antes_de=id_ejecucion)]
+        factor = es_regresion(fila['tiempo_pared'], anteriores, umbral)
+        if factor is not None:
+            regresiones.append({
+                'paso': fila['paso'],
+                'tiempo': fila['tiempo_pared'],
+                'mediana': statistics.median(anteriores),
+                'factor': factor,
+                'muestras': len(anteriores)
+            })
+    return regresiones
+
+
+def imprimir_resumen_ejecucion(db_file, id_ejecucion):
+    """Tabla de métricas por paso de una ejecución y regresiones detectadas"""
+    pasos = pasos_de_ejecucion(db_file, id_ejecucion)
+    if not pasos:
+        return
+
+    print(f"\n{'Paso':<40}{'Estado':<11}{'Pared (s)':>10}{'CPU (s)':>9}{'RSS (MB)':>10}{'Filas':>11}")
+    for fila in pasos:
+        rss = f"{fila['rss_pico_mb']:.0f}" if fila['rss_pico_mb'] is not None else '-'
+        filas = f"{fila['filas_salida']:,}" if fila['filas_salida'] is not None else '-'
+        print(f"{fila['paso']:<40}{fila['estado']:<11}{fila['tiempo_pared']:>10.1f}"
+              f"{fila['tiempo_cpu']:>9.1f}{rss:>10}{filas:>11}")
+
+    for regresion in detectar_regresiones(db_file, id_ejecucion):
+        print(f"[ADVERTENCIA] {regresion['paso']} tardó {regresion['tiempo']:.1f} s, "
+              f"{regresion['factor']:.1f}x la mediana de sus últimas {regresion['muestras']} "
+              f"ejecuciones ({regresion['mediana']:.1f} s)")
+
+
+# ============================================
+# LÍNEA DE COMANDOS
+# ============================================
+
+def _mostrar_ejecuciones(conn, mes_nombre, ultimas):
+    condicion, parametros = ("WHERE mes_nombre = ?", [mes_nombre]) if mes_nombre else ("", [])
+    filas = conn.execute(f"""
+        SELECT id_ejecucion, mes_nombre, modo, duracion, exitoso
+        FROM ejecuciones {condicion}
+        ORDER BY inicio DESC, id_ejecucion DESC
+        LIMIT ?
+    """, (*parametros, ultimas)).fetchall()
+
+    print(f"\nÚltimas ejecuciones{f' de {mes_nombre}' if mes_nombre else ''}:\n")
+    print(f"{'Ejecución':<34}{'Mes':<12}{'Modo':<12}{'Duración (s)':>13}  Estado")
+    for id_ejecucion, mes, modo, duracion, exitoso in reversed(filas):
+        estado = {1: 'OK', 0: 'ERROR'}.get(exitoso, 'en curso')
+        duracion = f"{duracion:.1f}" if duracion is not None else '-'
+        print(f"{id_ejecucion:<34}{mes:<12}{modo or '-':<12}{duracion:>13}  {estado}")
+
+
+def _mostrar_tendencias(conn, db_file, mes_nombre, paso, ultimas):
+    pasos = [fila[0] for fila in conn.execute(
+        "SELECT DISTINCT paso FROM pasos_ejecucion ORDER BY paso"
+    )]
+    if paso is not None:
+        pasos = [nombre for nombre in pasos if nombre == paso or nombre.startswith(f"paso_{paso}_")]
+        if not pasos:
+            print(f"\n✗ No hay registros del paso {paso}")
+            return
+
+    print(f"\nTiempo de pared por paso (últimas {ultimas} ejecuciones reales; "
+          f"⚠ = más de {UMBRAL_REGRESION}x la mediana de las {VENTANA_MEDIANA_HISTORIAL} anteriores):")
+    for nombre in pasos:
+        serie = tiempos_paso(db_file, nombre, mes_nombre, ultimas)
+        if not serie:
+            continue
+        tiempos = [t for *_, t in serie]
+        print(f"\n  {nombre}  (mediana {statistics.median(tiempos):.1f} s, mín {min(tiempos):.1f} s, máx {max(tiempos):.1f} s)")
+        for id_ejecucion, mes, _, tiempo in serie:
+            anteriores = [t for *_, t in tiempos_paso(db_file, nombre, mes_nombre, VENTANA_MEDIANA_HISTORIAL,
+                                                       antes_de=id_ejecucion)]
+            factor = es_regresion(tiempo, anteriores)
+            marca = f"  ⚠ {factor:.1f}x la mediana" if factor is not None else ''
+            print(f"    {id_ejecucion:<34}{mes:<12}{tiempo:>8.1f} s{marca}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Historial de ejecuciones del proceso y tendencias por paso")
+    parser.add_argument('mes', nargs='?', help="Mes a consultar (ej: SEPTIEMBRE); por defecto todos")
+    parser.add_argument('--paso', help="Paso a consultar (1-8 o nombre de la función)")
+    parser.add_argument('--ultimas', type=int, default=10, metavar='N', help="Ejecuciones a mostrar (por defecto 10)")
+    args = parser.parse_args()
+
+    if not Path(BD_HISTORIAL_EJECUCIONES).exists():
+        print(f"✗ No existe el historial: {BD_HISTORIAL_EJECUCIONES}")
+        print("  Se crea al ejecutar generar_reporte_completo.py")
+        sys.exit(1)
+
+    mes_nombre = args.mes.upper() if args.mes else None
+    conn = _conectar(BD_HISTORIAL_EJECUCIONES)
+    try:
+        print("=== HISTORIAL DE EJECUCIONES ===")
+        _mostrar_ejecuciones(conn, mes_nombre, args.ultimas)
+        _mostrar_tendencias(conn, BD_HISTORIAL_EJECUCIONES, mes_nombre, args.paso, args.ultimas)
+    finally:
+        conn.close()
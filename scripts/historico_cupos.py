@@ -0,0 +1,218 @@
+"""
+Histórico de Cupos Disponibles
+
+Almacena en una tabla SQLite indexada los valores de meta, avance, cupos
+disponibles y % de cumplimiento de cada mes, por regional y categoría, para
+que las consultas de tendencia (mes a mes, acumulado del año) sean búsquedas
+sobre el índice y no requieran volver a importar archivos .xlsb anteriores.
+
+Clave: (anio, mes, codigo_regional, subcategoria). Registrar de nuevo un mes
+reemplaza todas sus filas (las regionales o categorías que ya no vienen en
+el cruce se eliminan).
+
+Uso:
+    python historico_cupos.py <AÑO> [SUBCATEGORIA]
+
+Ejemplo:
+    python historico_cupos.py 2025 "TOTAL FORMACION TITULADA"
+"""
+
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from configuracion import BD_HISTORICO_CUPOS, TIEMPO_ESPERA_BD_COMPARTIDA
+
+COLUMNAS_VALOR = ['meta', 'avance', 'disponible', 'cumplimiento']
+
+
+def crear_tabla(conn):
+    """Crea la tabla del histórico y sus índices si no existen"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS historico_cupos (
+            anio INTEGER NOT NULL,
+            mes INTEGER NOT NULL,
+            codigo_regional INTEGER NOT NULL,
+            nombre_regional TEXT,
+            subcategoria TEXT NOT NULL,
+            meta REAL,
+            avance REAL,
+            disponible REAL,
+            cumplimiento REAL,
+            fecha_carga TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (anio, mes, codigo_regional, subcategoria)
+        )
+    """)
+    # Series por categoría (y regional) a lo largo de los meses
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_historico_cupos_serie
+        ON historico_cupos(subcategoria, codigo_regional, anio, mes)
+    """)
+
+
+def registrar_mes(db_file, anio, mes, cruce):
+    """
+    Agrega (o reemplaza por completo) los valores de un mes en el histórico
+
+    Args:
+        db_file (str | Path): Base de datos del histórico
+        anio (int): Año del corte
+        mes (int): Número de mes del corte (1-12)
+        cruce (dict): Resultado de motor_cupos.cruzar_metas_avance()
+
+    Returns:
+        int: Número de filas registradas
+    """
+    nombres = cruce['regionales'].set_index('codigo_regional')['nombre_regional']
+    codigos = cruce['meta'].index.to_numpy()
+    categorias = cruce['meta'].columns.to_numpy()
+
+    # Matrices regional × categoría a formato largo (una fila por celda)
+    largo = pd.DataFrame({
+        'codigo_regional': np.repeat(codigos, len(categorias)),
+        'subcategoria': np.tile(categorias, len(codigos)),
+        **{columna: cruce[columna].to_numpy(dtype=float).ravel() for columna in COLUMNAS_VALOR}
+    })
+    largo['nombre_regional'] = largo['codigo_regional'].map(nombres)
+
+    # NaN (categorías sin fuente de avance) se guarda como NULL
+    largo = largo.astype(object).where(largo.notna(), None)
+
+    filas = [
+        (anio, mes, int(fila.codigo_regional), fila.nombre_regional, fila.subcategoria,
+         fila.meta, fila.avance, fila.disponible, fila.cumplimiento)
+        for fila in largo.itertuples(index=False)
+    ]
+
+    conn = sqlite3.connect(db_file, timeout=TIEMPO_ESPERA_BD_COMPARTIDA)
+    try:
+        crear_tabla(conn)
+        # Reemplazo del mes completo en una sola transacción: no quedan filas
+        # de regionales o categorías que ya no están en el cruce
+        conn.execute("DELETE FROM historico_cupos WHERE anio = ? AND mes = ?", (anio, mes))
+        conn.executemany("""
+            INSERT INTO historico_cupos
+            (anio, mes, codigo_regional, nombre_regional, subcategoria,
+             meta, avance, disponible, cumplimiento)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, filas)
+        conn.commit()
+    finally:
+        conn.close()
+
+    return len(filas)
+
+
+def consultar_serie(db_file, subcategoria, codigo_regional=None, anio=None):
+    """
+    Serie mensual de una categoría, nacional o de una regional
+
+    Args:
+        db_file (str | Path): Base de datos del histórico
+        subcategoria (str): Subcategoría de metas
+        codigo_regional (int): Regional; si es None se suma el total nacional
+        anio (int): Restringe a un año (acumulado del año hasta el último corte)
+
+    Returns:
+        DataFrame: anio, mes, meta, avance, disponible, cumplimiento
+    """
+    condiciones = ['subcategoria = ?']
+    parametros = [subcategoria]
+    if codigo_regional is not None:
+        condiciones.append('codigo_regional = ?')
+        parametros.append(int(codigo_regional))
+    if anio is not None:
+        condiciones.append('anio = ?')
+        parametros.append(int(anio))
+
+    consulta = f"""
+        SELECT anio, mes,
+               SUM(meta) AS meta,
+               SUM(avance) AS avance,
+               SUM(disponible) AS disponible,
+               CASE WHEN SUM(meta) > 0 THEN SUM(avance) * 100.0 / SUM(meta) END AS cumplimiento
+        FROM historico_cupos
+        WHERE {' AND '.join(condiciones)}
+        GROUP BY anio, mes
+        ORDER BY anio, mes
+    """
+
+    conn = sqlite3.connect(db_file)
+    try:
+        return pd.read_sql_query(consulta, conn, params=parametros)
+    finally:
+        conn.close()
+
+
+def variacion_mensual(db_file, anio, mes):
+    """
+    Variación del avance de cada regional y categoría frente al mes anterior
+
+    Args:
+        db_file (str | Path): Base de datos del histórico
+        anio (int): Año del corte
+        mes (int): Mes del corte; se compara con el corte previo del mismo año
+
+    Returns:
+        DataFrame: codigo_regional, nombre_regional, subcategoria,
+            avance_anterior, avance, variacion
+    """
+    consulta = """
+        SELECT a.codigo_regional, a.nombre_regional, a.subcategoria,
+               p.avance AS avance_anterior,
+               a.avance,
+               a.avance - p.avance AS variacion
+        FROM historico_cupos a
+        LEFT JOIN historico_cupos p
+               ON p.subcategoria = a.subcategoria
+              AND p.codigo_regional = a.codigo_regional
+              AND p.anio = a.anio
+              AND p.mes = (SELECT MAX(mes) FROM historico_cupos
+                           WHERE anio = a.anio AND mes < a.mes)
+        WHERE a.anio = ? AND a.mes = ? AND a.avance IS NOT NULL
+        ORDER BY a.codigo_regional, a.subcategoria
+    """
+
+    conn = sqlite3.connect(db_file)
+    try:
+        return pd.read_sql_query(consulta, conn, params=(int(anio), int(mes)))
+    finally:
+        conn.close()
+
+
+# ============================================
+# EJEMPLO DE USO
+# ============================================
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python historico_cupos.py <AÑO> [SUBCATEGORIA]")
+        sys.exit(1)
+
+    if not Path(BD_HISTORICO_CUPOS).exists():
+        print(f"✗ No existe el histórico: {BD_HISTORICO_CUPOS}")
+        print("  Se crea al ejecutar el cruce de metas vs avance (Paso 6 de generar_reporte_completo.py)")
+        sys.exit(1)
+
+    anio = int(sys.argv[1])
+    subcategorias = sys.argv[2:]
+
+    if not subcategorias:
+        conn = sqlite3.connect(BD_HISTORICO_CUPOS)
+        try:
+            subcategorias = [fila[0] for fila in conn.execute(
+                "SELECT DISTINCT subcategoria FROM historico_cupos WHERE anio = ? AND avance IS NOT NULL",
+                (anio,)
+            )]
+        finally:
+            conn.close()
+
+    for subcategoria in subcategorias:
+        print(f"\n{'='*70}")
+        print(f" {subcategoria} - {anio}")
+        print(f"{'='*70}")
+        print(consultar_serie(BD_HISTORICO_CUPOS, subcategoria, anio=anio).to_string(index=False))
@@ -17,26 +17,66 @@ import io
 import pandas as pd
 import os
 
-# Configurar codificación para Windows
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
-
 # Importar configuración centralizada
 sys.path.insert(0, str(Path(__file__).parent))
-from configuracion import ANIO_TRABAJO
+from configuracion import ANIO_TRABAJO, BD_CATALOGO_DIVIPOLA
+from catalogo_divipola import cargar_catalogo, registrar_municipios
+from artefactos import publicar, obtener
+from trazas import trazar
+
+def buscar_catalogo_economia_naranja(directorio, anio=ANIO_TRABAJO):
+    """Busca el archivo de catálogo de economía naranja en ubicaciones conocidas"""
+    directorio = Path(directorio)
+    posibles_rutas = [
+        directorio / "CATALOGO_PROGRAMAS_ECONOMIA_NARANJA.xlsx",
+        directorio.parent / "CATALOGO_PROGRAMAS_ECONOMIA_NARANJA.xlsx",
+        Path("C:/ws/sena/data/REPORTE_ECONOMIA_NARANJA/CATALOGO_PROGRAMAS_ECONOMIA_NARANJA.xlsx"),
+        Path(f"C:/ws/sena/data/{anio}/09-Septiembre/CATALOGO_PROGRAMAS_ECONOMIA_NARANJA.xlsx")
+    ]
+
+    for ruta in posibles_rutas:
+        if ruta.exists():
+            return ruta
+    return None
+
+
+def preparar_catalogo_economia_naranja(ruta_excel, ruta_parquet):
+    """
+    Convierte el catálogo Excel de economía naranja en un artefacto Parquet
+
+    Lo usa el modo por lotes para leer el Excel una sola vez para todos los meses.
+
+    Args:
+        ruta_excel (str | Path): CATALOGO_PROGRAMAS_ECONOMIA_NARANJA.xlsx
+        ruta_parquet (str | Path): Artefacto de salida
+
+    Returns:
+        Path: Ruta del artefacto
+    """
+    df = pd.read_excel(ruta_excel)
+    return publicar(df[['CODIGO', 'VERSION', 'NOMBRE DE PROGRAMA']], ruta_parquet)
+
 
 class ImportadorFormacionSENA:
     """Importa y normaliza datos de formación SENA desde Excel a SQLite"""
 
-    def __init__(self, directorio, mes):
+    def __init__(self, directorio, mes, archivo_excel=None, catalogo_eco_naranja=None):
         self.mes = mes.upper()
         self.directorio = Path(directorio)
         self.anio = ANIO_TRABAJO
-        self.archivo_excel = self.directorio / f"PE-04_FORMACION NACIONAL {self.mes} {self.anio}.xlsb"
+        # Por defecto el PE-04 copiado en el directorio; puede ser el original (estrategia 'manifiesto')
+        self.archivo_excel = Path(archivo_excel) if archivo_excel else \
+            self.directorio / f"PE-04_FORMACION NACIONAL {self.mes} {self.anio}.xlsb"
         self.archivo_db = self.directorio / f"sena_formacion_{self.mes.lower()}.db"
+        self.bd_catalogo_divipola = Path(os.environ.get('BD_CATALOGO_DIVIPOLA', BD_CATALOGO_DIVIPOLA))
 
-        # Buscar el catálogo de economía naranja (puede estar en varios lugares)
-        self.catalogo_eco_naranja = self._buscar_catalogo_economia_naranja()
+        # Catálogo de economía naranja: el indicado (Excel o Parquet del modo por
+        # lotes) o se busca en varios lugares
+        if catalogo_eco_naranja:
+            self.catalogo_eco_naranja = Path(catalogo_eco_naranja)
+            print(f"[OK] Catálogo de Economía Naranja: {self.catalogo_eco_naranja}")
+        else:
+            self.catalogo_eco_naranja = self._buscar_catalogo_economia_naranja()
 
         # Mapeo de columnas según la estructura de la BD existente
         self.tablas = {
@@ -56,17 +96,10 @@ class ImportadorFormacionSENA:
 
     def _buscar_catalogo_economia_naranja(self):
         """Busca el archivo de catálogo de economía naranja en ubicaciones conocidas"""
-        posibles_rutas = [
-            self.directorio / "CATALOGO_PROGRAMAS_ECONOMIA_NARANJA.xlsx",
-            self.directorio.parent / "CATALOGO_PROGRAMAS_ECONOMIA_NARANJA.xlsx",
-            Path("C:/ws/sena/data/REPORTE_ECONOMIA_NARANJA/CATALOGO_PROGRAMAS_ECONOMIA_NARANJA.xlsx"),
-            Path(f"C:/ws/sena/data/{self.anio}/09-Septiembre/CATALOGO_PROGRAMAS_ECONOMIA_NARANJA.xlsx")
-        ]
-
-        for ruta in posibles_rutas:
-            if ruta.exists():
-                print(f"[OK] Catálogo de Economía Naranja encontrado: {ruta}")
-                return ruta
+        ruta = buscar_catalogo_economia_naranja(self.directorio, self.anio)
+        if ruta is not None:
+            print(f"[OK] Catálogo de Economía Naranja encontrado: {ruta}")
+            return ruta
 
         print("[!] ADVERTENCIA: No se encontró el catálogo CATALOGO_PROGRAMAS_ECONOMIA_NARANJA.xlsx")
         return None
@@ -76,8 +109,11 @@ class ImportadorFormacionSENA:
         try:
             print(f"\n→ Cargando catálogo de Economía Naranja...")
 
-            # Leer el archivo Excel
-            df = pd.read_excel(self.catalogo_eco_naranja)
+            # Leer el catálogo (Parquet ya preparado por el modo por lotes, o el Excel)
+            if self.catalogo_eco_naranja.suffix == '.parquet':
+                df = obtener(self.catalogo_eco_naranja)
+            else:
+                df = pd.read_excel(self.catalogo_eco_naranja)
 
             # Validar que existan las columnas necesarias
             columnas_requeridas = ['CODIGO', 'VERSION', 'NOMBRE DE PROGRAMA']
@@ -287,6 +323,7 @@ class ImportadorFormacionSENA:
         print(f"[OK] Base de datos creada: {self.archivo_db.name}")
         return conn
 
+    @trazar
     def leer_excel(self):
         """Lee el archivo Excel y retorna los datos"""
         print(f"Leyendo archivo Excel...")
@@ -308,6 +345,7 @@ class ImportadorFormacionSENA:
         print(f"[OK] Total de filas leidas: {len(rows)}")
         return rows
 
+    @trazar
     def normalizar_e_importar(self, rows):
         """Normaliza los datos y los importa a la base de datos"""
         conn = self.crear_base_datos()
@@ -341,6 +379,13 @@ class ImportadorFormacionSENA:
         # Crear diccionario para almacenar índices de columnas
         col_idx = {header: idx for idx, header in enumerate(headers) if header}
 
+        # Nombres de departamento/municipio del catálogo DIVIPOLA compartido
+        catalogo = cargar_catalogo(self.bd_catalogo_divipola)
+        nombres_divipola = dict(zip(catalogo.index,
+                                    zip(catalogo['nombre_departamento'], catalogo['nombre_municipio'])))
+        # Un registro por municipio nuevo (el PE-04 trae una fila por ficha)
+        municipios_nuevos = {}
+
         print("\nNormalizando e importando datos...")
         fichas_procesadas = 0
 
@@ -436,6 +481,21 @@ class ImportadorFormacionSENA:
                 nombre_depto = get_val('NOMBRE_DEPARTAMENTO_CURSO')
                 nombre_muni = get_val('NOMBRE_MUNICIPIO_CURSO')
                 if codigo_pais and codigo_depto and codigo_muni:
+                    if str(nombre_pais).strip().upper() == 'COLOMBIA':
+                        # El código de municipio puede venir con o sin el departamento;
+                        # un código no numérico conserva los nombres de la hoja
+                        try:
+                            clave = int(codigo_muni)
+                            if clave < 1000:
+                                clave += int(codigo_depto) * 1000
+                        except (TypeError, ValueError):
+                            clave = None
+                        if clave in nombres_divipola:
+                            depto_catalogo, muni_catalogo = nombres_divipola[clave]
+                            nombre_depto = depto_catalogo or nombre_depto
+                            nombre_muni = muni_catalogo or nombre_muni
+                        elif clave is not None:
+                            municipios_nuevos.setdefault(clave, (clave, nombre_depto, nombre_muni))
                     cursor.execute("""
                         INSERT OR IGNORE INTO ubicaciones
                         (CODIGO_PAIS, CODIGO_DEPARTAMENTO, CODIGO_MUNICIPIO,
@@ -523,6 +583,11 @@ class ImportadorFormacionSENA:
         conn.commit()
         print(f"\n[OK] Fichas importadas: {fichas_procesadas}")
 
+        version_catalogo = registrar_municipios(self.bd_catalogo_divipola, municipios_nuevos.values(),
+                                                fuente=self.archivo_excel.name)
+        if version_catalogo is not None:
+            print(f"[OK] Catálogo DIVIPOLA actualizado (versión {version_catalogo})")
+
         # Mostrar estadísticas
         self.mostrar_estadisticas(cursor)
 
@@ -580,16 +645,37 @@ class ImportadorFormacionSENA:
             print(f"\n[ERROR] Error durante la importacion: {e}\n")
             raise
 
+def ejecutar(config):
+    """
+    Punto de entrada del paso 3 para el orquestador (ejecución en proceso)
+
+    Args:
+        config (dict): Configuración del mes (configuracion.obtener_config_mes)
+
+    Returns:
+        bool: True si la importación terminó
+    """
+    importador = ImportadorFormacionSENA(config['dir_datos_intermedios'], config['mes_nombre'],
+                                         config['archivos_trabajo']['pe04_formacion'],
+                                         config.get('compartidos', {}).get('catalogo_economia_naranja'))
+    importador.ejecutar()
+    return True
+
 def main():
     """Función principal"""
+    # Configurar codificación para Windows (solo al ejecutarse como script)
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
     if len(sys.argv) < 3:
-        print("Uso: python importar_mes.py <DIRECTORIO> <MES>")
+        print("Uso: python importar_mes.py <DIRECTORIO> <MES> [ARCHIVO_PE04]")
         print("Ejemplo: python importar_mes.py c:\\ws\\sena\\data\\ SEPTIEMBRE")
         sys.exit(1)
 
     directorio = Path(sys.argv[1])
     mes = sys.argv[2]
-    importador = ImportadorFormacionSENA(directorio, mes)
+    archivo_excel = sys.argv[3] if len(sys.argv) > 3 else None
+    importador = ImportadorFormacionSENA(directorio, mes, archivo_excel)
     importador.ejecutar()
 
 if __name__ == "__main__":
@@ -0,0 +1,493 @@
+"""
+Lectura de libros Excel binarios (.xlsb)
+
+Este módulo abre un libro .xlsb una sola vez (la tabla de cadenas compartidas
+se indexa una única vez) y decodifica solo las hojas solicitadas. Cada hoja
+se devuelve como DataFrame con la misma semántica de
+pd.read_excel(..., engine='pyxlsb', header=N).
+
+Opcionalmente se puede indicar, por hoja, qué columnas se necesitan (por
+índice o por nombre de encabezado); las celdas de las demás columnas se
+saltan sin decodificar su valor ni crear objetos para ellas.
+
+Si la fila de encabezado no se conoce, se puede pasar un DetectorEncabezado:
+la hoja se decodifica una sola vez y el encabezado se ubica sobre las filas ya
+leídas. Las filas detectadas se recuerdan por huella del diseño de la hoja.
+
+Uso (comparar lectura completa vs. podada sobre un avance de cupos):
+    python lector_xlsb.py <ARCHIVO_AVANCE_CUPOS.xlsb>
+"""
+
+import hashlib
+import json
+import os
+import struct
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+from pyxlsb import open_workbook
+
+from trazas import traza, trazar
+
+# La lectura podada usa el lector interno de pyxlsb (probado con 1.0.10). Si
+# otra versión no lo tiene, las hojas se leen con hoja.rows(): mismo
+# resultado, sin saltar las celdas de las columnas no pedidas
+try:
+    from pyxlsb import biff12
+    from pyxlsb.handlers import CellHandler
+    from pyxlsb.reader import RecordReader
+
+    # Registros BIFF12 que contienen el valor de una celda
+    _REGISTROS_CELDA = frozenset(range(biff12.BLANK, biff12.FORMULA_BOOLERR + 1))
+    _LECTOR_CELDA = CellHandler()
+except (ImportError, AttributeError):
+    _LECTOR_CELDA = None
+_UINT32 = struct.Struct('<I')
+_aviso_lector_interno = False
+
+
+def _convertir_celda(valor):
+    """Convierte el valor de una celda igual que el lector pyxlsb de pandas"""
+    if valor is None:
+        return ''
+    if isinstance(valor, float):
+        entero = int(valor)
+        return entero if entero == valor else valor
+    return valor
+
+
+def _normalizar_ancho(filas):
+    """Extiende todas las filas al ancho de la más larga"""
+    if filas:
+        ancho = max(len(fila) for fila in filas)
+        filas = [fila + [''] * (ancho - len(fila)) for fila in filas]
+    return filas
+
+
+def _filas_hoja(hoja):
+    """
+    Extrae las filas de una hoja como listas de valores
+
+    Las filas vacías intermedias se conservan para que el índice de cada fila
+    coincida con su número en la hoja (mismo comportamiento que pandas).
+
+    Args:
+        hoja (pyxlsb.Worksheet): Hoja abierta
+
+    Returns:
+        list: Lista de filas, todas con el mismo ancho
+    """
+    filas = []
+    fila_anterior = -1
+
+    for fila in hoja.rows(sparse=True):
+        numero_fila = fila[0].r
+        valores = [_convertir_celda(celda.v) for celda in fila]
+        while valores and valores[-1] == '':
+            valores.pop()
+        if valores:
+            filas.extend([[]] * (numero_fila - fila_anterior - 1))
+            filas.append(valores)
+            fila_anterior = numero_fila
+
+    return _normalizar_ancho(filas)
+
+
+def _celdas_hoja(hoja, columna_valida):
+    """Igual que _registros_celdas, con la API pública de pyxlsb (decodifica todas las celdas)"""
+    for fila in hoja.rows(sparse=True):
+        for celda in fila:
+            if celda.v is not None and columna_valida(celda.r, celda.c):
+                yield celda.r, celda.c, celda.v
+
+
+def _registros_celdas(hoja, columna_valida):
+    """
+    Recorre los registros de datos de una hoja decodificando solo algunas celdas
+
+    Lee directamente el flujo BIFF12 de la hoja: para cada registro de celda
+    se lee únicamente el índice de columna (4 bytes) y, si la columna no es
+    válida según `columna_valida(fila, columna)`, el resto del registro se
+    salta sin decodificar. Si la versión de pyxlsb no tiene el lector interno,
+    se recorren las celdas con hoja.rows().
+
+    Args:
+        hoja (pyxlsb.Worksheet): Hoja abierta
+        columna_valida (callable): Filtro (fila, columna) -> bool
+
+    Yields:
+        tuple: (fila, columna, valor) de cada celda decodificada
+    """
+    global _aviso_lector_interno
+
+    # pyxlsb no expone el flujo de registros; se usa el lector interno de la hoja
+    try:
+        lector = hoja._reader
+        cadenas = hoja._stringtable
+        flujo = lector._fp
+        inicio_datos = hoja._data_offset
+    except AttributeError:
+        lector = None
+    if lector is None or _LECTOR_CELDA is None:
+        if not _aviso_lector_interno:
+            _aviso_lector_interno = True
+            print("[ADVERTENCIA] Esta versión de pyxlsb no tiene el lector interno probado (1.0.10); "
+                  "lectura podada con hoja.rows()")
+        yield from _celdas_hoja(hoja, columna_valida)
+        return
+
+    lector.seek(inicio_datos)
+
+    fila = -1
+    while True:
+        recid = lector.read_id()
+        reclen = lector.read_len()
+        if recid is None or reclen is None or recid == biff12.SHEETDATA_END:
+            break
+
+        if recid in _REGISTROS_CELDA:
+            cabecera = flujo.read(4)
+            columna = _UINT32.unpack(cabecera)[0]
+            if not columna_valida(fila, columna):
+                flujo.seek(reclen - 4, 1)
+                continue
+            with RecordReader(cabecera + flujo.read(reclen - 4)) as registro:
+                valor = _LECTOR_CELDA.read(registro, recid, reclen).v
+            if recid == biff12.STRING and cadenas is not None:
+                valor = cadenas[valor]
+            yield fila, columna, valor
+        elif recid == biff12.ROW:
+            fila = _UINT32.unpack(flujo.read(reclen)[:4])[0]
+        else:
+            flujo.seek(reclen, 1)
+
+
+def _resolver_columnas(columnas, encabezados):
+    """
+    Traduce nombres de encabezado a índices de columna
+
+    Args:
+        columnas (list): Índices (int) o nombres de encabezado (str)
+        encabezados (dict): {indice_columna: valor_encabezado}
+
+    Returns:
+        list: Índices de columna en el mismo orden de `columnas`
+    """
+    por_nombre = {}
+    for indice, valor in sorted(encabezados.items()):
+        por_nombre.setdefault(str(valor).strip().upper(), indice)
+
+    indices = []
+    for columna in columnas:
+        if isinstance(columna, str):
+            clave = columna.strip().upper()
+            if clave not in por_nombre:
+                raise ValueError(f"Columna '{columna}' no encontrada en el encabezado")
+            indices.append(por_nombre[clave])
+        else:
+            indices.append(int(columna))
+    return indices
+
+
+def _leer_hoja_podada(hoja, header, columnas):
+    """
+    Decodifica solo las columnas indicadas de una hoja
+
+    Args:
+        hoja (pyxlsb.Worksheet): Hoja abierta
+        header (int | None): Fila de encabezados (base 0) o None
+        columnas (list): Índices o nombres de encabezado. Los nombres
+            requieren `header`
+
+    Returns:
+        DataFrame: Columnas en el orden solicitado
+    """
+    por_nombre = any(isinstance(c, str) for c in columnas)
+    if por_nombre and header is None:
+        raise ValueError("Seleccionar columnas por nombre requiere indicar la fila de encabezado")
+
+    inicio = -1 if header is None else header
+    encabezados = {}
+    indices = None if por_nombre else _resolver_columnas(columnas, {})
+    posicion = None if indices is None else {c: i for i, c in enumerate(indices)}
+
+    def columna_valida(fila, columna):
+        nonlocal indices, posicion
+        # La fila de encabezado se decodifica completa si hay que resolver nombres
+        if fila == header:
+            return por_nombre or columna in posicion
+        if fila <= inicio:
+            return False
+        if posicion is None:
+            # Primera celda de datos: el encabezado ya está completo
+            indices = _resolver_columnas(columnas, encabezados)
+            posicion = {c: i for i, c in enumerate(indices)}
+        return columna in posicion
+
+    filas = {}
+    for fila, columna, valor in _registros_celdas(hoja, columna_valida):
+        if fila == header:
+            encabezados[columna] = valor
+            continue
+        valor = _convertir_celda(valor)
+        if valor != '':
+            filas.setdefault(fila, [''] * len(indices))[posicion[columna]] = valor
+
+    if indices is None:
+        indices = _resolver_columnas(columnas, encabezados)
+
+    datos = []
+    if header is not None:
+        nombres = []
+        for indice in indices:
+            valor = _convertir_celda(encabezados.get(indice))
+            nombres.append(valor if valor != '' else f'Unnamed: {indice}')
+        datos.append(nombres)
+
+    if filas:
+        primera = inicio + 1
+        for numero in range(primera, max(filas) + 1):
+            datos.append(filas.get(numero, [''] * len(indices)))
+
+    if not datos:
+        return pd.DataFrame(columns=indices)
+
+    df = TextParser(datos, header=None if header is None else 0, skip_blank_lines=False).read()
+    if header is None:
+        df.columns = indices
+    return df
+
+
+def huella_hoja(hoja):
+    """
+    Calcula la huella del diseño de una hoja sin decodificar sus celdas
+
+    Se basa en el nombre, la primera fila y las columnas usadas (registro de
+    dimensión, sin el número de filas) y en la definición de columnas (anchos
+    y estilos), que se mantienen entre meses mientras no cambie la plantilla.
+
+    Args:
+        hoja (pyxlsb.Worksheet): Hoja abierta
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    dimension = hoja.dimension
+    diseno = [
+        hoja.name.strip().upper(),
+        None if dimension is None else [dimension.r, dimension.c, dimension.w],
+        [list(col) for col in hoja.cols]
+    ]
+    return hashlib.sha1(json.dumps(diseno).encode('utf-8')).hexdigest()
+
+
+class DetectorEncabezado:
+    """
+    Ubica la fila de encabezado de una hoja buscando palabras clave
+
+    Las filas detectadas se guardan en `cache` ({huella: fila}); si la huella
+    de una hoja ya está en el cache y esa fila sigue conteniendo alguna palabra
+    clave, no se vuelve a buscar.
+    """
+
+    def __init__(self, palabras_clave, max_filas=20, cache=None):
+        self.palabras_clave = [palabra.upper() for palabra in palabras_clave]
+        self.max_filas = max_filas
+        self.cache = {} if cache is None else cache
+
+    def _es_encabezado(self, fila):
+        texto = ' '.join(str(valor).upper() for valor in fila if valor != '')
+        return any(palabra in texto for palabra in self.palabras_clave)
+
+    def __call__(self, filas, huella):
+        """
+        Retorna la fila de encabezado (base 0) o None si no se encuentra
+
+        Args:
+            filas (list): Filas de la hoja (de _filas_hoja)
+            huella (str): Huella del diseño de la hoja
+        """
+        fila = self.cache.get(huella)
+        if fila is not None and fila < len(filas) and self._es_encabezado(filas[fila]):
+            return fila
+
+        for i in range(min(self.max_filas, len(filas))):
+            if self._es_encabezado(filas[i]):
+                self.cache[huella] = i
+                return i
+        return None
+
+
+def cargar_cache_encabezados(ruta):
+    """Carga el cache {huella: fila_header} (vacío si el archivo no existe)"""
+    try:
+        with open(ruta, encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except FileNotFoundError:
+        return {}
+
+
+def guardar_cache_encabezados(ruta, cache):
+    """Guarda el cache {huella: fila_header} (reemplazo atómico: varios meses pueden escribirlo a la vez)"""
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(cache, archivo, indent=2, sort_keys=True)
+    os.replace(temporal, ruta)
+
+
+def _hoja_a_dataframe(hoja, header, columnas=None):
+    """
+    Decodifica una hoja y construye el DataFrame con la fila de encabezado indicada
+
+    `header` puede ser un índice, None o un detector (filas, huella) -> índice.
+    La fila usada queda en df.attrs['fila_header'] y la huella de la hoja en
+    df.attrs['huella'].
+    """
+    with traza('leer_hoja', hoja=hoja.name, podada=columnas is not None):
+        if columnas is not None:
+            if callable(header):
+                raise ValueError("La lectura podada requiere una fila de encabezado fija")
+            df = _leer_hoja_podada(hoja, header, columnas)
+        else:
+            filas = _filas_hoja(hoja)
+            if callable(header):
+                # La detección se hace sobre las filas ya decodificadas: una sola lectura
+                header = header(filas, huella_hoja(hoja))
+            if not filas:
+                df = pd.DataFrame()
+            else:
+                df = TextParser(filas, header=header, skip_blank_lines=False).read()
+
+    df.attrs['fila_header'] = header
+    df.attrs['huella'] = huella_hoja(hoja)
+    return df
+
+
+def _validar_hojas(libro, ruta, hojas):
+    """Verifica que todas las hojas solicitadas existan en el libro"""
+    disponibles = {nombre.lower() for nombre in libro.sheets}
+    faltantes = [nombre for nombre in hojas if nombre.lower() not in disponibles]
+    if faltantes:
+        raise ValueError(f"Hojas no encontradas en {ruta}: {', '.join(repr(h) for h in faltantes)}")
+
+
+def _leer_hoja_en_proceso(ruta, nombre, header, columnas):
+    """Abre el libro en un proceso de trabajo y decodifica una sola hoja"""
+    with open_workbook(str(ruta)) as libro:
+        _validar_hojas(libro, ruta, [nombre])
+        hoja = libro.get_sheet(nombre)
+        try:
+            return _hoja_a_dataframe(hoja, header, columnas)
+        finally:
+            hoja.close()
+
+
+@trazar
+def leer_hojas_xlsb(ruta, hojas, columnas=None, paralelo=True, max_workers=None, procesos=False):
+    """
+    Lee varias hojas de un libro .xlsb abriendo el archivo una sola vez
+
+    Args:
+        ruta (str | Path): Ruta del libro .xlsb
+        hojas (dict): {nombre_hoja: fila_header}. fila_header es el índice
+            (base 0) de la fila de encabezados, None si la hoja no tiene, o
+            un DetectorEncabezado
+        columnas (dict): {nombre_hoja: [índices o nombres de encabezado]}.
+            Las hojas incluidas solo decodifican esas columnas, en ese orden;
+            las demás hojas se leen completas
+        paralelo (bool): Si True, decodifica las hojas en un pool de hilos
+        max_workers (int): Número máximo de hilos/procesos (por defecto, uno por hoja)
+        procesos (bool): Si True (y paralelo), decodifica cada hoja en un
+            proceso aparte. Cada proceso abre el libro por su cuenta, pero la
+            decodificación no compite por el GIL: el tiempo total se acerca
+            al de la hoja más grande. En Windows el script que llama debe
+            ejecutarse bajo `if __name__ == '__main__':`
+
+    Returns:
+        dict: {nombre_hoja: DataFrame} en el mismo orden de `hojas`
+    """
+    columnas = columnas or {}
+
+    if paralelo and procesos and len(hojas) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers or len(hojas)) as executor:
+            futuros = {
+                nombre: executor.submit(_leer_hoja_en_proceso, ruta, nombre, header, columnas.get(nombre))
+                for nombre, header in hojas.items()
+            }
+            return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+    with open_workbook(str(ruta)) as libro:
+        _validar_hojas(libro, ruta, hojas)
+
+        # Las partes de cada hoja se extraen del zip en secuencia (el ZipFile es
+        # compartido); la decodificación de los registros sí puede ir en paralelo
+        partes = {nombre: libro.get_sheet(nombre) for nombre in hojas}
+
+        try:
+            if paralelo and len(partes) > 1:
+                with ThreadPoolExecutor(max_workers=max_workers or len(partes)) as executor:
+                    futuros = {
+                        nombre: executor.submit(_hoja_a_dataframe, partes[nombre], header, columnas.get(nombre))
+                        for nombre, header in hojas.items()
+                    }
+                    return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+            return {
+                nombre: _hoja_a_dataframe(partes[nombre], header, columnas.get(nombre))
+                for nombre, header in hojas.items()
+            }
+        finally:
+            for parte in partes.values():
+                parte.close()
+
+
+def comparar_lectura_podada(ruta, hojas, columnas):
+    """
+    Mide tiempo y memoria pico de la lectura completa frente a la podada
+
+    Args:
+        ruta (str | Path): Ruta del libro .xlsb
+        hojas (dict): {nombre_hoja: fila_header}
+        columnas (dict): {nombre_hoja: [índices o nombres de encabezado]}
+
+    Returns:
+        dict: {'completa': (segundos, bytes_pico), 'podada': (segundos, bytes_pico)}
+    """
+    resultados = {}
+    for modo, seleccion in (('completa', None), ('podada', columnas)):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        leer_hojas_xlsb(ruta, hojas, columnas=seleccion, paralelo=False)
+        duracion = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultados[modo] = (duracion, pico)
+    return resultados
+
+
+# ============================================
+# EJEMPLO DE USO
+# ============================================
+
+if __name__ == '__main__':
+    import sys
+    from configuracion import HOJAS_AVANCE_CUPOS, MAPEO_AVANCE_CUPOS
+    from motor_cupos import columnas_por_hoja
+
+    if len(sys.argv) < 2:
+        print("Uso: python lector_xlsb.py <ARCHIVO_AVANCE_CUPOS.xlsb>")
+        sys.exit(1)
+
+    columnas = columnas_por_hoja(MAPEO_AVANCE_CUPOS)
+    hojas = {nombre: HOJAS_AVANCE_CUPOS[nombre] for nombre in columnas}
+
+    resultados = comparar_lectura_podada(sys.argv[1], hojas, columnas)
+    (t_completa, m_completa), (t_podada, m_podada) = resultados['completa'], resultados['podada']
+
+    print(f"Lectura completa: {t_completa:8.2f} s  {m_completa / (1024 * 1024):8.1f} MB pico")
+    print(f"Lectura podada:   {t_podada:8.2f} s  {m_podada / (1024 * 1024):8.1f} MB pico")
+    if t_completa > 0 and m_completa > 0:
+        print(f"Reducción:        {1 - t_podada / t_completa:8.1%}    {1 - m_podada / m_completa:8.1%}")
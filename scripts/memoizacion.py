@@ -0,0 +1,227 @@
+"""
+Memoización de los pasos del proceso (al estilo make)
+
+Cada paso declara sus archivos de entrada, sus salidas y los scripts que lo
+implementan. Al terminar bien, se registra su huella: el hash del contenido
+de cada entrada, la versión del código (hash de los scripts y de los módulos
+locales que importan) y los parámetros del mes. En la siguiente ejecución el
+paso se omite si:
+
+- tiene huella registrada y coincide con la actual, y
+- todas sus salidas existen y no son más antiguas que sus entradas
+
+Las huellas se guardan en datos_intermedios/.huellas_pasos.json junto con
+un caché de hashes por (tamaño, fecha de modificación), para no volver a
+leer los .xlsb grandes cuando no han cambiado.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+ARCHIVO_HUELLAS = '.huellas_pasos.json'
+
+# Tamaño de bloque para calcular hashes de archivos grandes
+TAMANO_BLOQUE = 1024 * 1024
+
+
+def sha256_archivo(ruta):
+    """Hash SHA-256 del contenido de un archivo (leído por bloques)"""
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(TAMANO_BLOQUE), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def modulos_locales(script):
+    """
+    Script y módulos del mismo directorio que importa (directa o indirectamente)
+
+    Args:
+        script (str | Path): Script .py (o archivo de otro tipo, que se
+            retorna solo)
+
+    Returns:
+        list[Path]: Archivos ordenados por nombre
+    """
+    script = Path(script)
+    directorio = script.parent
+    encontrados = {}
+    pendientes = [script]
+
+    while pendientes:
+        actual = pendientes.pop()
+        if actual.name in encontrados or not actual.exists():
+            continue
+        encontrados[actual.name] = actual
+        if actual.suffix != '.py':
+            continue
+
+        arbol = ast.parse(actual.read_text(encoding='utf-8'))
+        for nodo in ast.walk(arbol):
+            if isinstance(nodo, ast.Import):
+                nombres = [alias.name for alias in nodo.names]
+            elif isinstance(nodo, ast.ImportFrom) and nodo.module and not nodo.level:
+                nombres = [nodo.module]
+            else:
+                continue
+            for nombre in nombres:
+                modulo = directorio / f"{nombre.split('.')[0]}.py"
+                if modulo.exists():
+                    pendientes.append(modulo)
+
+    return [encontrados[nombre] for nombre in sorted(encontrados)]
+
+
+def version_codigo(scripts, hash_archivo=sha256_archivo):
+    """
+    Versión del código de un paso: hash de sus scripts y de los módulos locales que importan
+
+    Args:
+        scripts (list[Path]): Scripts que implementan el paso
+        hash_archivo (callable): Función ruta -> hash (permite usar un caché)
+
+    Returns:
+        str: Hash hexadecimal
+    """
+    version = hashlib.sha256()
+    for archivo in sorted({modulo for script in scripts for modulo in modulos_locales(script)}):
+        version.update(archivo.name.encode('utf-8'))
+        version.update(hash_archivo(archivo).encode('ascii'))
+    return version.hexdigest()
+
+
+class RegistroPasos:
+    """
+    Huellas de los pasos ejecutados para un mes
+
+    Es seguro usarlo desde los hilos del planificador de pasos.
+    """
+
+    def __init__(self, directorio):
+        self.ruta = Path(directorio) / ARCHIVO_HUELLAS
+        self._lock = threading.Lock()
+        datos = {}
+        if self.ruta.exists():
+            try:
+                with open(self.ruta, encoding='utf-8') as f:
+                    datos = json.load(f)
+            except (OSError, ValueError):
+                datos = {}
+        self._pasos = datos.get('pasos', {})
+        self._hashes = datos.get('hashes', {})
+
+    def hash_archivo(self, ruta):
+        """Hash SHA-256 del contenido (reutiliza el anterior si el archivo no cambió)"""
+        ruta = Path(ruta)
+        estado = ruta.stat()
+        clave = str(ruta.resolve())
+        with self._lock:
+            previo = self._hashes.get(clave)
+        if previo and previo['tamano'] == estado.st_size and previo['mtime_ns'] == estado.st_mtime_ns:
+            return previo['sha256']
+
+        sha256 = sha256_archivo(ruta)
+        with self._lock:
+            self._hashes[clave] = {'tamano': estado.st_size, 'mtime_ns': estado.st_mtime_ns, 'sha256': sha256}
+        return sha256
+
+    def huella(self, entradas, scripts, parametros=None):
+        """
+        Huella actual de un paso
+
+        Args:
+            entradas (list[Path]): Archivos que lee el paso (los que no
+                existen se registran como None)
+            scripts (list[Path]): Scripts que implementan el paso
+            parametros (dict): Valores que cambian el resultado (mes, formato...)
+
+        Returns:
+            dict: {'entradas': {ruta: hash}, 'codigo': hash, 'parametros': {...}}
+        """
+        return {
+            'entradas': {str(ruta): self.hash_archivo(ruta) if Path(ruta).exists() else None for ruta in entradas},
+            'codigo': version_codigo(scripts, self.hash_archivo),
+            'parametros': {clave: str(valor) for clave, valor in (parametros or {}).items()}
+        }
+
+    def al_dia(self, nombre, entradas, salidas, scripts, parametros=None):
+        """
+        Indica si un paso puede omitirse
+
+        Returns:
+            tuple: (True si está al día, motivo para ejecutarlo o None)
+        """
+        with self._lock:
+            registrada = self._pasos.get(nombre)
+        if registrada is None:
+            return False, "sin ejecución previa registrada"
+
+        faltantes = [Path(salida).name for salida in salidas if not Path(salida).exists()]
+        if faltantes:
+            return False, f"falta la salida {faltantes[0]}"
+
+        entradas_existentes = [Path(ruta) for ruta in entradas if Path(ruta).exists()]
+        if entradas_existentes and salidas:
+            entrada_reciente = max(entradas_existentes, key=lambda ruta: ruta.stat().st_mtime)
+            salida_antigua = min((Path(salida) for salida in salidas), key=lambda ruta: ruta.stat().st_mtime)
+            if salida_antigua.stat().st_mtime < entrada_reciente.stat().st_mtime:
+                return False, f"{entrada_reciente.name} es más reciente que {salida_antigua.name}"
+
+        actual = self.huella(entradas, scripts, parametros)
+        if actual['codigo'] != registrada['codigo']:
+            return False, "cambió el código del paso"
+        if actual['parametros'] != registrada['parametros']:
+            return False, "cambiaron los parámetros"
+        for ruta, sha256 in actual['entradas'].items():
+            if registrada['entradas'].get(ruta) != sha256:
+                return False, f"cambió la entrada {Path(ruta).name}"
+        if set(registrada['entradas']) != set(actual['entradas']):
+            return False, "cambiaron las entradas del paso"
+
+        return True, None
+
+    def registrar(self, nombre, huella, propias=()):
+        """
+        Registra la huella de un paso que terminó bien
+
+        La huella se toma antes de ejecutar el paso (huella()): si una entrada
+        cambia mientras el paso corre, la salida se construyó con la versión
+        anterior y la próxima ejecución debe repetirlo.
+
+        Args:
+            nombre (str): Nombre del paso
+            huella (dict): Huella tomada antes de ejecutarlo
+            propias (list[Path]): Salidas del paso; las que también son
+                entradas (p. ej. el paso 4 sobre la BD de formación) se
+                vuelven a calcular al terminar, así el paso queda al día
+        """
+        entradas = dict(huella['entradas'])
+        for ruta in map(str, propias):
+            if ruta in entradas and Path(ruta).exists():
+                entradas[ruta] = self.hash_archivo(ruta)
+        huella = dict(huella, entradas=entradas)
+        with self._lock:
+            self._pasos[nombre] = huella
+        self.guardar()
+
+    def invalidar(self, nombre):
+        """Elimina la huella de un paso (se ejecutará la próxima vez)"""
+        with self._lock:
+            existia = self._pasos.pop(nombre, None) is not None
+        if existia:
+            self.guardar()
+
+    def guardar(self):
+        """Escribe las huellas (reemplazo atómico del archivo)"""
+        with self._lock:
+            datos = {'pasos': dict(self._pasos), 'hashes': dict(self._hashes)}
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = self.ruta.with_name(f'{self.ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(datos, f, ensure_ascii=False, indent=2)
+            os.replace(temporal, self.ruta)
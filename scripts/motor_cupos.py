@@ -0,0 +1,189 @@
+"""
+Motor de cruce Metas vs. Avance de cupos
+
+Construye las matrices regional × categoría de metas y de avance para todas
+las categorías del esquema de metas (categorias_formacion) y calcula en una
+sola operación vectorizada los cupos disponibles (META - AVANCE) y el
+porcentaje de cumplimiento (AVANCE / META).
+
+Las fuentes de avance se declaran en configuracion.MAPEO_AVANCE_CUPOS como
+(hoja, columna, subcategoría). Las categorías sin fuente de avance quedan con
+avance, disponible y cumplimiento en NaN.
+"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from lector_xlsb import leer_hojas_xlsb
+from trazas import trazar
+
+
+def columnas_por_hoja(mapeo):
+    """
+    Agrupa las columnas del mapeo por hoja
+
+    Args:
+        mapeo (list): Tuplas (hoja, columna, subcategoría)
+
+    Returns:
+        dict: {hoja: [0, columna, ...]} con el código regional primero
+    """
+    columnas = {}
+    for hoja, columna, _ in mapeo:
+        columnas.setdefault(hoja, [0])
+        if columna not in columnas[hoja]:
+            columnas[hoja].append(columna)
+    return columnas
+
+
+@trazar
+def leer_avance_cupos(ruta, hojas, mapeo):
+    """
+    Lee del archivo de avance solo las hojas y columnas declaradas en el mapeo
+
+    Args:
+        ruta (str | Path): Archivo PRIMER AVANCE CUPOS DE FORMACION (.xlsb)
+        hojas (dict): {hoja: fila_header}
+        mapeo (list): Tuplas (hoja, columna, subcategoría)
+
+    Returns:
+        dict: {hoja: DataFrame} con columnas en el orden de columnas_por_hoja()
+    """
+    columnas = columnas_por_hoja(mapeo)
+    return leer_hojas_xlsb(ruta, {hoja: hojas[hoja] for hoja in columnas}, columnas=columnas)
+
+
+def cargar_matriz_metas(db_file, anio):
+    """
+    Carga las metas de cupos como matriz regional × categoría
+
+    Args:
+        db_file (str | Path): Base de datos de metas (metas_sena_2025.db)
+        anio (int): Año de las metas
+
+    Returns:
+        tuple: (regionales, categorias, metas)
+            - regionales: DataFrame con codigo_regional y nombre_regional
+            - categorias: lista de subcategorías en orden de id_categoria
+            - metas: np.ndarray (n_regionales × n_categorias)
+    """
+    conn = sqlite3.connect(db_file)
+    try:
+        categorias = pd.read_sql_query(
+            "SELECT id_categoria, subcategoria FROM categorias_formacion ORDER BY id_categoria",
+            conn
+        )
+        valores = pd.read_sql_query("""
+            SELECT r.codigo_regional, r.nombre_regional, m.id_categoria, m.valor
+            FROM metas_cupos m
+            JOIN regionales r ON m.id_regional = r.id_regional
+            WHERE m.anio = ?
+        """, conn, params=(anio,))
+    finally:
+        conn.close()
+
+    regionales = (valores[['codigo_regional', 'nombre_regional']]
+                  .drop_duplicates('codigo_regional')
+                  .sort_values('codigo_regional')
+                  .reset_index(drop=True))
+
+    filas = pd.Index(regionales['codigo_regional']).get_indexer(valores['codigo_regional'])
+    columnas = pd.Index(categorias['id_categoria']).get_indexer(valores['id_categoria'])
+
+    # Si una meta está cargada más de una vez se toma el máximo
+    metas = np.zeros((len(regionales), len(categorias)))
+    np.maximum.at(metas, (filas, columnas), valores['valor'].fillna(0).to_numpy(dtype=float))
+
+    return regionales, categorias['subcategoria'].tolist(), metas
+
+
+def construir_matriz_avance(hojas_avance, mapeo, codigos_regionales, categorias):
+    """
+    Construye la matriz regional × categoría de avance a partir del mapeo
+
+    Args:
+        hojas_avance (dict): {hoja: DataFrame} de leer_avance_cupos()
+        mapeo (list): Tuplas (hoja, columna, subcategoría)
+        codigos_regionales (array-like): Códigos regionales (filas de la matriz)
+        categorias (list): Subcategorías (columnas de la matriz)
+
+    Returns:
+        np.ndarray: Avance por regional y categoría. Las categorías sin fuente
+            quedan en NaN; las regionales ausentes en una hoja, en 0
+    """
+    indice_regional = pd.Index(codigos_regionales)
+    indice_categoria = {categoria: i for i, categoria in enumerate(categorias)}
+
+    faltantes = [sub for _, _, sub in mapeo if sub not in indice_categoria]
+    if faltantes:
+        raise ValueError(f"Subcategorías del mapeo no existen en el esquema de metas: {', '.join(faltantes)}")
+
+    avance = np.full((len(indice_regional), len(categorias)), np.nan)
+    columnas = columnas_por_hoja(mapeo)
+
+    for hoja, df in hojas_avance.items():
+        entradas = [(col, sub) for h, col, sub in mapeo if h == hoja]
+        destino = [indice_categoria[sub] for _, sub in entradas]
+        avance[:, destino] = 0
+
+        codigos = pd.to_numeric(df.iloc[:, 0], errors='coerce')
+        filas = indice_regional.get_indexer(codigos)
+        validas = filas >= 0
+
+        posiciones = [columnas[hoja].index(col) for col, _ in entradas]
+        valores = df.iloc[:, posiciones].apply(pd.to_numeric, errors='coerce').fillna(0).to_numpy(dtype=float)
+        # El avance son conteos de cupos: se descarta cualquier fracción
+        valores = np.trunc(valores)
+
+        avance[np.ix_(filas[validas], destino)] = valores[validas]
+
+    return avance
+
+
+def calcular_cupos(metas, avance):
+    """
+    Calcula cupos disponibles y % de cumplimiento para todas las categorías
+
+    Args:
+        metas (np.ndarray): Matriz regional × categoría de metas
+        avance (np.ndarray): Matriz regional × categoría de avance
+
+    Returns:
+        tuple: (disponibles, cumplimiento) como np.ndarray
+    """
+    disponibles = metas - avance
+    cumplimiento = np.full_like(avance, np.nan)
+    np.divide(avance * 100, metas, out=cumplimiento, where=metas > 0)
+    return disponibles, cumplimiento
+
+
+@trazar
+def cruzar_metas_avance(db_file, anio, hojas_avance, mapeo):
+    """
+    Ejecuta el cruce completo y retorna las cuatro matrices como DataFrames
+
+    Args:
+        db_file (str | Path): Base de datos de metas
+        anio (int): Año de las metas
+        hojas_avance (dict): {hoja: DataFrame} de leer_avance_cupos()
+        mapeo (list): Tuplas (hoja, columna, subcategoría)
+
+    Returns:
+        dict: {'regionales', 'meta', 'avance', 'disponible', 'cumplimiento'}.
+            Las matrices están indexadas por codigo_regional con una columna
+            por subcategoría
+    """
+    regionales, categorias, metas = cargar_matriz_metas(db_file, anio)
+    avance = construir_matriz_avance(hojas_avance, mapeo, regionales['codigo_regional'], categorias)
+    disponibles, cumplimiento = calcular_cupos(metas, avance)
+
+    indice = pd.Index(regionales['codigo_regional'], name='codigo_regional')
+    return {
+        'regionales': regionales,
+        'meta': pd.DataFrame(metas, index=indice, columns=categorias),
+        'avance': pd.DataFrame(avance, index=indice, columns=categorias),
+        'disponible': pd.DataFrame(disponibles, index=indice, columns=categorias),
+        'cumplimiento': pd.DataFrame(cumplimiento, index=indice, columns=categorias)
+    }
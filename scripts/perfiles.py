@@ -0,0 +1,149 @@
+"""
+Perfiles de ejecución (cProfile) de los pasos del proceso
+
+El orquestador, con --profile, ejecuta los pasos indicados bajo cProfile y
+guarda por cada uno:
+
+- {paso}_{fecha}.pstats: estadísticas para pstats / snakeviz
+- {paso}_{fecha}.collapsed: pilas colapsadas ("a;b;c microsegundos") para
+  flamegraph.pl o speedscope
+
+cProfile no guarda pilas completas sino aristas llamador -> llamado, así que
+las pilas colapsadas se reconstruyen repartiendo el tiempo de cada función
+entre sus llamadores en proporción al tiempo acumulado de cada llamada
+(la misma aproximación de flameprof).
+
+Uso:
+    python perfiles.py <ARCHIVO.pstats> [N]      # funciones más costosas
+"""
+
+import pstats
+import sys
+from pathlib import Path
+
+# Profundidad máxima de las pilas reconstruidas (evita recorridos enormes en
+# grafos de llamadas muy ramificados)
+PROFUNDIDAD_MAXIMA = 60
+
+
+def _nombre_funcion(funcion):
+    """'modulo.py:linea(funcion)' con el nombre corto del archivo"""
+    archivo, linea, nombre = funcion
+    if archivo == '~':
+        return nombre
+    return f"{Path(archivo).name}:{linea}({nombre})"
+
+
+def pilas_colapsadas(estadisticas):
+    """
+    Reconstruye pilas colapsadas a partir de las estadísticas de cProfile
+
+    Args:
+        estadisticas (pstats.Stats): Estadísticas del perfil
+
+    Returns:
+        list[str]: Líneas "raiz;...;funcion microsegundos"
+    """
+    datos = estadisticas.stats
+    llamados = {}
+    for funcion, (_, _, _, _, llamadores) in datos.items():
+        for llamador, (_, _, _, acumulado) in llamadores.items():
+            llamados.setdefault(llamador, []).append((funcion, acumulado))
+
+    pilas = {}
+
+    def recorrer(funcion, pila, fraccion):
+        _, _, propio, acumulado, _ = datos[funcion]
+        # Ramas de menos de un microsegundo no aportan a la gráfica
+        if acumulado * fraccion < 1e-6:
+            return
+        pila = pila + [_nombre_funcion(funcion)]
+        microsegundos = int(propio * fraccion * 1_000_000)
+        if microsegundos > 0:
+            clave = ';'.join(pila)
+            pilas[clave] = pilas.get(clave, 0) + microsegundos
+
+        if len(pila) >= PROFUNDIDAD_MAXIMA:
+            return
+        for llamado, acumulado_llamada in llamados.get(funcion, []):
+            # Recursión: la función ya está en la pila
+            if _nombre_funcion(llamado) in pila:
+                continue
+            acumulado_total = datos[llamado][3]
+            if acumulado_total > 0:
+                recorrer(llamado, pila, fraccion * acumulado_llamada / acumulado_total)
+
+    raices = [funcion for funcion, (*_, llamadores) in datos.items() if not llamadores]
+    for raiz in raices:
+        recorrer(raiz, [], 1.0)
+
+    return [f"{pila} {microsegundos}" for pila, microsegundos in pilas.items()]
+
+
+def guardar_perfil(perfil, ruta_base, pstats_adicional=None):
+    """
+    Guarda un perfil como .pstats y .collapsed
+
+    Args:
+        perfil (cProfile.Profile): Perfil del proceso actual
+        ruta_base (Path): Ruta sin extensión ({paso}_{fecha})
+        pstats_adicional (Path): .pstats de un subproceso a combinar con el
+            perfil (modo subprocesos); se reemplaza por el combinado
+
+    Returns:
+        Path: Archivo .pstats
+    """
+    ruta_base = Path(ruta_base)
+    ruta_base.parent.mkdir(parents=True, exist_ok=True)
+
+    estadisticas = pstats.Stats(perfil)
+    if pstats_adicional is not None and Path(pstats_adicional).exists():
+        estadisticas.add(str(pstats_adicional))
+
+    ruta_pstats = ruta_base.with_name(f"{ruta_base.name}.pstats")
+    estadisticas.dump_stats(str(ruta_pstats))
+    if pstats_adicional is not None and Path(pstats_adicional) != ruta_pstats:
+        Path(pstats_adicional).unlink(missing_ok=True)
+
+    with open(ruta_base.with_name(f"{ruta_base.name}.collapsed"), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(pilas_colapsadas(estadisticas)) + '\n')
+
+    return ruta_pstats
+
+
+def funciones_costosas(ruta_pstats, n=10):
+    """
+    Funciones con más tiempo propio de un perfil
+
+    Args:
+        ruta_pstats (str | Path): Archivo .pstats
+        n (int): Número de funciones
+
+    Returns:
+        list[dict]: funcion, llamadas, tiempo_propio, tiempo_acumulado
+    """
+    datos = pstats.Stats(str(ruta_pstats)).stats
+    ordenadas = sorted(datos.items(), key=lambda item: item[1][2], reverse=True)[:n]
+    return [
+        {'funcion': _nombre_funcion(funcion), 'llamadas': llamadas,
+         'tiempo_propio': propio, 'tiempo_acumulado': acumulado}
+        for funcion, (_, llamadas, propio, acumulado, _) in ordenadas
+    ]
+
+
+def imprimir_funciones_costosas(ruta_pstats, n=10):
+    """Tabla con las funciones de más tiempo propio de un perfil"""
+    print(f"\n  {'Propio (s)':>10}{'Acum. (s)':>11}{'Llamadas':>11}  Función")
+    for fila in funciones_costosas(ruta_pstats, n):
+        print(f"  {fila['tiempo_propio']:>10.3f}{fila['tiempo_acumulado']:>11.3f}"
+              f"{fila['llamadas']:>11,}  {fila['funcion']}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Uso: python perfiles.py <ARCHIVO.pstats> [N]")
+        sys.exit(1)
+
+    ruta = Path(sys.argv[1])
+    print(f"=== FUNCIONES MÁS COSTOSAS: {ruta.name} ===")
+    imprimir_funciones_costosas(ruta, int(sys.argv[2]) if len(sys.argv) > 2 else 20)
@@ -0,0 +1,154 @@
+"""
+Salida del reporte consolidado: datos y renderizado Excel
+
+El consolidado (paso 8) puede entregarse de dos formas:
+
+- 'xlsx': el libro Excel de 3 hojas con formato (por defecto)
+- 'datos': las mismas 3 tablas como Parquet y CSV más un manifest.json,
+  sin pasar por Excel (para cargar en herramientas de BI)
+
+El libro con formato se puede renderizar después, por separado, a partir
+del manifest.
+
+Uso:
+    python renderizar_consolidado.py "<directorio de datos>/manifest.json"
+    python renderizar_consolidado.py "<directorio de datos>/manifest.json" "Reporte.xlsx"
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from artefactos import publicar, obtener
+from escritor_excel import escribir_hojas, FORMATO_ENCABEZADO, FORMATO_DEPARTAMENTO
+
+# Encabezados del consolidado
+ENCABEZADO_AZUL = {**FORMATO_ENCABEZADO, 'font_color': '#FFFFFF', 'bg_color': '#1F4E78', 'pattern': 1}  # Hoja 1
+ENCABEZADO_VERDE = {**FORMATO_ENCABEZADO, 'font_color': '#FFFFFF', 'bg_color': '#548235', 'pattern': 1}  # Hojas 2 y 3
+
+# Archivo de cada hoja en el directorio de datos, en el orden del libro
+TABLAS_CONSOLIDADO = ['economia_naranja', 'oferta_disponible', 'sena_mensual_nacional']
+
+# Columna de la hoja 3 que marca las filas de departamento (no se renderiza)
+COLUMNA_RESALTADO = 'es_departamento'
+
+MANIFIESTO = 'manifest.json'
+
+
+def especificar_hojas(nombres, df_economia_naranja, df_oferta, df_aprendices, es_departamento):
+    """
+    Arma las hojas del consolidado para escritor_excel.escribir_hojas
+
+    Args:
+        nombres (list[str]): Nombres de las 3 hojas
+        df_economia_naranja, df_oferta, df_aprendices (DataFrame): Datos de cada hoja
+        es_departamento (array-like de bool): Filas de departamento de la hoja 3
+
+    Returns:
+        list[dict]: Especificación de las hojas
+    """
+    nombre_hoja1, nombre_hoja2, nombre_hoja3 = nombres
+    return [
+        {'nombre': nombre_hoja1, 'datos': df_economia_naranja, 'formato_encabezado': ENCABEZADO_AZUL},
+        {'nombre': nombre_hoja2, 'datos': df_oferta, 'formato_encabezado': ENCABEZADO_VERDE},
+        {'nombre': nombre_hoja3, 'datos': df_aprendices, 'formato_encabezado': ENCABEZADO_VERDE,
+         'resaltar': es_departamento, 'formato_resaltado': FORMATO_DEPARTAMENTO},
+    ]
+
+
+def exportar_datos(directorio, nombres, df_economia_naranja, df_oferta, df_aprendices, es_departamento,
+                   reporte, mes, anio):
+    """
+    Escribe las 3 tablas del consolidado como Parquet y CSV, con su manifest
+
+    La hoja 3 conserva la columna es_departamento para poder filtrar los
+    subtotales por departamento.
+
+    Args:
+        directorio (str | Path): Directorio de salida (se crea si no existe)
+        nombres (list[str]): Nombres de las 3 hojas
+        df_economia_naranja, df_oferta, df_aprendices (DataFrame): Datos de cada hoja
+        es_departamento (array-like de bool): Filas de departamento de la hoja 3
+        reporte (str): Nombre del reporte (sin extensión)
+        mes (str), anio (int): Periodo del reporte
+
+    Returns:
+        Path: Ruta del manifest.json
+    """
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+
+    tablas = [df_economia_naranja, df_oferta, df_aprendices.assign(**{COLUMNA_RESALTADO: es_departamento})]
+
+    hojas = []
+    for nombre, tabla, df in zip(nombres, TABLAS_CONSOLIDADO, tablas):
+        publicar(df, directorio / f'{tabla}.parquet')
+        df.to_csv(directorio / f'{tabla}.csv', index=False, encoding='utf-8-sig')
+        hojas.append({
+            'nombre': nombre,
+            'parquet': f'{tabla}.parquet',
+            'csv': f'{tabla}.csv',
+            'filas': len(df),
+            'columnas': [str(columna) for columna in df.columns]
+        })
+    hojas[2]['columna_resaltado'] = COLUMNA_RESALTADO
+
+    manifiesto = {
+        'reporte': reporte,
+        'mes': mes,
+        'anio': anio,
+        'generado': datetime.now().isoformat(timespec='seconds'),
+        'hojas': hojas
+    }
+    ruta = directorio / MANIFIESTO
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+    return ruta
+
+
+def renderizar(ruta_manifiesto, ruta_xlsx=None):
+    """
+    Renderiza el libro Excel con formato a partir de un manifest
+
+    Args:
+        ruta_manifiesto (str | Path): manifest.json escrito por exportar_datos()
+        ruta_xlsx (str | Path): Libro de salida. Por defecto
+            '<reporte>.xlsx' junto al directorio de datos
+
+    Returns:
+        Path: Ruta del libro generado
+    """
+    ruta_manifiesto = Path(ruta_manifiesto)
+    with open(ruta_manifiesto, encoding='utf-8') as f:
+        manifiesto = json.load(f)
+
+    directorio = ruta_manifiesto.parent
+    if ruta_xlsx is None:
+        ruta_xlsx = directorio.parent / f"{manifiesto['reporte']}.xlsx"
+
+    nombres = [hoja['nombre'] for hoja in manifiesto['hojas']]
+    df_economia_naranja, df_oferta, df_aprendices = [
+        obtener(directorio / hoja['parquet']) for hoja in manifiesto['hojas']
+    ]
+    columna = manifiesto['hojas'][2]['columna_resaltado']
+    es_departamento = df_aprendices[columna].to_numpy()
+
+    escribir_hojas(ruta_xlsx, especificar_hojas(
+        nombres, df_economia_naranja, df_oferta, df_aprendices.drop(columns=[columna]), es_departamento
+    ))
+    return Path(ruta_xlsx)
+
+
+# ============================================
+# EJEMPLO DE USO
+# ============================================
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python renderizar_consolidado.py <manifest.json> [salida.xlsx]")
+        sys.exit(1)
+
+    ruta = renderizar(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"[OK] Reporte renderizado: {ruta}")
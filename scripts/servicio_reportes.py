@@ -0,0 +1,315 @@
+"""
+Servicio residente de generación de reportes
+
+Proceso de larga duración que mantiene cargados pandas, pyxlsb, xlsxwriter,
+los scripts de los pasos y los insumos compartidos (catálogo DIVIPOLA, BD de
+metas normalizada, catálogo de economía naranja), y genera reportes a
+pedido. Cada reporte se ahorra el arranque del intérprete, las
+importaciones y la carga de catálogos.
+
+Atiende solo en localhost (HTTP + JSON) y ejecuta un trabajo a la vez, en
+orden de llegada. Se inicia desde el orquestador y se usa con
+cliente_reportes.py:
+
+    python generar_reporte_completo.py --servicio [--puerto N]
+    python cliente_reportes.py SEPTIEMBRE [--force PASO] [--profile PASO]
+
+Endpoints:
+    GET  /estado                    Trabajos en cola, en curso y cachés cargados
+    POST /trabajos                  {"mes", "forzar", "perfilar", "subprocesos"} -> {"id"}
+    GET  /trabajos/<id>?desde=N     Estado del trabajo y su log desde el carácter N
+    POST /detener                   Termina el servicio (después de los trabajos en cola)
+"""
+
+import contextlib
+import json
+import queue
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import artefactos
+import generar_reporte_completo as orquestador
+from catalogo_divipola import cargar_catalogo
+from configuracion import (obtener_config_mes, validar_archivos_entrada, MESES, MODO_EJECUCION_PASOS,
+                           PUERTO_SERVICIO, BD_CATALOGO_DIVIPOLA)
+
+# Trabajos terminados que se conservan para consulta
+MAX_TRABAJOS_TERMINADOS = 50
+
+
+class ServicioReportes:
+    """
+    Cola de trabajos y estado del servicio
+
+    Un solo hilo ejecuta los trabajos: el orquestador usa estado global del
+    proceso (cancelación de pasos, captura de salida por hilo) que no admite
+    dos meses a la vez en el mismo intérprete. Para varios meses en paralelo
+    está el modo por lotes (--meses / --rango).
+    """
+
+    def __init__(self):
+        self.inicio = datetime.now()
+        self._cola = queue.Queue()
+        self._lock = threading.Lock()
+        self._trabajos = {}
+        self._contador = 0
+        self.en_curso = None
+        # Insumos compartidos del último trabajo de cada mes (el catálogo de
+        # economía naranja se conserva en memoria entre trabajos)
+        self.compartidos = {}
+
+    def precargar(self):
+        """Importa los scripts de los pasos y carga el catálogo DIVIPOLA"""
+        print("→ Precargando bibliotecas y scripts de los pasos...")
+        inicio = time.perf_counter()
+        import importar_pe_04_mes, normalizar_metas_sena, cruce_metas_avance_final  # noqa: F401
+        import generar_reporte_mensual_aprendices, generar_reporte_consolidado  # noqa: F401
+        if not BD_CATALOGO_DIVIPOLA.exists():
+            print(f"[ADVERTENCIA] No existe {BD_CATALOGO_DIVIPOLA}; el catálogo DIVIPOLA se carga en el primer trabajo")
+            return
+        catalogo = cargar_catalogo(BD_CATALOGO_DIVIPOLA)
+        print(f"✓ Precarga lista en {time.perf_counter() - inicio:.1f} s "
+              f"(catálogo DIVIPOLA: {len(catalogo):,} municipios)")
+
+    def encolar(self, mes, forzar=(), perfilar=(), subprocesos=False):
+        """
+        Agrega un trabajo a la cola
+
+        Returns:
+            dict: El trabajo (id, mes, estado 'en cola', ...)
+        """
+        with self._lock:
+            self._contador += 1
+            trabajo = {
+                'id': f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{self._contador}",
+                'mes': mes,
+                'forzar': list(forzar),
+                'perfilar': list(perfilar),
+                'modo_ejecucion': 'subproceso' if subprocesos else MODO_EJECUCION_PASOS,
+                'estado': 'en cola',
+                'exitoso': None,
+                'paso_fallido': None,
+                'duracion': None,
+                'log': None,
+                'reporte': None
+            }
+            self._trabajos[trabajo['id']] = trabajo
+        self._cola.put(trabajo['id'])
+        return trabajo
+
+    def trabajo(self, id_trabajo):
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            return dict(trabajo) if trabajo else None
+
+    def estado(self):
+        with self._lock:
+            en_cola = [t['id'] for t in self._trabajos.values() if t['estado'] == 'en cola']
+            terminados = sum(1 for t in self._trabajos.values() if t['estado'] in ('terminado', 'error'))
+        return {
+            'inicio': self.inicio.isoformat(timespec='seconds'),
+            'en_curso': self.en_curso,
+            'en_cola': en_cola,
+            'terminados': terminados,
+            'insumos_compartidos': self.compartidos
+        }
+
+    def _actualizar(self, id_trabajo, **valores):
+        with self._lock:
+            self._trabajos[id_trabajo].update(valores)
+
+    def _depurar_terminados(self):
+        with self._lock:
+            terminados = [i for i, t in self._trabajos.items() if t['estado'] in ('terminado', 'error')]
+            for id_trabajo in terminados[:-MAX_TRABAJOS_TERMINADOS]:
+                del self._trabajos[id_trabajo]
+
+    def ejecutar_trabajo(self, id_trabajo):
+        """Ejecuta los 8 pasos del mes de un trabajo; la salida queda en el log del mes"""
+        trabajo = self.trabajo(id_trabajo)
+        config = obtener_config_mes(trabajo['mes'])
+        config['modo_ejecucion'] = trabajo['modo_ejecucion']
+        config['dir_mes'].mkdir(parents=True, exist_ok=True)
+        ruta_log = config['dir_mes'] / 'log_generar_reporte.txt'
+        self._actualizar(id_trabajo, estado='en curso', log=str(ruta_log),
+                         reporte=str(config['archivos_finales']['reporte_consolidado']))
+
+        inicio = time.perf_counter()
+        exitoso, paso_fallido = False, None
+        # Línea por línea: el cliente lee el log mientras el trabajo avanza
+        with open(ruta_log, 'w', encoding='utf-8', buffering=1) as log, \
+                contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            print(f"GENERACIÓN DEL REPORTE {trabajo['mes']} (servicio, trabajo {id_trabajo}) - "
+                  f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            try:
+                ok, faltantes = validar_archivos_entrada(config)
+                if not ok:
+                    print("\n✗ Faltan archivos de entrada:")
+                    for archivo in faltantes:
+                        print(f"  - {archivo}")
+                else:
+                    # Insumos compartidos: identificados por contenido, solo se vuelven a
+                    # preparar si el analista cambió el archivo de metas o el catálogo
+                    self.compartidos.update(orquestador.preparar_insumos_compartidos([config]))
+                    config['compartidos'] = self.compartidos[trabajo['mes']]
+                    catalogo = config['compartidos'].get('catalogo_economia_naranja')
+                    if catalogo:
+                        artefactos.obtener(catalogo, conservar=True)
+
+                    exitoso, paso_fallido = orquestador.ejecutar_pasos(
+                        orquestador.PASOS, config,
+                        forzar=[orquestador._paso_por_nombre(nombre) for nombre in trabajo['forzar']],
+                        perfilar=[orquestador._paso_por_nombre(nombre) for nombre in trabajo['perfilar']]
+                    )
+            except Exception:
+                traceback.print_exc()
+
+        # Las tablas del mes no se necesitan en el siguiente trabajo; los catálogos sí
+        artefactos.olvidar(conservar=[insumos['catalogo_economia_naranja']
+                                      for insumos in self.compartidos.values()
+                                      if insumos.get('catalogo_economia_naranja')])
+
+        self._actualizar(id_trabajo, estado='terminado' if exitoso else 'error', exitoso=exitoso,
+                         paso_fallido=paso_fallido.__name__ if paso_fallido else None,
+                         duracion=time.perf_counter() - inicio)
+        self._depurar_terminados()
+
+    def atender_cola(self):
+        """Hilo de trabajo: ejecuta los trabajos en orden de llegada"""
+        while True:
+            id_trabajo = self._cola.get()
+            if id_trabajo is None:
+                return
+            self.en_curso = id_trabajo
+            try:
+                self.ejecutar_trabajo(id_trabajo)
+            finally:
+                self.en_curso = None
+            trabajo = self.trabajo(id_trabajo)
+            marca = "✓" if trabajo['exitoso'] else "✗"
+            print(f"{marca} Trabajo {id_trabajo} ({trabajo['mes']}): {trabajo['estado']} "
+                  f"en {trabajo['duracion']:.1f} s")
+
+    def detener(self):
+        self._cola.put(None)
+
+
+def _leer_log(ruta, desde):
+    """Texto del log a partir del carácter `desde` ('' si aún no existe)"""
+    try:
+        with open(ruta, encoding='utf-8', errors='replace') as f:
+            return f.read()[desde:]
+    except (OSError, TypeError):
+        return ''
+
+
+def _crear_manejador(servicio, salida):
+    """Manejador HTTP ligado a un servicio; `salida` es la consola del servicio"""
+
+    class Manejador(BaseHTTPRequestHandler):
+
+        def _responder(self, codigo, datos):
+            cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+            self.send_response(codigo)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def _leer_cuerpo(self):
+            longitud = int(self.headers.get('Content-Length') or 0)
+            if not longitud:
+                return {}
+            return json.loads(self.rfile.read(longitud).decode('utf-8'))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/estado':
+                return self._responder(200, servicio.estado())
+
+            if url.path.startswith('/trabajos/'):
+                trabajo = servicio.trabajo(url.path.rsplit('/', 1)[-1])
+                if trabajo is None:
+                    return self._responder(404, {'error': 'Trabajo no encontrado'})
+                desde = int(parse_qs(url.query).get('desde', ['0'])[0])
+                trabajo['salida'] = _leer_log(trabajo['log'], desde) if trabajo['log'] else ''
+                return self._responder(200, trabajo)
+
+            self._responder(404, {'error': f"Ruta no encontrada: {url.path}"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path == '/trabajos':
+                try:
+                    datos = self._leer_cuerpo()
+                except ValueError:
+                    return self._responder(400, {'error': 'JSON inválido'})
+
+                mes = str(datos.get('mes', '')).upper()
+                if mes not in MESES:
+                    return self._responder(400, {'error': f"Mes inválido: {mes}"})
+                pasos = list(datos.get('forzar', [])) + list(datos.get('perfilar', []))
+                invalidos = [p for p in pasos if str(p).lower() not in ('todos', 'all')
+                             and orquestador._paso_por_nombre(str(p)) is None]
+                if invalidos:
+                    return self._responder(400, {'error': f"Paso inválido: {', '.join(map(str, invalidos))}"})
+
+                def expandir(nombres):
+                    if any(str(n).lower() in ('todos', 'all') for n in nombres):
+                        return [paso.__name__ for paso, _ in orquestador.PASOS]
+                    return [orquestador._paso_por_nombre(str(n)).__name__ for n in nombres]
+
+                trabajo = servicio.encolar(mes, expandir(datos.get('forzar', [])),
+                                           expandir(datos.get('perfilar', [])),
+                                           bool(datos.get('subprocesos')))
+                print(f"→ Trabajo {trabajo['id']} en cola: {mes}", file=salida, flush=True)
+                return self._responder(202, trabajo)
+
+            if url.path == '/detener':
+                self._responder(200, {'detenido': True})
+                servicio.detener()
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+            self._responder(404, {'error': f"Ruta no encontrada: {url.path}"})
+
+        def log_message(self, formato, *args):
+            # Sin registro por petición (el cliente consulta el estado cada medio segundo)
+            pass
+
+    return Manejador
+
+
+def iniciar_servicio(puerto=PUERTO_SERVICIO):
+    """
+    Inicia el servicio en 127.0.0.1:puerto y atiende hasta /detener o Ctrl+C
+
+    Args:
+        puerto (int): Puerto HTTP local
+    """
+    servicio = ServicioReportes()
+    servicio.precargar()
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', puerto), _crear_manejador(servicio, sys.stdout))
+    hilo = threading.Thread(target=servicio.atender_cola, name='trabajos', daemon=True)
+    hilo.start()
+
+    print(f"✓ Servicio de reportes escuchando en http://127.0.0.1:{puerto}")
+    print("  Use: python cliente_reportes.py <MES>   (Ctrl+C para detener)")
+    try:
+        servidor.serve_forever()
+        # /detener: los trabajos ya aceptados terminan antes de salir
+        print("\n→ Deteniendo el servicio al terminar los trabajos en cola...")
+        servicio.detener()
+        hilo.join()
+    except KeyboardInterrupt:
+        print("\n→ Deteniendo el servicio...")
+        servicio.detener()
+        orquestador.terminar_procesos_activos()
+    finally:
+        servidor.server_close()
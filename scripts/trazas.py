@@ -0,0 +1,181 @@
+"""
+Trazas de ejecución en formato Chrome Trace (chrome://tracing, Perfetto)
+
+Spans anidados con tiempo de inicio y duración por proceso e hilo, para ver
+dónde se va el tiempo dentro de un paso (lectura de hojas, normalización,
+combinación, escritura del libro).
+
+Se activa con la variable de entorno TRAZA_PROCESO, que indica el archivo
+JSON de salida; se lee al importar el módulo. Sin ella, traza() retorna un
+context manager vacío compartido y @trazar deja la función sin envolver: el
+costo es una comparación por llamada (o ninguno).
+
+Los eventos se escriben en el formato "JSON Array" sin el corchete de
+cierre (opcional en ese formato), una línea por evento y con escrituras en
+modo append, así que varios procesos (subprocesos del orquestador, procesos
+de lectura de hojas, meses de un lote) pueden escribir en el mismo archivo.
+Los eventos de un hilo se escriben al cerrar su span de primer nivel.
+
+Uso:
+    from trazas import traza, trazar
+
+    @trazar
+    def leer(...):
+        ...
+
+    with traza('escribir_hoja', hoja=nombre):
+        ...
+
+    set TRAZA_PROCESO=C:\\ws\\sena\\data\\traza_septiembre.json
+    python generar_reporte_completo.py SEPTIEMBRE
+"""
+
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+ARCHIVO_TRAZA = os.environ.get('TRAZA_PROCESO') or None
+
+_lock = threading.Lock()
+_pendientes = []
+_hilos_nombrados = set()
+_profundidad = {}   # spans abiertos por hilo
+_pid = None
+
+
+def activa():
+    """True si las trazas están activadas (TRAZA_PROCESO)"""
+    return ARCHIVO_TRAZA is not None
+
+
+def _microsegundos():
+    # Reloj monótono del sistema: comparable entre procesos de la misma máquina
+    return time.perf_counter_ns() // 1000
+
+
+def _proceso_actual():
+    """
+    Reinicia el estado en un proceso nuevo (debe llamarse con _lock tomado)
+
+    Un proceso creado con fork hereda los eventos pendientes y los spans
+    abiertos del padre; se descartan para no duplicarlos.
+    """
+    global _pid
+    pid = os.getpid()
+    if _pid != pid:
+        _pid = pid
+        _pendientes.clear()
+        _hilos_nombrados.clear()
+        _profundidad.clear()
+        _pendientes.append({'ph': 'M', 'name': 'process_name', 'pid': pid,
+                            'args': {'name': os.path.basename(sys.argv[0]) or 'python'}})
+    return pid
+
+
+def _agregar(evento):
+    with _lock:
+        _proceso_actual()
+        hilo = threading.get_ident()
+        if hilo not in _hilos_nombrados:
+            _hilos_nombrados.add(hilo)
+            _pendientes.append({'ph': 'M', 'name': 'thread_name', 'pid': os.getpid(), 'tid': hilo,
+                                'args': {'name': threading.current_thread().name}})
+        _pendientes.append(evento)
+
+
+def guardar():
+    """Escribe en el archivo de traza los eventos pendientes de este proceso"""
+    if ARCHIVO_TRAZA is None:
+        return
+    with _lock:
+        _proceso_actual()
+        # Solo metadatos (nombres de proceso e hilos): nada que escribir todavía
+        if all(evento['ph'] == 'M' for evento in _pendientes):
+            return
+        eventos = _pendientes[:]
+        _pendientes.clear()
+
+    lineas = ''.join(json.dumps(evento, ensure_ascii=False, default=str) + ',\n' for evento in eventos)
+    try:
+        with open(ARCHIVO_TRAZA, 'x', encoding='utf-8') as f:
+            f.write('[\n')
+    except FileExistsError:
+        pass
+    # Una sola escritura en modo append: las líneas de otros procesos no se mezclan
+    with open(ARCHIVO_TRAZA, 'a', encoding='utf-8') as f:
+        f.write(lineas)
+
+
+class _Span:
+    """Span activo: registra un evento completo ('X') al cerrarse"""
+
+    __slots__ = ('nombre', 'args', 'inicio')
+
+    def __init__(self, nombre, args):
+        self.nombre = nombre
+        self.args = args
+
+    def __enter__(self):
+        hilo = threading.get_ident()
+        with _lock:
+            _proceso_actual()
+            _profundidad[hilo] = _profundidad.get(hilo, 0) + 1
+        self.inicio = _microsegundos()
+        return self
+
+    def __exit__(self, tipo, *exc):
+        fin = _microsegundos()
+        evento = {'ph': 'X', 'name': self.nombre, 'cat': 'proceso', 'pid': os.getpid(),
+                  'tid': threading.get_ident(), 'ts': self.inicio, 'dur': fin - self.inicio}
+        if self.args or tipo is not None:
+            evento['args'] = dict(self.args, **({'error': tipo.__name__} if tipo is not None else {}))
+        _agregar(evento)
+
+        with _lock:
+            _profundidad[evento['tid']] = _profundidad.get(evento['tid'], 1) - 1
+            primer_nivel = _profundidad[evento['tid']] == 0
+        if primer_nivel:
+            guardar()
+        return False
+
+
+_SPAN_VACIO = contextlib.nullcontext()
+
+
+def traza(nombre, **args):
+    """
+    Span con nombre (context manager); los argumentos se muestran en el visor
+
+    Args:
+        nombre (str): Nombre del span
+        **args: Valores adicionales (hoja, filas, mes...)
+
+    Returns:
+        context manager (vacío si las trazas no están activas)
+    """
+    if ARCHIVO_TRAZA is None:
+        return _SPAN_VACIO
+    return _Span(nombre, args)
+
+
+def trazar(funcion):
+    """Decorador: cada llamada a la función es un span con su nombre calificado"""
+    if ARCHIVO_TRAZA is None:
+        return funcion
+
+    nombre = f"{funcion.__module__}.{funcion.__qualname__}"
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        with _Span(nombre, {}):
+            return funcion(*args, **kwargs)
+    return envoltura
+
+
+if ARCHIVO_TRAZA is not None:
+    atexit.register(guardar)
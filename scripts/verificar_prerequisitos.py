@@ -30,6 +30,8 @@ def verificar_dependencias():
         'pandas': 'Manipulación de datos',
         'openpyxl': 'Lectura/escritura de Excel XLSX',
         'pyxlsb': 'Lectura de Excel XLSB',
+        'xlsxwriter': 'Escritura de reportes Excel XLSX',
+        'pyarrow': 'Artefactos Parquet entre pasos',
         'sqlite3': 'Base de datos SQLite'
     }
 
@@ -48,7 +50,7 @@ def verificar_dependencias():
 
     if not todas_ok:
         print("\n   Para instalar las dependencias faltantes:")
-        print("   pip install pandas openpyxl pyxlsb")
+        print("   pip install pandas openpyxl pyxlsb==1.0.10 xlsxwriter pyarrow")
 
     return todas_ok
 